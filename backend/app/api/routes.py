@@ -9,6 +9,9 @@ from app.routes import inventory
 from app.routes import feedback # ✅ NEW: Import the feedback router
 from app.routes import chatbot # ✅ NEW: Import the feedback router  
 from app.routes import dashboard # ✅ NEW: Import the dashboard router
+from app.routes import system
+from app.routes import export
+from app.routes import events
 
 router = APIRouter()
 
@@ -21,6 +24,9 @@ router.include_router(inventory.router, prefix="/inventory", tags=["Inventory"])
 router.include_router(feedback.router, prefix="/feedback", tags=["Feedback"]) # ✅ NEW: Include the feedback router
 router.include_router(chatbot.router, prefix="/ai", tags=["chatbot"]) # ✅ NEW: Include the feedback router
 router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"]) # ✅ NEW: Include the dashboard router
+router.include_router(system.router, prefix="/system", tags=["System"])
+router.include_router(export.router, prefix="/export", tags=["Export"])
+router.include_router(events.router, prefix="/events", tags=["Events"])
 
 # Include test router if exists
 try:
@@ -0,0 +1,256 @@
+# app/cache.py
+import copy
+import functools
+import hashlib
+import inspect
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+
+_MISSING = object()
+
+
+class MemoryCacheBackend:
+    """LRU in-process dengan TTL per entri (thread-safe)."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[Any, float]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING, 0
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return _MISSING, 0
+            self._entries.move_to_end(key)
+        # Salinan supaya caller tidak bisa memodifikasi nilai yang tersimpan
+        return copy.deepcopy(value), expires_at
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Backend bersama (Redis) supaya beberapa worker uvicorn berbagi hasil yang sudah hangat."""
+
+    def __init__(self, url: str, prefix: str = "gymtrack:cache:"):
+        import redis  # opsional, hanya dibutuhkan jika CACHE_BACKEND=redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Tuple[Any, float]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return _MISSING, 0
+        expires_at, value = pickle.loads(raw)
+        return value, expires_at
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        ttl = max(int(expires_at - time.time()), 1)
+        self.client.set(self.prefix + key, pickle.dumps((expires_at, value)), ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+    def get_generations(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        raw = self.client.mget([f"{self.prefix}gen:{table}" for table in tables])
+        return tuple(int(value) if value is not None else 0 for value in raw)
+
+    def bump_generation(self, table: str) -> None:
+        self.client.incr(f"{self.prefix}gen:{table}")
+
+
+class TieredCache:
+    """
+    L1 = MemoryCacheBackend per proses, L2 = backend bersama (opsional).
+    Error di L2 tidak pernah menggagalkan request; diperlakukan sebagai cache miss.
+    """
+
+    def __init__(self, local: MemoryCacheBackend, shared: Optional[RedisCacheBackend] = None):
+        self.local = local
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        # Nomor generasi per tabel; mutasi menaikkan generasi sehingga key lama tidak terpakai lagi
+        self._generations: Dict[str, int] = {}
+        self._generation_lock = threading.Lock()
+        self.invalidations = 0
+
+    def table_generations(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        if not tables:
+            return ()
+        if self.shared is not None:
+            try:
+                return self.shared.get_generations(tables)
+            except Exception as e:
+                print(f"Error reading shared cache generations: {e}")
+        return tuple(self._generations.get(table, 0) for table in tables)
+
+    def invalidate_tables(self, *tables: str) -> None:
+        with self._generation_lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            self.invalidations += 1
+        if self.shared is not None:
+            for table in tables:
+                try:
+                    self.shared.bump_generation(table)
+                except Exception as e:
+                    print(f"Error publishing cache invalidation for '{table}': {e}")
+
+    def get(self, key: str) -> Any:
+        value, _ = self.local.get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        if self.shared is not None:
+            try:
+                value, expires_at = self.shared.get(key)
+            except Exception as e:
+                print(f"Error reading shared cache: {e}")
+                value = _MISSING
+            if value is not _MISSING:
+                # Isi L1 dengan sisa TTL dari L2
+                self.local.set(key, value, expires_at)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return _MISSING
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        expires_at = time.time() + ttl
+        self.local.set(key, value, expires_at)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, expires_at)
+            except Exception as e:
+                print(f"Error writing shared cache: {e}")
+
+    def clear(self) -> None:
+        self.local.clear()
+        if self.shared is not None:
+            try:
+                self.shared.clear()
+            except Exception as e:
+                print(f"Error clearing shared cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": "memory+redis" if self.shared is not None else "memory",
+            "local_entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+            "invalidations": self.invalidations,
+            "table_generations": dict(self._generations),
+        }
+
+
+def _build_cache() -> TieredCache:
+    local = MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    shared = None
+    if settings.CACHE_BACKEND == "redis":
+        if not settings.CACHE_REDIS_URL:
+            print("CACHE_BACKEND=redis tetapi CACHE_REDIS_URL kosong, memakai cache memory saja.")
+        else:
+            try:
+                shared = RedisCacheBackend(settings.CACHE_REDIS_URL)
+            except ImportError:
+                print("Package 'redis' tidak terpasang, memakai cache memory saja.")
+    return TieredCache(local, shared)
+
+
+result_cache = _build_cache()
+
+
+def _make_key(name: str, signature: inspect.Signature, args: tuple, kwargs: dict, generations: Tuple[int, ...]) -> str:
+    bound = signature.bind(None, *args, **kwargs)  # argumen pertama (db) tidak ikut jadi key
+    bound.apply_defaults()
+    params = list(bound.arguments.items())[1:]
+    digest = hashlib.sha1(repr((params, generations)).encode("utf-8")).hexdigest()
+    return f"{name}:{digest}"
+
+
+def invalidate_tables(*tables: str) -> None:
+    """Buang semua hasil cache yang bergantung pada salah satu tabel ini."""
+    result_cache.invalidate_tables(*tables)
+
+
+def cached(ttl: Optional[int] = None, tables: Tuple[str, ...] = ()):
+    """
+    Decorator untuk fungsi baca di app/crud dengan signature `fn(db, *args, **kwargs)`.
+    Key dibangun dari nama fungsi + argumen (tanpa session) + generasi tabel di `tables`,
+    nilai disimpan selama `ttl` detik atau sampai salah satu tabel tersebut dimutasi.
+    """
+    def decorator(fn: Callable) -> Callable:
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        signature = inspect.signature(fn)
+        expiry = ttl or settings.CACHE_DEFAULT_TTL
+
+        @functools.wraps(fn)
+        def wrapper(db, *args, **kwargs):
+            generations = result_cache.table_generations(tables)
+            key = _make_key(name, signature, args, kwargs, generations)
+            value = result_cache.get(key)
+            if value is not _MISSING:
+                return value
+            value = fn(db, *args, **kwargs)
+            result_cache.set(key, value, expiry)
+            return value
+
+        wrapper.uncached = fn
+        wrapper.tables = tables
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*tables: str):
+    """
+    Decorator untuk fungsi tulis di app/crud: setelah fungsi selesai (dan commit),
+    publikasikan event invalidasi untuk tabel yang disentuhnya.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            invalidate_tables(*tables)
+            return result
+
+        wrapper.invalidates = tables
+        return wrapper
+
+    return decorator
@@ -1,4 +1,5 @@
 # app/config.py
+from typing import Optional
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -6,9 +7,48 @@ load_dotenv()
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None  # default: DATABASE_URL dengan driver asyncpg
     GROQ_API_KEY: str
     GROQ_MODEL: str = "llama3-8b-8192"  # default model
 
+    # Connection pool & engine database
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # detik menunggu koneksi bebas sebelum error
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # detik, -1 untuk menonaktifkan
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 untuk menonaktifkan
+    DB_APPLICATION_NAME: str = "gymtrack-api"
+    # Pool terpisah untuk engine async (asyncpg). Batas koneksi per proses =
+    # (DB_POOL_SIZE + DB_MAX_OVERFLOW) + (ASYNC_DB_POOL_SIZE + ASYNC_DB_MAX_OVERFLOW)
+    ASYNC_DB_POOL_SIZE: int = 5
+    ASYNC_DB_MAX_OVERFLOW: int = 5
+
+    # Dashboard summary fan-out
+    DASHBOARD_MAX_WORKERS: int = 6  # jumlah thread untuk section dashboard
+    DASHBOARD_SECTION_TIMEOUT: float = 5.0  # detik, section yang lebih lambat dilaporkan sebagai timeout
+
+    # Cache hasil agregasi CRUD
+    CACHE_BACKEND: str = "memory"  # "memory" atau "redis" (memory + redis bersama antar worker)
+    CACHE_REDIS_URL: Optional[str] = None
+    CACHE_MAX_ENTRIES: int = 512  # batas entri LRU in-process
+    CACHE_DEFAULT_TTL: int = 60  # detik
+
+    # Background job
+    FINANCE_RECONCILE_INTERVAL: int = 300  # detik antar rekonsiliasi budget/target, 0 untuk menonaktifkan
+    MEMBER_COUNTER_RECONCILE_INTERVAL: int = 3600  # detik antar pengecekan counter member vs tabel member
+    COHORT_REFRESH_INTERVAL: int = 900  # detik antar refresh inkremental sel cohort terbaru
+    WORKOUT_DAILY_BUCKETS: bool = True  # baca chart workout dari workout_daily_bucket jika sudah terisi
+    WORKOUT_BUCKET_REFRESH_INTERVAL: int = 600  # detik, 0 untuk menonaktifkan
+    WORKOUT_BUCKET_ID_OVERLAP: int = 1000  # session_id di bawah watermark yang dipindai ulang (commit tidak urut id)
+    FUNNEL_WINDOW_DAYS: int = 30  # window aktivitas per snapshot funnel
+    FUNNEL_BACKFILL_DAYS: int = 90  # jumlah snapshot harian yang dibangun saat tabel masih kosong / full refresh
+    FUNNEL_SNAPSHOT_INTERVAL: int = 3600  # detik antar refresh snapshot funnel hari ini
+    EXPERIMENT_FOLD_INTERVAL: int = 300  # detik antar fold ab_test_log / notification_log ke experiment_counter
+    EVENT_BUFFER_MAX_SIZE: int = 50000  # event yang boleh menunggu di memori; lebih dari ini -> 429
+    EVENT_FLUSH_SIZE: int = 1000  # flush segera begitu buffer mencapai jumlah ini
+    EVENT_FLUSH_INTERVAL: float = 2.0  # detik, flush berkala untuk sisa buffer
+
     class Config:
         env_file = ".env"
 
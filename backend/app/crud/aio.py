@@ -0,0 +1,63 @@
+# backend/app/crud/aio.py
+"""
+Varian async dari fungsi-fungsi di app/crud.
+
+Fungsi CRUD tetap ditulis sync (Session); di sini dijalankan lewat
+AsyncSession.run_sync sehingga I/O database tidak memblokir event loop.
+Jika driver async tidak tersedia, get_async_db memberi Session sync dan
+fungsinya dijalankan di threadpool.
+
+    from app.crud.aio import finance as finance_aio
+    summary = await finance_aio.get_financial_summary(db, year)
+"""
+import functools
+import inspect
+from types import ModuleType
+from typing import Any, Callable
+
+from starlette.concurrency import run_in_threadpool
+
+from app.crud import member as crud_member
+from app.crud import product as crud_product
+from app.crud import finance as crud_finance
+from app.crud import inventory as crud_inventory
+from app.crud import feedback as crud_feedback
+from app.crud import trainer as crud_trainer
+
+
+async def run_sync(db, fn: Callable, *args, **kwargs) -> Any:
+    """Jalankan fungsi CRUD sync `fn(session, ...)` dengan session dari get_async_db."""
+    if hasattr(db, "run_sync"):
+        return await db.run_sync(lambda session: fn(session, *args, **kwargs))
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def to_async(fn: Callable) -> Callable:
+    if inspect.iscoroutinefunction(fn):
+        raise TypeError(f"{fn.__name__} sudah async dan memakai Session sync secara langsung")
+
+    @functools.wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        return await run_sync(db, fn, *args, **kwargs)
+
+    return wrapper
+
+
+class AsyncCrud:
+    """Namespace async untuk satu modul crud: setiap atribut adalah `to_async(fungsi)`."""
+
+    def __init__(self, module: ModuleType):
+        self._module = module
+
+    def __getattr__(self, name: str) -> Callable:
+        wrapped = to_async(getattr(self._module, name))
+        setattr(self, name, wrapped)
+        return wrapped
+
+
+member = AsyncCrud(crud_member)
+product = AsyncCrud(crud_product)
+finance = AsyncCrud(crud_finance)
+inventory = AsyncCrud(crud_inventory)
+feedback = AsyncCrud(crud_feedback)
+trainer = AsyncCrud(crud_trainer)
@@ -5,9 +5,12 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 import json
 
+from app.cache import invalidates
+
 from app.models.chatbot import ChatSession, ChatMessage
 from app.schemas.chatbot import ChatSessionCreate, ChatMessageCreate
 
+@invalidates("chat_session")
 def create_chat_session(db: Session, session: ChatSessionCreate) -> ChatSession:
     db_session = ChatSession(**session.dict())
     db.add(db_session)
@@ -31,6 +34,7 @@ def get_or_create_session(db: Session, user_id: Optional[str] = None) -> ChatSes
     new_session = ChatSessionCreate(user_id=user_id)
     return create_chat_session(db, new_session)
 
+@invalidates("chat_message", "chat_session")
 def create_chat_message(db: Session, message: ChatMessageCreate, session_id: int, context_data: Optional[dict] = None) -> ChatMessage:
     context_json = json.dumps(context_data) if context_data else None
     db_message = ChatMessage(
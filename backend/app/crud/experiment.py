@@ -0,0 +1,105 @@
+# backend/app/crud/experiment.py
+"""
+Counter eksperimen (A/B test dan respons notifikasi) yang di-fold inkremental dari log.
+
+Baris log sudah berupa agregat kecil (ab_test_log: success/total, notification_log:
+responded/ignored), jadi fold cukup menjumlahkan baris yang belum di-fold ke experiment_counter.
+Baris di-klaim dengan UPDATE ... SET folded_at RETURNING (bukan watermark id): id serial tidak
+di-commit berurutan, jadi baris ber-id kecil yang commit belakangan tetap ikut di fold berikutnya.
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.cache import cached, invalidates
+
+# source -> (tabel log, kolom varian, ekspresi sukses, ekspresi percobaan)
+EXPERIMENT_SOURCES = {
+    "ab_test": ("ab_test_log", "feature", "COALESCE(success, 0)", "COALESCE(total, 0)"),
+    "notification": (
+        "notification_log", "type", "COALESCE(responded, 0)", "COALESCE(responded, 0) + COALESCE(ignored, 0)"
+    ),
+}
+
+
+def _fold_source(db: Session, source: str, full: bool) -> int:
+    table, variant_column, success_expr, trials_expr = EXPERIMENT_SOURCES[source]
+    if full:
+        db.execute(text("DELETE FROM experiment_counter WHERE source = :source"), {"source": source})
+        db.execute(text(f"UPDATE {table} SET folded_at = NULL WHERE folded_at IS NOT NULL"))
+
+    # SKIP LOCKED: fold yang berjalan bersamaan tidak meng-klaim baris yang sama dua kali
+    return db.execute(text(f"""
+        WITH claimed AS (
+            UPDATE {table} SET folded_at = NOW()
+            WHERE id IN (
+                SELECT id FROM {table} WHERE folded_at IS NULL FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {variant_column} AS variant, {success_expr} AS successes, {trials_expr} AS trials
+        )
+        INSERT INTO experiment_counter (source, variant, successes, trials, updated_at)
+        SELECT :source, variant, SUM(successes), SUM(trials), NOW()
+        FROM claimed
+        WHERE variant IS NOT NULL
+        GROUP BY variant
+        ON CONFLICT (source, variant) DO UPDATE
+        SET successes = experiment_counter.successes + EXCLUDED.successes,
+            trials = experiment_counter.trials + EXCLUDED.trials,
+            updated_at = NOW()
+    """), {"source": source}).rowcount
+
+
+def ensure_fold_columns(db: Session):
+    """
+    Tambahkan kolom folded_at ke log di database lama (create_all tidak mengubah tabel yang sudah ada).
+    Counter lama dibuat dengan watermark id, jadi setelah kolom ditambahkan counter dibangun ulang.
+    Kolom watermark lama experiment_counter.last_log_id (NOT NULL tanpa default) dibuang.
+    """
+    db.execute(text("ALTER TABLE experiment_counter DROP COLUMN IF EXISTS last_log_id"))
+    added = False
+    for table, *_ in EXPERIMENT_SOURCES.values():
+        exists = db.execute(text("""
+            SELECT EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = :table AND column_name = 'folded_at'
+            )
+        """), {"table": table}).scalar()
+        if not exists:
+            db.execute(text(f"ALTER TABLE {table} ADD COLUMN folded_at TIMESTAMP WITH TIME ZONE"))
+            added = True
+    db.commit()
+    if added:
+        fold_experiment_logs(db, full=True)
+
+
+@invalidates("experiment_counter")
+def fold_experiment_logs(db: Session, full: bool = False) -> Dict[str, Any]:
+    """Fold baris log baru ke counter; `full=True` membangun ulang dari seluruh log."""
+    folded = {source: _fold_source(db, source, full) for source in EXPERIMENT_SOURCES}
+    db.commit()
+    return {"mode": "full" if full else "incremental", "variants_updated": folded}
+
+
+def ensure_experiment_counters(db: Session):
+    """Dipanggil saat startup: fold seluruh log sekali jika experiment_counter masih kosong (database lama)."""
+    try:
+        if not db.execute(text("SELECT EXISTS (SELECT 1 FROM experiment_counter)")).scalar():
+            result = fold_experiment_logs(db)
+            print(f"experiment_counter dibangun: {result['variants_updated']}")
+    except Exception as e:
+        db.rollback()
+        print(f"Error ensuring experiment counters: {e}")
+
+
+@cached(ttl=120, tables=("experiment_counter",))
+def get_experiment_counters(db: Session, source: str) -> List[Dict[str, Any]]:
+    if source not in EXPERIMENT_SOURCES:
+        raise ValueError(f"Unknown experiment source '{source}'")
+    rows = db.execute(text("""
+        SELECT variant, successes, trials
+        FROM experiment_counter
+        WHERE source = :source
+        ORDER BY variant
+    """), {"source": source}).fetchall()
+    return [{"variant": row.variant, "successes": int(row.successes), "trials": int(row.trials)} for row in rows]
@@ -5,6 +5,8 @@ from sqlalchemy import func, text, and_, extract
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 
+from app.cache import cached, invalidates
+
 from app.models.feedback import Feedback, FeedbackTopic, SentimentTrend
 from app.models.member import Member # Assuming Member model is in app.models.member
 from app.schemas.feedback import (
@@ -73,6 +75,7 @@ def get_feedback_list(
     return result_list
 
 
+@invalidates("feedback")
 def create_feedback(db: Session, feedback: FeedbackCreate) -> Feedback:
     db_feedback = Feedback(**feedback.model_dump(exclude_unset=True))
     db.add(db_feedback)
@@ -80,6 +83,7 @@ def create_feedback(db: Session, feedback: FeedbackCreate) -> Feedback:
     db.refresh(db_feedback)
     return db_feedback
 
+@invalidates("feedback")
 def update_feedback(db: Session, feedback_id: int, feedback: FeedbackUpdate) -> Optional[Feedback]:
     db_feedback = db.query(Feedback).filter(Feedback.feedback_id == feedback_id).first()
     if db_feedback:
@@ -89,6 +93,7 @@ def update_feedback(db: Session, feedback_id: int, feedback: FeedbackUpdate) ->
         db.refresh(db_feedback)
     return db_feedback
 
+@invalidates("feedback", "feedback_topic")
 def delete_feedback(db: Session, feedback_id: int) -> Optional[Feedback]:
     db_feedback = db.query(Feedback).filter(Feedback.feedback_id == feedback_id).first()
     if db_feedback:
@@ -100,6 +105,7 @@ def delete_feedback(db: Session, feedback_id: int) -> Optional[Feedback]:
 def get_feedback_topics_for_feedback(db: Session, feedback_id: int) -> List[FeedbackTopic]:
     return db.query(FeedbackTopic).filter(FeedbackTopic.feedback_id == feedback_id).all()
 
+@invalidates("feedback_topic")
 def create_feedback_topic(db: Session, topic: FeedbackTopicCreate) -> FeedbackTopic:
     db_topic = FeedbackTopic(**topic.model_dump())
     db.add(db_topic)
@@ -107,6 +113,7 @@ def create_feedback_topic(db: Session, topic: FeedbackTopicCreate) -> FeedbackTo
     db.refresh(db_topic)
     return db_topic
 
+@invalidates("feedback_topic")
 def update_feedback_topic(db: Session, topic_id: int, topic: FeedbackTopicUpdate) -> Optional[FeedbackTopic]:
     db_topic = db.query(FeedbackTopic).filter(FeedbackTopic.topic_id == topic_id).first()
     if db_topic:
@@ -116,6 +123,7 @@ def update_feedback_topic(db: Session, topic_id: int, topic: FeedbackTopicUpdate
         db.refresh(db_topic)
     return db_topic
 
+@invalidates("feedback_topic")
 def delete_feedback_topic(db: Session, topic_id: int) -> Optional[FeedbackTopic]:
     db_topic = db.query(FeedbackTopic).filter(FeedbackTopic.topic_id == topic_id).first()
     if db_topic:
@@ -134,6 +142,7 @@ def get_sentiment_trends(db: Session, start_date: Optional[date] = None, end_dat
         query = query.filter(SentimentTrend.feedback_type == feedback_type)
     return query.order_by(SentimentTrend.date).all()
 
+@invalidates("sentiment_trends")
 def create_sentiment_trend(db: Session, trend: SentimentTrendCreate) -> SentimentTrend:
     db_trend = SentimentTrend(**trend.model_dump())
     db.add(db_trend)
@@ -143,6 +152,7 @@ def create_sentiment_trend(db: Session, trend: SentimentTrendCreate) -> Sentimen
 
 # --- Dashboard Data Aggregation Functions ---
 
+@cached(ttl=1800, tables=("feedback",))
 def get_sentiment_dashboard_summary(db: Session) -> FeedbackDashboardSummary:
     total_feedback = db.query(func.count(Feedback.feedback_id)).scalar() or 0
     positive_count = db.query(func.count(Feedback.feedback_id)).filter(Feedback.sentiment == 'Positive').scalar() or 0
@@ -172,6 +182,7 @@ def get_sentiment_dashboard_summary(db: Session) -> FeedbackDashboardSummary:
         latest_ai_insight=latest_ai_insight_data # Will be filled by router or AI service
     )
 
+@cached(ttl=1800, tables=("feedback",))
 def get_sentiment_distribution_data(db: Session) -> List[SentimentDistribution]:
     # Aggregates feedback counts by sentiment
     results = db.query(
@@ -191,6 +202,7 @@ def get_sentiment_distribution_data(db: Session) -> List[SentimentDistribution]:
     return distribution
 
 
+@cached(ttl=1800, tables=("feedback_topic",))
 def get_topic_analysis_data(db: Session) -> List[TopicAnalysisItem]:
     # Aggregates topic frequency and average sentiment score for each topic
     results = db.query(
@@ -209,6 +221,7 @@ def get_topic_analysis_data(db: Session) -> List[TopicAnalysisItem]:
     return topic_items
 
 
+@cached(ttl=1800, tables=("sentiment_trends",))
 def get_daily_sentiment_trend_data(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[DailySentimentTrend]:
     # Fetches aggregated data from SentimentTrend table
     query = db.query(SentimentTrend)
@@ -262,6 +275,7 @@ def get_all_member_names(db: Session) -> List[str]:
     results = db.query(Member.name).order_by(Member.name).all()
     return [r.name for r in results if r.name]
 
+@cached(ttl=1800, tables=("feedback",))
 def get_monthly_sentiment_trends(db: Session, year: int = 2024) -> List[Dict[str, Any]]:
     """Get monthly sentiment trends for a specific year"""
     try:
@@ -306,6 +320,7 @@ def get_monthly_sentiment_trends(db: Session, year: int = 2024) -> List[Dict[str
         print(f"Error in get_monthly_sentiment_trends: {e}")
         return []
 
+@cached(ttl=1800, tables=("feedback", "feedback_topic"))
 def get_topic_sentiment_comparison(db: Session, year: int = 2024) -> Dict[str, List[Dict[str, Any]]]:
     """Compare topic sentiment between first and second half of the year"""
     try:
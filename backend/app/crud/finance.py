@@ -1,43 +1,170 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from datetime import datetime
+from sqlalchemy import bindparam, text
+from datetime import date, datetime, timedelta
+import base64
 import calendar
+import json
 from typing import List, Dict, Any, Optional, Tuple
 
-# === GET /api/finance/summary ===
-def get_financial_summary(db: Session, year: int):
-    current_month = datetime.now().month
+from app.cache import cached, invalidates
+from app.models.finance import IncomeTransaction, ExpenseTransaction
+from app.schemas.finance import IncomeTransactionCreate, ExpenseTransactionCreate
+
+# kind -> (tabel, kolom id, kolom kategori)
+TRANSACTION_SOURCES = {
+    "income": ("income_transaction", "income_id", "income_type"),
+    "expense": ("expense_transaction", "expense_id", "expense_category"),
+}
+
+
+# Semua agregasi bulanan dibaca dari finance_monthly_rollup (year, month, kind, category),
+# yang di-update secara inkremental saat transaksi dibuat; lihat bagian ROLLUP di bawah.
+ROLLUP_TABLES = ("finance_monthly_rollup",)
+
+
+# === Default tahun: tahun terakhir yang punya data (bukan hardcode) ===
+@cached(ttl=300, tables=ROLLUP_TABLES)
+def get_latest_finance_year(db: Session) -> int:
+    latest = db.execute(text("SELECT MAX(year) FROM finance_monthly_rollup")).scalar()
+    return int(latest) if latest is not None else datetime.now().year
+
+
+def get_latest_finance_period(db: Session) -> Optional[Tuple[int, int]]:
+    """(year, month) terakhir yang punya data di rollup, None jika rollup kosong."""
+    row = db.execute(text("""
+        SELECT year, month FROM finance_monthly_rollup ORDER BY year DESC, month DESC LIMIT 1
+    """)).first()
+    return (int(row.year), int(row.month)) if row else None
+
+
+# === GET /api/finance/series (rentang tanggal bebas) ===
+SERIES_GRANULARITIES = {
+    # granularity -> (unit date_trunc, interval generate_series, format label)
+    "week": ("week", "1 week", "IYYY-\"W\"IW"),
+    "month": ("month", "1 month", "YYYY-MM"),
+    "quarter": ("quarter", "3 months", "YYYY-\"Q\"Q"),
+}
+
+
+@cached(ttl=300, tables=("income_transaction", "expense_transaction"))
+def get_finance_series(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    granularity: str = "month",
+    category: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Income, expenses dan net per periode untuk rentang [date_from, date_to] (inklusif).
+    Satu query: kedua tabel difilter dengan range transaction_date (pakai index),
+    di-bucket dengan date_trunc, lalu periode kosong diisi dari generate_series.
+    """
+    if granularity not in SERIES_GRANULARITIES:
+        raise ValueError(f"Unsupported granularity '{granularity}'")
+    if date_to < date_from:
+        raise ValueError("date_to must be on or after date_from")
+    unit, step, label_format = SERIES_GRANULARITIES[granularity]
+
+    params: Dict[str, Any] = {"date_from": date_from, "date_to": date_to}
+    category_filters = {"income": "", "expense": ""}
+    if category:
+        params["db_category"] = category.lower().replace(" ", "_")
+        for kind, (_, _, category_column) in TRANSACTION_SOURCES.items():
+            category_filters[kind] = f" AND {category_column} = :db_category"
+
+    query = text(f"""
+        WITH periods AS (
+            SELECT generate_series(
+                date_trunc('{unit}', CAST(:date_from AS DATE)),
+                date_trunc('{unit}', CAST(:date_to AS DATE)),
+                INTERVAL '{step}'
+            ) AS period_start
+        ),
+        totals AS (
+            SELECT date_trunc('{unit}', transaction_date) AS period_start,
+                   SUM(CASE WHEN kind = 'income' THEN amount ELSE 0 END) AS income,
+                   SUM(CASE WHEN kind = 'expense' THEN amount ELSE 0 END) AS expenses
+            FROM (
+                SELECT 'income' AS kind, transaction_date, amount
+                FROM income_transaction
+                WHERE transaction_date >= :date_from AND transaction_date <= :date_to{category_filters["income"]}
+                UNION ALL
+                SELECT 'expense' AS kind, transaction_date, amount
+                FROM expense_transaction
+                WHERE transaction_date >= :date_from AND transaction_date <= :date_to{category_filters["expense"]}
+            ) t
+            GROUP BY 1
+        )
+        SELECT p.period_start,
+               TO_CHAR(p.period_start, '{label_format}') AS period,
+               COALESCE(t.income, 0) AS income,
+               COALESCE(t.expenses, 0) AS expenses
+        FROM periods p
+        LEFT JOIN totals t ON t.period_start = p.period_start
+        ORDER BY p.period_start
+    """)
+    return [{
+        "period": row.period,
+        "period_start": row.period_start.strftime("%Y-%m-%d"),
+        "income": int(row.income),
+        "expenses": int(row.expenses),
+        "net": int(row.income) - int(row.expenses)
+    } for row in db.execute(query, params).fetchall()]
+
 
-    income = db.execute(text("""
-        SELECT COALESCE(SUM(amount), 0) as total
-        FROM income_transaction
-        WHERE EXTRACT(MONTH FROM transaction_date) = :month
-          AND EXTRACT(YEAR FROM transaction_date) = :year
-    """), {"month": current_month, "year": year}).scalar()
+# === GET /api/finance/year-comparison ===
+@cached(ttl=300, tables=ROLLUP_TABLES)
+def get_year_comparison(db: Session, years: Tuple[int, ...]) -> Dict[str, Any]:
+    """Income/expenses bulanan untuk beberapa tahun sekaligus dari rollup (satu query, bukan satu request per tahun)."""
+    query = text("""
+        SELECT year, month,
+               SUM(CASE WHEN kind = 'income' THEN total_amount ELSE 0 END) AS income,
+               SUM(CASE WHEN kind = 'expense' THEN total_amount ELSE 0 END) AS expenses
+        FROM finance_monthly_rollup
+        WHERE year IN :years
+        GROUP BY year, month
+    """).bindparams(bindparam("years", expanding=True))
+    cells = {(int(row.year), int(row.month)): row for row in db.execute(query, {"years": list(years)}).fetchall()}
+
+    monthly = []
+    for m in range(1, 13):
+        entry: Dict[str, Any] = {"month": calendar.month_abbr[m]}
+        for year in years:
+            row = cells.get((year, m))
+            entry[f"income_{year}"] = int(row.income) if row else 0
+            entry[f"expenses_{year}"] = int(row.expenses) if row else 0
+        monthly.append(entry)
+
+    totals = []
+    for year in years:
+        income = sum(entry[f"income_{year}"] for entry in monthly)
+        expenses = sum(entry[f"expenses_{year}"] for entry in monthly)
+        totals.append({"year": year, "income": income, "expenses": expenses, "net": income - expenses})
+
+    return {"years": list(years), "monthly": monthly, "totals": totals}
 
-    expenses = db.execute(text("""
-        SELECT COALESCE(SUM(amount), 0) as total
-        FROM expense_transaction
-        WHERE EXTRACT(MONTH FROM transaction_date) = :month
-          AND EXTRACT(YEAR FROM transaction_date) = :year
-    """), {"month": current_month, "year": year}).scalar()
 
+# === GET /api/finance/summary ===
+@cached(ttl=60, tables=ROLLUP_TABLES)
+def get_financial_summary(db: Session, year: int):
+    current_month = datetime.now().month
     prev_month = current_month - 1 if current_month > 1 else 12
     prev_year = year if current_month > 1 else year - 1
 
-    prev_income = db.execute(text("""
-        SELECT COALESCE(SUM(amount), 0) as total
-        FROM income_transaction
-        WHERE EXTRACT(MONTH FROM transaction_date) = :month
-          AND EXTRACT(YEAR FROM transaction_date) = :year
-    """), {"month": prev_month, "year": prev_year}).scalar()
-
-    prev_expenses = db.execute(text("""
-        SELECT COALESCE(SUM(amount), 0) as total
-        FROM expense_transaction
-        WHERE EXTRACT(MONTH FROM transaction_date) = :month
-          AND EXTRACT(YEAR FROM transaction_date) = :year
-    """), {"month": prev_month, "year": prev_year}).scalar()
+    row = db.execute(text("""
+        SELECT
+            COALESCE(SUM(CASE WHEN kind = 'income' AND year = :year AND month = :month THEN total_amount END), 0) AS income,
+            COALESCE(SUM(CASE WHEN kind = 'expense' AND year = :year AND month = :month THEN total_amount END), 0) AS expenses,
+            COALESCE(SUM(CASE WHEN kind = 'income' AND year = :prev_year AND month = :prev_month THEN total_amount END), 0) AS prev_income,
+            COALESCE(SUM(CASE WHEN kind = 'expense' AND year = :prev_year AND month = :prev_month THEN total_amount END), 0) AS prev_expenses
+        FROM finance_monthly_rollup
+        WHERE (year = :year AND month = :month) OR (year = :prev_year AND month = :prev_month)
+    """), {"year": year, "month": current_month, "prev_year": prev_year, "prev_month": prev_month}).one()
+
+    income = float(row.income)
+    expenses = float(row.expenses)
+    prev_income = float(row.prev_income)
+    prev_expenses = float(row.prev_expenses)
 
     profit_margin = ((income - expenses) / income * 100) if income > 0 else 0
     prev_profit_margin = ((prev_income - prev_expenses) / prev_income * 100) if prev_income > 0 else 0
@@ -52,264 +179,513 @@ def get_financial_summary(db: Session, year: int):
     }
 
 
-# === GET /api/finance/income-vs-expenses ===
-def get_income_vs_expenses(db: Session, year: int):
+# === Income-vs-expenses, breakdown & analysis (dihitung di app/services/finance_analytics) ===
+def get_year_rollup(db: Session, year: int) -> List[Dict[str, Any]]:
+    """Semua sel rollup (income + expense) satu tahun; paling banyak 12 x jumlah kategori per jenis."""
     query = text("""
-        WITH months AS (SELECT generate_series(1, 12) AS month_num),
-        income_data AS (
-            SELECT EXTRACT(MONTH FROM transaction_date) as month_num, SUM(amount) as income
-            FROM income_transaction
-            WHERE EXTRACT(YEAR FROM transaction_date) = :year
-            GROUP BY month_num
-        ),
-        expense_data AS (
-            SELECT EXTRACT(MONTH FROM transaction_date) as month_num, SUM(amount) as expenses
-            FROM expense_transaction
-            WHERE EXTRACT(YEAR FROM transaction_date) = :year
-            GROUP BY month_num
-        )
-        SELECT m.month_num, COALESCE(i.income, 0) as income, COALESCE(e.expenses, 0) as expenses
-        FROM months m
-        LEFT JOIN income_data i ON m.month_num = i.month_num
-        LEFT JOIN expense_data e ON m.month_num = e.month_num
-        ORDER BY m.month_num
+        SELECT kind, month, category, total_amount
+        FROM finance_monthly_rollup
+        WHERE year = :year
+        ORDER BY kind, month, category
     """)
-    result = db.execute(query, {"year": year}).fetchall()
     return [{
-        "month": calendar.month_abbr[int(row.month_num)],
-        "income": int(row.income),
-        "expenses": int(row.expenses)
-    } for row in result]
+        "kind": row.kind,
+        "month": int(row.month),
+        "category": row.category,
+        "amount": float(row.total_amount)
+    } for row in db.execute(query, {"year": year}).fetchall()]
 
 
-# === GET /api/finance/income-breakdown ===
-def get_income_breakdown(db: Session, year: int):
+def get_rollup_cells(db: Session, after: Tuple[int, int], through: Tuple[int, int]) -> List[Dict[str, Any]]:
+    """Sel rollup untuk bulan (year, month) > after dan <= through; dipakai refit forecast inkremental."""
     query = text("""
-        SELECT income_type, SUM(amount) as total_amount
-        FROM income_transaction
-        WHERE EXTRACT(YEAR FROM transaction_date) = :year
-        GROUP BY income_type
-        ORDER BY total_amount DESC
+        SELECT kind, category, year, month, total_amount
+        FROM finance_monthly_rollup
+        WHERE (year, month) > (:after_year, :after_month)
+          AND (year, month) <= (:through_year, :through_month)
+        ORDER BY year, month
     """)
-    results = db.execute(query, {"year": year}).fetchall()
-    total = sum(float(row.total_amount) for row in results)
-    colors = {
-        "membership": "#3b82f6",
-        "personal_training": "#10b981",
-        "class_fee": "#f59e0b",
-        "product_sale": "#ef4444"
+    params = {
+        "after_year": after[0], "after_month": after[1],
+        "through_year": through[0], "through_month": through[1],
     }
     return [{
-        "name": row.income_type.replace("_", " ").title(),
-        "value": round(float(row.total_amount) / total * 100, 1) if total > 0 else 0,
-        "amount": int(row.total_amount),
-        "color": colors.get(row.income_type, "#6b7280")
-    } for row in results]
+        "kind": row.kind,
+        "category": row.category,
+        "year": int(row.year),
+        "month": int(row.month),
+        "amount": float(row.total_amount)
+    } for row in db.execute(query, params).fetchall()]
 
 
-# === GET /api/finance/expense-breakdown ===
-def get_expense_breakdown(db: Session, year: int):
-    query = text("""
-        SELECT expense_category, SUM(amount) as total_amount
-        FROM expense_transaction
-        WHERE EXTRACT(YEAR FROM transaction_date) = :year
-        GROUP BY expense_category
-        ORDER BY total_amount DESC
+# === GET /api/finance/recent-transactions ===
+def get_recent_transactions(db: Session, limit: int):
+    # Satu query: N baris terbaru dari masing-masing tabel (index (transaction_date, id)),
+    # di-merge dengan urutan yang sama seperti stream /transactions lalu dipotong tepat N baris.
+    branches = [f"""
+        (SELECT
+            {id_column} AS id, -- Tambahkan ID untuk kunci unik di frontend
+            '{kind}' as type,
+            {category_column} as category,
+            amount,
+            payment_method,
+            transaction_date,
+            description
+        FROM {table}
+        ORDER BY transaction_date DESC, {id_column} DESC
+        LIMIT :limit)
+    """ for kind, (table, id_column, category_column) in TRANSACTION_SOURCES.items()]
+    query = text(f"""
+        SELECT * FROM ({" UNION ALL ".join(branches)}) merged
+        ORDER BY transaction_date DESC, type DESC, id DESC
+        LIMIT :limit
     """)
-    results = db.execute(query, {"year": year}).fetchall()
-    total = sum(float(row.total_amount) for row in results)
-    colors = {
-        "staff_salary": "#8b5cf6",
-        "rent": "#06b6d4",
-        "utilities": "#84cc16",
-        "equipment": "#f97316",
-        "marketing": "#ec4899",
-        "maintenance": "#6b7280"
-    }
+    results = db.execute(query, {"limit": limit}).fetchall()
+
     return [{
-        "name": row.expense_category.replace("_", " ").title(),
-        "value": round(float(row.total_amount) / total * 100, 1) if total > 0 else 0,
-        "amount": int(row.total_amount),
-        "color": colors.get(row.expense_category, "#6b7280")
+        # Penting: Gabungkan ID dan tipe untuk memastikan keunikan key di React
+        "id": f"{row.type}_{row.id}",
+        "date": row.transaction_date.strftime("%Y-%m-%d"),
+        "type": row.type,
+        "category": row.category.replace("_", " ").title(),
+        "amount": int(row.amount),
+        "payment_method": row.payment_method,
+        "description": row.description,
+        "status": "Completed" # Asumsi status default
     } for row in results]
 
 
-# === GET /api/finance/recent-transactions ===
-def get_recent_transactions(db: Session, limit: int):
-    income_query = text("""
-        SELECT 
-            income_id AS id, -- Tambahkan ID untuk kunci unik di frontend
-            'income' as type, 
-            income_type as category, 
-            amount, 
-            payment_method, 
-            transaction_date, 
-            description,
-            created_at -- Tambahkan created_at untuk sorting jika perlu
-        FROM income_transaction
-        ORDER BY transaction_date DESC, created_at DESC
-        LIMIT :limit
-    """)
-    expense_query = text("""
-        SELECT 
-            expense_id AS id, -- Tambahkan ID untuk kunci unik di frontend
-            'expense' as type, 
-            expense_category as category, 
-            amount, 
-            payment_method, 
-            transaction_date, 
-            description,
-            created_at -- Tambahkan created_at untuk sorting jika perlu
-        FROM expense_transaction
-        ORDER BY transaction_date DESC, created_at DESC
-        LIMIT :limit
-    """)
-    income_results = db.execute(income_query, {"limit": limit//2}).fetchall()
-    expense_results = db.execute(expense_query, {"limit": limit//2}).fetchall()
-
-    all_data = []
-    for row in income_results + expense_results:
-        all_data.append({
-            # Penting: Gabungkan ID dan tipe untuk memastikan keunikan key di React
-            "id": f"{row.type}_{row.id}", 
-            "date": row.transaction_date.strftime("%Y-%m-%d"),
-            "type": row.type,
-            "category": row.category.replace("_", " ").title(),
-            "amount": int(row.amount),
-            "payment_method": row.payment_method,
-            "description": row.description,
-            "status": "Completed" # Asumsi status default
-        })
-    # Urutkan berdasarkan tanggal, lalu ID untuk konsistensi
-    return sorted(all_data, key=lambda x: (x["date"], x["id"]), reverse=True)[:limit]
+# === Category facets (dropdown filter /api/finance/transactions) ===
+@cached(ttl=300, tables=ROLLUP_TABLES)
+def get_category_facets(db: Session, year: Optional[int], type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Kategori per tipe transaksi untuk satu tahun (atau semua tahun jika `year` None) beserta jumlah transaksinya.
+    Rollup bulanan sudah di-update setiap insert, jadi facet cukup dibaca dari sana.
+    """
+    query_str = """
+        SELECT kind, category, SUM(txn_count) AS count
+        FROM finance_monthly_rollup
+        WHERE (CAST(:year AS INTEGER) IS NULL OR year = :year)
+    """
+    params: Dict[str, Any] = {"year": year}
+    if type:
+        query_str += " AND kind = :kind"
+        params["kind"] = type
+    query_str += " GROUP BY kind, category ORDER BY kind, category"
+
+    return [{
+        "type": row.kind,
+        "category": row.category,
+        "name": row.category.replace("_", " ").title(),
+        "count": int(row.count)
+    } for row in db.execute(text(query_str), params).fetchall()]
 
 
 # === NEW: GET /api/finance/transactions (Filtered Transactions) ===
+def encode_transaction_cursor(row: Dict[str, Any]) -> str:
+    """Token opaque untuk posisi (date, type, id) dari baris terakhir di satu halaman."""
+    payload = {"d": row["date"].isoformat(), "t": row["type"], "i": row["raw_id"]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_transaction_cursor(cursor: str) -> Tuple[date, str, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        kind = payload["t"]
+        if kind not in TRANSACTION_SOURCES:
+            raise ValueError(kind)
+        return date.fromisoformat(payload["d"]), kind, int(payload["i"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _keyset_predicate(kind: str, id_column: str, cursor: Tuple[date, str, int]) -> str:
+    """
+    Urutan stream: (transaction_date, type, id) DESC. Karena `type` konstan di tiap tabel,
+    predikat "setelah cursor" bisa ditulis per tabel sehingga index (transaction_date, id) tetap terpakai.
+    """
+    _, cursor_kind, _ = cursor
+    if kind == cursor_kind:
+        return f"(transaction_date, {id_column}) < (:cursor_date, :cursor_id)"
+    if kind < cursor_kind:
+        return "transaction_date <= :cursor_date"
+    return "transaction_date < :cursor_date"
+
+
 def get_filtered_transactions(
     db: Session,
     type: Optional[str] = None,
     category: Optional[str] = None,
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
     limit: int = 20,
-    offset: int = 0
-) -> Tuple[List[Dict[str, Any]], List[str]]:
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    year: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[str], Optional[str]]:
     """
-    Fetches filtered transactions and a list of available categories.
+    Fetches filtered transactions, a list of available categories and the cursor for the next page.
+    Income dan expense di-merge di database (UNION ALL dari dua scan index yang sudah terurut),
+    jadi setiap halaman cursor hanya membaca `limit + 1` baris per tabel.
     """
-    transactions = []
-    all_categories_set = set() # Menggunakan set untuk menyimpan kategori unik
+    # asyncpg tidak meng-cast string ke DATE (psycopg2 membiarkan Postgres yang cast), jadi kirim date
+    if isinstance(date_from, str):
+        date_from = date.fromisoformat(date_from)
+    if isinstance(date_to, str):
+        date_to = date.fromisoformat(date_to)
+
+    keyset = decode_transaction_cursor(cursor) if cursor else None
+    if keyset:
+        offset = 0  # cursor menggantikan offset
 
     # Convert category from frontend format (Title Case with spaces) to database format (snake_case)
     db_category = None
     if category:
         db_category = category.lower().replace(" ", "_")
 
+    # Tanpa rentang tanggal dan tanpa `year` -> default ke tahun terakhir yang punya data.
+    # Jika date_from/date_to diisi, rentang itu saja yang dipakai (boleh lintas tahun).
+    if year is None and not date_from and not date_to:
+        year = get_latest_finance_year(db)
 
-    # --- Fetch Income Transactions ---
-    if type == "income" or type is None:
-        income_query_str = """
-            SELECT
-                income_id AS id,
-                transaction_date AS date,
-                income_type AS category,
-                amount,
-                payment_method,
-                description,
-                'income' AS type,
-                'Completed' AS status -- Asumsi status default
-            FROM income_transaction
-            WHERE 1=1
-        """
-        income_params = {}
-
+    params: Dict[str, Any] = {
+        "branch_limit": offset + limit + 1,
+        "limit": limit + 1,
+        "offset": offset,
+    }
+    if year is not None:
+        # Sargable range, bukan EXTRACT
+        params["year_start"] = date(year, 1, 1)
+        params["year_end"] = date(year + 1, 1, 1)
+    if db_category:
+        params["db_category"] = db_category
+    if date_from:
+        params["date_from"] = date_from
+    if date_to:
+        params["date_to"] = date_to
+    if keyset:
+        params["cursor_date"], _, params["cursor_id"] = keyset
+
+    branches = []
+    for kind, (table, id_column, category_column) in TRANSACTION_SOURCES.items():
+        if type is not None and type != kind:
+            continue
+
+        conditions = ["1=1"]
+        if year is not None:
+            conditions += ["transaction_date >= :year_start", "transaction_date < :year_end"]
         if db_category: # Use db_category for filtering
-            income_query_str += " AND income_type = :db_category"
-            income_params["db_category"] = db_category
+            conditions.append(f"{category_column} = :db_category")
         if date_from:
-            income_query_str += " AND transaction_date >= :date_from"
-            income_params["date_from"] = date_from
+            conditions.append("transaction_date >= :date_from")
         if date_to:
-            income_query_str += " AND transaction_date <= :date_to"
-            income_params["date_to"] = date_to
-        
-        # Add filtering specific to the year 2024 for data consistency based on provided SQL
-        income_query_str += " AND EXTRACT(YEAR FROM transaction_date) = 2024"
-
-        # Fetch all income categories for the filter dropdown (still fetches original DB categories)
-        income_categories_query = text("SELECT DISTINCT income_type FROM income_transaction WHERE EXTRACT(YEAR FROM transaction_date) = 2024")
-        income_categories_results = db.execute(income_categories_query).fetchall()
-        for row in income_categories_results:
-            all_categories_set.add(row.income_type)
-
-        # Order for the main transaction list
-        income_query_str += " ORDER BY transaction_date DESC, income_id DESC"
-        
-        income_results = db.execute(text(income_query_str), income_params).fetchall()
-        for row in income_results:
-            row_dict = dict(row._mapping)
-            # Format category for frontend display
-            row_dict['category'] = row_dict['category'].replace("_", " ").title() 
-            row_dict['id'] = f"income_{row_dict['id']}" 
-            transactions.append(row_dict)
+            conditions.append("transaction_date <= :date_to")
+        if keyset:
+            conditions.append(_keyset_predicate(kind, id_column, keyset))
 
-    # --- Fetch Expense Transactions ---
-    if type == "expense" or type is None:
-        expense_query_str = """
-            SELECT
-                expense_id AS id,
+        branches.append(f"""
+            (SELECT
+                {id_column} AS raw_id,
                 transaction_date AS date,
-                expense_category AS category,
+                {category_column} AS category,
                 amount,
                 payment_method,
                 description,
-                'expense' AS type,
+                '{kind}' AS type,
                 'Completed' AS status -- Asumsi status default
-            FROM expense_transaction
-            WHERE 1=1
-        """
-        expense_params = {}
-
-        if db_category: # Use db_category for filtering
-            expense_query_str += " AND expense_category = :db_category"
-            expense_params["db_category"] = db_category
-        if date_from:
-            expense_query_str += " AND transaction_date >= :date_from"
-            expense_params["date_from"] = date_from
-        if date_to:
-            expense_query_str += " AND transaction_date <= :date_to"
-            expense_params["date_to"] = date_to
-
-        # Add filtering specific to the year 2024 for data consistency
-        expense_query_str += " AND EXTRACT(YEAR FROM transaction_date) = 2024"
-
-        # Fetch all expense categories for the filter dropdown (still fetches original DB categories)
-        expense_categories_query = text("SELECT DISTINCT expense_category FROM expense_transaction WHERE EXTRACT(YEAR FROM transaction_date) = 2024")
-        expense_categories_results = db.execute(expense_categories_query).fetchall()
-        for row in expense_categories_results:
-            all_categories_set.add(row.expense_category)
-
-        # Order for the main transaction list
-        expense_query_str += " ORDER BY transaction_date DESC, expense_id DESC"
+            FROM {table}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY transaction_date DESC, {id_column} DESC
+            LIMIT :branch_limit)
+        """)
 
-        expense_results = db.execute(text(expense_query_str), expense_params).fetchall()
-        for row in expense_results:
-            row_dict = dict(row._mapping)
+    transactions = []
+    next_cursor = None
+    if branches:
+        query = text(f"""
+            SELECT * FROM ({" UNION ALL ".join(branches)}) merged
+            ORDER BY date DESC, type DESC, raw_id DESC
+            LIMIT :limit OFFSET :offset
+        """)
+        rows = [dict(row._mapping) for row in db.execute(query, params).fetchall()]
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_transaction_cursor(rows[-1])
+        for row_dict in rows:
             # Format category for frontend display
             row_dict['category'] = row_dict['category'].replace("_", " ").title()
-            row_dict['id'] = f"expense_{row_dict['id']}"
+            row_dict['id'] = f"{row_dict['type']}_{row_dict.pop('raw_id')}"
             transactions.append(row_dict)
 
-    # --- Combine and Sort All Transactions ---
-    # Jika type adalah None (ingin semua transaksi), gabungkan dan sort
-    # Jika type ditentukan, transactions sudah hanya berisi tipe itu dan perlu diurutkan
-    transactions.sort(key=lambda x: (x['date'], x['id']), reverse=True)
+    # Kategori untuk dropdown filter diambil dari facet (rollup), tanpa menyentuh tabel transaksi
+    categories = {facet["name"] for facet in get_category_facets(db, year, type)}
+
+    return transactions, sorted(categories), next_cursor
+
+
+# ========================================
+# ROLLUP: finance_monthly_rollup
+# ========================================
+_ROLLUP_UPSERT = text("""
+    INSERT INTO finance_monthly_rollup (year, month, kind, category, total_amount, txn_count, updated_at)
+    VALUES (:year, :month, :kind, :category, :amount, :count, NOW())
+    ON CONFLICT (year, month, kind, category) DO UPDATE
+    SET total_amount = finance_monthly_rollup.total_amount + EXCLUDED.total_amount,
+        txn_count = finance_monthly_rollup.txn_count + EXCLUDED.txn_count,
+        updated_at = NOW()
+""")
+
+
+def apply_to_rollup(db: Session, kind: str, category: str, transaction_date: date, amount: float, count: int = 1):
+    """Tambahkan delta ke sel rollup. Tidak commit: dipanggil di transaksi yang sama dengan insert-nya."""
+    db.execute(_ROLLUP_UPSERT, {
+        "year": transaction_date.year,
+        "month": transaction_date.month,
+        "kind": kind,
+        "category": category,
+        "amount": amount,
+        "count": count,
+    })
+
+
+@invalidates("finance_monthly_rollup")
+def rebuild_finance_rollup(db: Session, year: Optional[int] = None) -> int:
+    """Hitung ulang rollup dari tabel transaksi (semua tahun, atau satu tahun saja)."""
+    params: Dict[str, Any] = {}
+    source_filter = ""
+    rollup_filter = ""
+    if year is not None:
+        source_filter = "WHERE transaction_date >= :start AND transaction_date < :end"
+        rollup_filter = "WHERE year = :year"
+        params = {"year": year, "start": date(year, 1, 1), "end": date(year + 1, 1, 1)}
+
+    db.execute(text(f"DELETE FROM finance_monthly_rollup {rollup_filter}"), params)
+    for kind, (table, _, category_column) in TRANSACTION_SOURCES.items():
+        db.execute(text(f"""
+            INSERT INTO finance_monthly_rollup (year, month, kind, category, total_amount, txn_count, updated_at)
+            SELECT CAST(EXTRACT(YEAR FROM transaction_date) AS INTEGER),
+                   CAST(EXTRACT(MONTH FROM transaction_date) AS INTEGER),
+                   '{kind}', {category_column}, SUM(amount), COUNT(*), NOW()
+            FROM {table}
+            {source_filter}
+            GROUP BY 1, 2, {category_column}
+        """), params)
+    db.commit()
+    return db.execute(text(f"SELECT COUNT(*) FROM finance_monthly_rollup {rollup_filter}"), params).scalar()
+
+
+def ensure_finance_rollup(db: Session):
+    """Dipanggil saat startup: isi rollup sekali jika tabelnya masih kosong (database lama)."""
+    try:
+        has_rollup = db.execute(text("SELECT EXISTS (SELECT 1 FROM finance_monthly_rollup)")).scalar()
+        if not has_rollup:
+            rows = rebuild_finance_rollup(db)
+            print(f"finance_monthly_rollup dibangun ulang: {rows} baris")
+    except Exception as e:
+        db.rollback()
+        print(f"Error ensuring finance rollup: {e}")
+
+
+# === POST /api/finance/income ===
+@invalidates("income_transaction", "finance_monthly_rollup")
+def create_income_transaction(db: Session, transaction: IncomeTransactionCreate):
+    db_transaction = IncomeTransaction(**transaction.model_dump())
+    db.add(db_transaction)
+    apply_to_rollup(db, "income", db_transaction.income_type, db_transaction.transaction_date, db_transaction.amount)
+    db.commit()
+    db.refresh(db_transaction)
+    return db_transaction
+
+
+# === POST /api/finance/expenses ===
+@invalidates("expense_transaction", "finance_monthly_rollup")
+def create_expense_transaction(db: Session, transaction: ExpenseTransactionCreate):
+    db_transaction = ExpenseTransaction(**transaction.model_dump())
+    db.add(db_transaction)
+    apply_to_rollup(db, "expense", db_transaction.expense_category, db_transaction.transaction_date, db_transaction.amount)
+    db.commit()
+    db.refresh(db_transaction)
+    return db_transaction
+
+
+# ========================================
+# BUDGET & TARGET: actual_amount / actual_value
+# ========================================
+# Watermark updated_at rollup yang sudah direkonsiliasi oleh proses ini (None = belum pernah -> full).
+# Update bersifat idempoten (SET, bukan +=), jadi overlap kecil aman dan menutup celah
+# transaksi yang commit belakangan dengan NOW() lebih awal.
+_budget_reconcile_watermark: Optional[datetime] = None
+RECONCILE_OVERLAP = timedelta(minutes=1)
+
+# target_type -> ekspresi actual dari total bulanan rollup
+TARGET_ACTUALS = {
+    "revenue": "m.income",
+    "income": "m.income",
+    "expense": "m.expenses",
+    "expenses": "m.expenses",
+    "profit": "m.income - m.expenses",
+}
+
+
+@invalidates("budget_allocation", "financial_target")
+def reconcile_budget_actuals(db: Session, full: bool = False) -> Dict[str, Any]:
+    """
+    Isi budget_allocation.actual_amount (expense per kategori) dan financial_target.actual_value
+    dari finance_monthly_rollup, hanya untuk bulan yang rollup-nya berubah sejak rekonsiliasi terakhir.
+    """
+    global _budget_reconcile_watermark
+
+    new_watermark = db.execute(text("SELECT MAX(updated_at) FROM finance_monthly_rollup")).scalar()
+    since = None if full or _budget_reconcile_watermark is None else _budget_reconcile_watermark - RECONCILE_OVERLAP
+    changed_filter = ""
+    params: Dict[str, Any] = {}
+    if since is not None:
+        changed_filter = "AND (year, month) IN (SELECT year, month FROM finance_monthly_rollup WHERE updated_at > :since)"
+        params["since"] = since
+
+    budgets = db.execute(text(f"""
+        UPDATE budget_allocation b
+        SET actual_amount = COALESCE((
+            SELECT r.total_amount FROM finance_monthly_rollup r
+            WHERE r.kind = 'expense' AND r.year = b.budget_year
+              AND r.month = b.budget_month AND r.category = b.category
+        ), 0)
+        WHERE (b.budget_year, b.budget_month) IN (
+            SELECT year, month FROM finance_monthly_rollup WHERE 1=1 {changed_filter}
+        )
+    """), params).rowcount
+
+    target_cases = " ".join(f"WHEN '{target_type}' THEN {expression}" for target_type, expression in TARGET_ACTUALS.items())
+    targets = db.execute(text(f"""
+        UPDATE financial_target t
+        SET actual_value = CASE t.target_type {target_cases} ELSE t.actual_value END
+        FROM (
+            SELECT year, month,
+                   SUM(CASE WHEN kind = 'income' THEN total_amount ELSE 0 END) AS income,
+                   SUM(CASE WHEN kind = 'expense' THEN total_amount ELSE 0 END) AS expenses
+            FROM finance_monthly_rollup
+            WHERE 1=1 {changed_filter}
+            GROUP BY year, month
+        ) m
+        WHERE m.year = t.target_year AND m.month = t.target_month
+    """), params).rowcount
+
+    db.commit()
+    if new_watermark is not None:
+        _budget_reconcile_watermark = new_watermark
+    return {
+        "mode": "full" if since is None else "incremental",
+        "since": since.isoformat() if since else None,
+        "budgets_updated": budgets,
+        "targets_updated": targets,
+    }
+
+
+# === GET /api/finance/budget/variance ===
+@cached(ttl=300, tables=("budget_allocation", "financial_target"))
+def get_budget_variance(db: Session, year: int, month: Optional[int] = None) -> Dict[str, Any]:
+    """Allocated vs actual per kategori (dan target vs actual) dari kolom yang sudah direkonsiliasi."""
+    period_filter = "budget_year = :year"
+    target_filter = "target_year = :year"
+    params: Dict[str, Any] = {"year": year}
+    if month:
+        period_filter += " AND budget_month = :month"
+        target_filter += " AND target_month = :month"
+        params["month"] = month
+
+    budget_rows = db.execute(text(f"""
+        SELECT category, SUM(allocated_amount) AS allocated, SUM(actual_amount) AS actual
+        FROM budget_allocation
+        WHERE {period_filter}
+        GROUP BY category
+        ORDER BY category
+    """), params).fetchall()
+    target_rows = db.execute(text(f"""
+        SELECT target_type, SUM(target_value) AS target, SUM(actual_value) AS actual
+        FROM financial_target
+        WHERE {target_filter}
+        GROUP BY target_type
+        ORDER BY target_type
+    """), params).fetchall()
+
+    def variance(planned: float, actual: float) -> Dict[str, Any]:
+        return {
+            "variance": int(actual - planned),
+            "variance_percentage": round((actual - planned) / planned * 100, 1) if planned else 0,
+        }
+
+    budgets = []
+    for row in budget_rows:
+        allocated, actual = float(row.allocated or 0), float(row.actual or 0)
+        budgets.append({
+            "category": row.category.replace("_", " ").title(),
+            "allocated": int(allocated),
+            "actual": int(actual),
+            **variance(allocated, actual),
+            "status": "over_budget" if actual > allocated else "within_budget",
+        })
+
+    targets = []
+    for row in target_rows:
+        target, actual = float(row.target or 0), float(row.actual or 0)
+        targets.append({
+            "target_type": row.target_type,
+            "target": int(target),
+            "actual": int(actual),
+            **variance(target, actual),
+            "achievement_percentage": round(actual / target * 100, 1) if target else 0,
+        })
 
+    total_allocated = sum(b["allocated"] for b in budgets)
+    total_actual = sum(b["actual"] for b in budgets)
+    return {
+        "year": year,
+        "month": month,
+        "budgets": budgets,
+        "targets": targets,
+        "total_allocated": total_allocated,
+        "total_actual": total_actual,
+        **variance(total_allocated, total_actual),
+    }
 
-    # --- Apply Pagination (Limit and Offset) ---
-    final_transactions = transactions[offset : offset + limit]
 
-    # Convert category names for the return list to Title Case
-    formatted_categories_list = [cat.replace("_", " ").title() for cat in all_categories_set]
+# === GET /api/finance/budget/burn-down ===
+@cached(ttl=300, tables=("budget_allocation",))
+def get_budget_burn_down(db: Session, year: int, category: Optional[str] = None) -> Dict[str, Any]:
+    """Budget tahunan kumulatif vs realisasi kumulatif per bulan (sisa budget yang 'terbakar')."""
+    params: Dict[str, Any] = {"year": year}
+    category_filter = ""
+    if category:
+        category_filter = " AND category = :db_category"
+        params["db_category"] = category.lower().replace(" ", "_")
+
+    rows = db.execute(text(f"""
+        SELECT budget_month, SUM(allocated_amount) AS allocated, SUM(actual_amount) AS actual
+        FROM budget_allocation
+        WHERE budget_year = :year{category_filter}
+        GROUP BY budget_month
+    """), params).fetchall()
+    by_month = {int(row.budget_month): row for row in rows}
+
+    annual_budget = sum(float(row.allocated or 0) for row in rows)
+    cumulative_allocated = 0.0
+    cumulative_actual = 0.0
+    burn_down = []
+    for m in range(1, 13):
+        row = by_month.get(m)
+        cumulative_allocated += float(row.allocated or 0) if row else 0
+        cumulative_actual += float(row.actual or 0) if row else 0
+        burn_down.append({
+            "month": calendar.month_abbr[m],
+            "planned_cumulative": int(cumulative_allocated),
+            "actual_cumulative": int(cumulative_actual),
+            "remaining": int(annual_budget - cumulative_actual),
+        })
 
-    return final_transactions, sorted(list(formatted_categories_list))
\ No newline at end of file
+    return {
+        "year": year,
+        "category": category,
+        "annual_budget": int(annual_budget),
+        "spent": int(cumulative_actual),
+        "burn_down": burn_down,
+    }
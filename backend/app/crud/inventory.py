@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, case, text, and_
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Any, Optional, Tuple
+from app.cache import cached, invalidates
 from app.models.inventory import (
     EquipmentCategory,
     Supplier,
@@ -44,6 +45,7 @@ def get_equipment_category(db: Session, category_id: int):
 def get_equipment_categories(db: Session, skip: int = 0, limit: int = 100):
     return db.query(EquipmentCategory).offset(skip).limit(limit).all()
 
+@invalidates("equipment_categories")
 def create_equipment_category(db: Session, category: EquipmentCategoryCreate):
     db_category = EquipmentCategory(**category.model_dump())
     db.add(db_category)
@@ -51,6 +53,7 @@ def create_equipment_category(db: Session, category: EquipmentCategoryCreate):
     db.refresh(db_category)
     return db_category
 
+@invalidates("equipment_categories")
 def update_equipment_category(db: Session, category_id: int, category: EquipmentCategoryUpdate):
     db_category = db.query(EquipmentCategory).filter(EquipmentCategory.category_id == category_id).first()
     if db_category:
@@ -60,6 +63,7 @@ def update_equipment_category(db: Session, category_id: int, category: Equipment
         db.refresh(db_category)
     return db_category
 
+@invalidates("equipment_categories")
 def delete_equipment_category(db: Session, category_id: int):
     db_category = db.query(EquipmentCategory).filter(EquipmentCategory.category_id == category_id).first()
     if db_category:
@@ -74,6 +78,7 @@ def get_supplier(db: Session, supplier_id: int):
 def get_suppliers(db: Session, skip: int = 0, limit: int = 100):
     return db.query(Supplier).offset(skip).limit(limit).all()
 
+@invalidates("suppliers")
 def create_supplier(db: Session, supplier: SupplierCreate):
     db_supplier = Supplier(**supplier.model_dump())
     db.add(db_supplier)
@@ -81,6 +86,7 @@ def create_supplier(db: Session, supplier: SupplierCreate):
     db.refresh(db_supplier)
     return db_supplier
 
+@invalidates("suppliers")
 def update_supplier(db: Session, supplier_id: int, supplier: SupplierUpdate):
     db_supplier = db.query(Supplier).filter(Supplier.supplier_id == supplier_id).first()
     if db_supplier:
@@ -90,6 +96,7 @@ def update_supplier(db: Session, supplier_id: int, supplier: SupplierUpdate):
         db.refresh(db_supplier)
     return db_supplier
 
+@invalidates("suppliers")
 def delete_supplier(db: Session, supplier_id: int):
     db_supplier = db.query(Supplier).filter(Supplier.supplier_id == supplier_id).first()
     if db_supplier:
@@ -118,6 +125,7 @@ def get_equipment_list(db: Session, status: Optional[str] = None, category_id: O
         query = query.filter(Equipment.name.ilike(f"%{search_query}%"))
     return query.offset(skip).limit(limit).all()
 
+@invalidates("equipment")
 def create_equipment(db: Session, equipment: EquipmentCreate):
     db_equipment = Equipment(**equipment.model_dump())
     db.add(db_equipment)
@@ -125,6 +133,7 @@ def create_equipment(db: Session, equipment: EquipmentCreate):
     db.refresh(db_equipment)
     return db_equipment
 
+@invalidates("equipment", "equipment_status_log")
 def update_equipment(db: Session, equipment_id: int, equipment: EquipmentUpdate, changed_by: Optional[str] = "System"):
     db_equipment = db.query(Equipment).filter(Equipment.equipment.id == equipment_id).first()
     if db_equipment:
@@ -138,6 +147,7 @@ def update_equipment(db: Session, equipment_id: int, equipment: EquipmentUpdate,
             log_status_change(db, equipment_id, old_status, update_data['status'], changed_by, f"Status changed from {old_status} to {update_data['status']}")
         return db_equipment
 
+@invalidates("equipment")
 def delete_equipment(db: Session, equipment_id: int):
     db_equipment = db.query(Equipment).filter(Equipment.equipment_id == equipment_id).first()
     if db_equipment:
@@ -156,6 +166,7 @@ def get_backup_equipment_list(db: Session, skip: int = 0, limit: int = 100):
         joinedload(BackupEquipment.equipment_rel).joinedload(Equipment.category)
     ).offset(skip).limit(limit).all()
 
+@invalidates("backup_equipment")
 def create_backup_equipment_item(db: Session, backup_item: BackupEquipmentCreate):
     db_backup_item = BackupEquipment(**backup_item.model_dump())
     db.add(db_backup_item)
@@ -163,6 +174,7 @@ def create_backup_equipment_item(db: Session, backup_item: BackupEquipmentCreate
     db.refresh(db_backup_item)
     return db_backup_item
 
+@invalidates("backup_equipment")
 def update_backup_equipment_item(db: Session, backup_id: int, backup_item: BackupEquipmentUpdate):
     db_backup_item = db.query(BackupEquipment).filter(BackupEquipment.backup_id == backup_id).first()
     if db_backup_item:
@@ -172,6 +184,7 @@ def update_backup_equipment_item(db: Session, backup_id: int, backup_item: Backu
         db.refresh(db_backup_item)
     return db_backup_item
 
+@invalidates("backup_equipment")
 def delete_backup_equipment_item(db: Session, backup_id: int):
     db_backup_item = db.query(BackupEquipment).filter(BackupEquipment.backup_id == backup_id).first()
     if db_backup_item:
@@ -193,6 +206,7 @@ def get_maintenance_history(db: Session, equipment_id: Optional[int] = None, ski
         query = query.filter(EquipmentMaintenance.equipment_id == equipment_id)
     return query.order_by(EquipmentMaintenance.maintenance_date.desc()).offset(skip).limit(limit).all()
 
+@invalidates("equipment_maintenance")
 def create_maintenance_record(db: Session, maintenance: EquipmentMaintenanceCreate):
     db_maintenance = EquipmentMaintenance(**maintenance.model_dump())
     db.add(db_maintenance)
@@ -200,6 +214,7 @@ def create_maintenance_record(db: Session, maintenance: EquipmentMaintenanceCrea
     db.refresh(db_maintenance)
     return db_maintenance
 
+@invalidates("equipment_maintenance")
 def update_maintenance_record(db: Session, maintenance_id: int, maintenance: EquipmentMaintenanceUpdate):
     db_maintenance = db.query(EquipmentMaintenance).filter(EquipmentMaintenance.maintenance_id == maintenance_id).first()
     if db_maintenance:
@@ -209,6 +224,7 @@ def update_maintenance_record(db: Session, maintenance_id: int, maintenance: Equ
         db.refresh(db_maintenance)
     return db_maintenance
 
+@invalidates("equipment_maintenance")
 def delete_maintenance_record(db: Session, maintenance_id: int):
     db_maintenance = db.query(EquipmentMaintenance).filter(EquipmentMaintenance.maintenance_id == maintenance_id).first()
     if db_maintenance:
@@ -228,6 +244,7 @@ def get_equipment_status_logs(db: Session, equipment_id: Optional[int] = None, s
         query = query.filter(EquipmentStatusLog.equipment_id == equipment_id)
     return query.order_by(EquipmentStatusLog.change_date.desc()).offset(skip).limit(limit).all()
 
+@invalidates("equipment_status_log")
 def log_status_change(db: Session, equipment_id: int, old_status: str, new_status: str, changed_by: str, change_reason: str):
     db_log = EquipmentStatusLog(
         equipment_id=equipment_id,
@@ -253,6 +270,7 @@ def get_equipment_usage_logs(db: Session, equipment_id: Optional[int] = None, sk
         query = query.filter(EquipmentUsageLog.equipment_id == equipment_id)
     return query.order_by(EquipmentUsageLog.usage_date.desc()).offset(skip).limit(limit).all()
 
+@invalidates("equipment_usage_log")
 def create_equipment_usage_log(db: Session, usage_log: EquipmentUsageLogCreate):
     db_usage_log = EquipmentUsageLog(**usage_log.model_dump())
     db.add(db_usage_log)
@@ -260,6 +278,7 @@ def create_equipment_usage_log(db: Session, usage_log: EquipmentUsageLogCreate):
     db.refresh(db_usage_log)
     return db_usage_log
 
+@invalidates("equipment_usage_log")
 def update_equipment_usage_log(db: Session, usage_id: int, usage_log: EquipmentUsageLogUpdate):
     db_usage_log = db.query(EquipmentUsageLog).filter(EquipmentUsageLog.usage_id == usage_id).first()
     if db_usage_log:
@@ -269,6 +288,7 @@ def update_equipment_usage_log(db: Session, usage_id: int, usage_log: EquipmentU
         db.refresh(db_usage_log)
     return db_usage_log
 
+@invalidates("equipment_usage_log")
 def delete_equipment_usage_log(db: Session, usage_id: int):
     db_usage_log = db.query(EquipmentUsageLog).filter(EquipmentUsageLog.usage_id == usage_id).first()
     if db_usage_log:
@@ -292,6 +312,7 @@ def get_ai_recommendations(db: Session, manager_decision: Optional[str] = None,
         query = query.filter(AIInventoryRecommendation.manager_decision == manager_decision)
     return query.order_by(AIInventoryRecommendation.timestamp.desc()).offset(skip).limit(limit).all()
 
+@invalidates("ai_inventory_recommendation")
 def create_ai_recommendation(db: Session, recommendation: AIInventoryRecommendationCreate):
     db_recommendation = AIInventoryRecommendation(**recommendation.model_dump())
     db.add(db_recommendation)
@@ -299,6 +320,7 @@ def create_ai_recommendation(db: Session, recommendation: AIInventoryRecommendat
     db.refresh(db_recommendation)
     return db_recommendation
 
+@invalidates("ai_inventory_recommendation")
 def update_ai_recommendation(db: Session, recommendation_id: int, recommendation: AIInventoryRecommendationUpdate):
     db_recommendation = db.query(AIInventoryRecommendation).filter(AIInventoryRecommendation.recommendation_id == recommendation_id).first()
     if db_recommendation:
@@ -308,6 +330,7 @@ def update_ai_recommendation(db: Session, recommendation_id: int, recommendation
         db.refresh(db_recommendation)
     return db_recommendation
 
+@invalidates("ai_inventory_recommendation")
 def delete_ai_recommendation(db: Session, recommendation_id: int):
     db_recommendation = db.query(AIInventoryRecommendation).filter(AIInventoryRecommendation.recommendation_id == recommendation_id).first()
     if db_recommendation:
@@ -316,6 +339,7 @@ def delete_ai_recommendation(db: Session, recommendation_id: int):
     return db_recommendation
 
 # --- Dashboard Summary Data ---
+@cached(ttl=1800, tables=("equipment", "backup_equipment", "ai_inventory_recommendation"))
 def get_inventory_summary(db: Session) -> Dict[str, Any]:
     total_equipment = db.query(func.sum(Equipment.quantity)).scalar() or 0
     total_active = db.query(func.sum(Equipment.quantity)).filter(Equipment.status == 'Baik').scalar() or 0
@@ -401,6 +425,7 @@ def get_inventory_table_data(db: Session, skip: int = 0, limit: int = 100,
     ]
 
 # --- Dashboard Usage & Maintenance Trend Data ---
+@cached(ttl=1800, tables=("equipment", "equipment_status_log", "equipment_usage_log"))
 def get_usage_and_maintenance_trends(db: Session) -> Dict[str, Any]:
     def safe_date(value):
         if value is None:
@@ -535,6 +560,7 @@ def get_usage_and_maintenance_trends(db: Session) -> Dict[str, Any]:
     }
 
 # --- Service for taking from backup (unchanged) ---
+@invalidates("backup_equipment", "equipment_status_log")
 def take_from_backup_stock(db: Session, equipment_id: int, quantity_to_take: int, changed_by: str = "Manager") -> Optional[Equipment]:
     backup_item = db.query(BackupEquipment).filter(BackupEquipment.equipment_id == equipment_id).first()
 
@@ -1,18 +1,115 @@
 from sqlalchemy.orm import Session
 from app.models.member import Member
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from sqlalchemy import text
 from sqlalchemy import func
-from app.models.member import Member, MemberGoal
-from app.schemas.member import SegmentData, Member as MemberSchema
+from app.models.member import Member, MemberGoal, MemberStatCounter, MemberCohortRetention, MemberFunnelSnapshot
+from app.schemas.member import SegmentData, Member as MemberSchema, MemberCreate
 from sqlalchemy import func, case
-from app.models.notification import NotificationLog
-from app.models.ab_test import ABTestLog
+from app.cache import cached, invalidates
+from app.config import settings
+from app.crud import member_timeseries
+from app.crud import experiment as experiment_crud
+from typing import Optional
 
+_COUNTER_UPSERT = text("""
+    INSERT INTO member_stat_counter (name, key, value, updated_at)
+    VALUES (:name, :key, :delta, NOW())
+    ON CONFLICT (name, key) DO UPDATE
+    SET value = member_stat_counter.value + EXCLUDED.value, updated_at = NOW()
+""")
+
+def _bump_counters(db: Session, deltas):
+    """deltas: list (name, key, delta). Tidak commit; ikut transaksi insert/update member."""
+    db.execute(_COUNTER_UPSERT, [{"name": name, "key": key or "", "delta": delta} for name, key, delta in deltas])
+
+def _join_month(join_date) -> str:
+    return join_date.strftime("%Y-%m") if join_date else ""
+
+def _count_member_table(db: Session):
+    """Hitung counter langsung dari tabel member (satu scan, dipakai rekonsiliasi)."""
+    rows = db.execute(text("""
+        SELECT 'status' AS name, COALESCE(status, '') AS key, COUNT(*) AS value FROM member GROUP BY status
+        UNION ALL
+        SELECT 'joined', COALESCE(TO_CHAR(join_date, 'YYYY-MM'), ''), COUNT(*) FROM member GROUP BY 2
+    """)).fetchall()
+    expected = {(row.name, row.key): int(row.value) for row in rows}
+    expected[("total", "")] = sum(value for (name, _), value in expected.items() if name == "status")
+    return expected
+
+@invalidates("member_stat_counter")
+def reconcile_member_counters(db: Session):
+    """
+    Bandingkan counter dengan isi tabel member dan perbaiki jika ada selisih.
+    `drift` kosong berarti counter yang di-maintain inkremental sudah tepat.
+    """
+    # Kunci counter sebelum menghitung: lock ini konflik dengan upsert di _bump_counters, jadi
+    # create/update member yang sedang berjalan selesai dulu (dan terlihat di hitungan), sedangkan
+    # yang baru mulai menunggu sampai koreksi di-commit lalu menambah delta-nya di atas nilai yang benar.
+    # Level tabel (bukan FOR UPDATE per baris) supaya counter bulan baru yang belum punya baris ikut terkunci.
+    db.execute(text("LOCK TABLE member_stat_counter IN SHARE ROW EXCLUSIVE MODE"))
+    expected = _count_member_table(db)
+    current = {(c.name, c.key): c.value for c in db.query(MemberStatCounter).all()}
+
+    drift = []
+    for counter_key in set(expected) | set(current):
+        expected_value = expected.get(counter_key, 0)
+        current_value = current.get(counter_key)
+        if current_value != expected_value:
+            drift.append({
+                "name": counter_key[0],
+                "key": counter_key[1],
+                "counter": current_value,
+                "actual": expected_value,
+            })
+
+    if drift:
+        db.execute(text("""
+            INSERT INTO member_stat_counter (name, key, value, updated_at)
+            VALUES (:name, :key, :value, NOW())
+            ON CONFLICT (name, key) DO UPDATE SET value = EXCLUDED.value, updated_at = NOW()
+        """), [{"name": d["name"], "key": d["key"], "value": d["actual"]} for d in drift])
+    # Commit juga saat tidak ada drift untuk melepas lock
+    db.commit()
+
+    return {"counters_checked": len(expected), "drift": drift}
+
+def ensure_member_precomputed(db: Session):
+    """
+    Dipanggil saat startup: bangun counter, snapshot funnel, dan retensi cohort sekali jika tabelnya masih kosong
+    (database lama). Path baca tidak pernah menulis; sampai tabel terisi, endpoint-nya mengembalikan hasil kosong.
+    """
+    try:
+        if db.query(MemberStatCounter.counter_id).first() is None:
+            result = reconcile_member_counters(db)
+            print(f"member_stat_counter dibangun: {result['counters_checked']} counter")
+        if db.query(MemberFunnelSnapshot.snapshot_id).filter(
+            MemberFunnelSnapshot.window_days == settings.FUNNEL_WINDOW_DAYS
+        ).first() is None:
+            result = refresh_funnel_snapshots(db)
+            print(f"member_funnel_snapshot dibangun: {result['rows_upserted']} baris")
+        if db.query(MemberCohortRetention.retention_id).first() is None:
+            result = refresh_cohort_retention(db, full=True)
+            print(f"member_cohort_retention dibangun: {result['cells_upserted']} sel")
+    except Exception as e:
+        db.rollback()
+        print(f"Error ensuring member precomputed tables: {e}")
+
+@cached(ttl=60, tables=("member_stat_counter",))
 def get_member_stats(db: Session):
-    total = db.query(Member).count()
-    active = db.query(Member).filter(Member.status == "Active").count()
-    new_members = db.query(Member).filter(Member.join_date >= datetime.now().replace(day=1)).count()
+    # O(1): tiga counter, bukan tiga COUNT(*) atas tabel member
+    month_key = datetime.now().strftime("%Y-%m")
+    rows = db.execute(text("""
+        SELECT name, key, value FROM member_stat_counter
+        WHERE (name = 'total' AND key = '')
+           OR (name = 'status' AND key = 'Active')
+           OR (name = 'joined' AND key = :month)
+    """), {"month": month_key}).fetchall()
+    # Counter kosong (belum di-bootstrap) -> semua 0; diisi oleh ensure_member_precomputed saat startup
+    counters = {(row.name, row.key): row.value for row in rows}
+    total = counters.get(("total", ""), 0)
+    active = counters.get(("status", "Active"), 0)
+    new_members = counters.get(("joined", month_key), 0)
     retention = round((active / total) * 100, 2) if total else 0
     return {
         "total": total,
@@ -21,81 +118,397 @@ def get_member_stats(db: Session):
         "retention": retention,
     }
 
-def get_member_activity(db: Session):
-    results = db.execute(text("""
-        SELECT TO_CHAR(join_date, 'YYYY-MM') AS month, COUNT(*) AS value
-        FROM member
-        GROUP BY month
-        ORDER BY month
-    """)).fetchall()
-    return [{"month": row[0], "value": row[1]} for row in results]
+@invalidates("member", "member_stat_counter")
+def create_member(db: Session, member: MemberCreate):
+    data = member.model_dump()
+    data["join_date"] = data["join_date"] or datetime.now().date()
+    db_member = Member(**data)
+    db.add(db_member)
+    _bump_counters(db, [
+        ("total", "", 1),
+        ("status", db_member.status, 1),
+        ("joined", _join_month(db_member.join_date), 1),
+    ])
+    db.commit()
+    db.refresh(db_member)
+    return db_member
+
+@invalidates("member", "member_stat_counter")
+def update_member_status(db: Session, member_id: int, status: str):
+    db_member = db.query(Member).filter(Member.member_id == member_id).with_for_update().first()
+    if db_member is None:
+        return None
+    if db_member.status != status:
+        _bump_counters(db, [("status", db_member.status, -1), ("status", status, 1)])
+        db_member.status = status
+        db.commit()
+        db.refresh(db_member)
+    return db_member
+
+def get_member_activity(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    # Gap-filled per bulan; tanpa rentang = seluruh histori join (batas diambil dari data, bukan jam dinding)
+    bounds = member_timeseries.resolve_range(db, "joins", date_from, date_to)
+    if bounds is None:
+        return []
+    series = member_timeseries.get_join_series(db, bounds[0], bounds[1], "month")
+    return [{"month": row["period"], "value": row["value"]} for row in series]
 
 # crud/member.py
-def get_member_segments(db: Session):
-    query = text("""
-        SELECT goal_type AS name, COUNT(*) AS value
-        FROM member_goal
-        GROUP BY goal_type
-    """)
-    rows = db.execute(query).fetchall()
-    result = []
-    color_map = {"Weight Loss": "#10b981", "Muscle Gain": "#f59e0b", "Endurance": "#6366f1"}
+SEGMENT_COLORS = {"Weight Loss": "#10b981", "Muscle Gain": "#f59e0b", "Endurance": "#6366f1"}
+
+def _segment_member(row):
+    return {"id": str(row.member_id), "name": row.name, "joinDate": str(row.join_date), "status": row.status}
+
+@cached(ttl=300, tables=("member", "member_goal"))
+def get_member_segments(db: Session, preview: int = 10):
+    # Satu query: jumlah per goal (window COUNT) + `preview` member terbaru per goal (ROW_NUMBER).
+    # Daftar lengkap per segmen diambil per halaman lewat get_segment_members.
+    rows = db.execute(text("""
+        SELECT goal_type, total, rn, member_id, name, join_date, status
+        FROM (
+            SELECT g.goal_type, m.member_id, m.name, m.join_date, m.status,
+                   COUNT(*) OVER (PARTITION BY g.goal_type) AS total,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY g.goal_type ORDER BY m.join_date DESC NULLS LAST, m.member_id DESC
+                   ) AS rn
+            FROM member_goal g
+            LEFT JOIN member m ON m.member_id = g.member_id
+        ) ranked
+        WHERE rn <= GREATEST(:preview, 1) -- minimal satu baris per goal supaya segmen tetap muncul
+        ORDER BY goal_type, rn
+    """), {"preview": preview}).fetchall()
+
+    segments = {}
     for row in rows:
-        member_query = db.execute(text("""
-            SELECT m.member_id, m.name, m.join_date, m.status
-            FROM member m
-            JOIN member_goal g ON m.member_id = g.member_id
-            WHERE g.goal_type = :goal
-        """), {"goal": row[0]}).fetchall()
-        members = [{"id": str(m[0]), "name": m[1], "joinDate": str(m[2]), "status": m[3]} for m in member_query]
-        result.append({
-            "name": row[0],
-            "value": row[1],
-            "color": color_map.get(row[0], "#8884d8"),
-            "members": members
+        segment = segments.setdefault(row.goal_type, {
+            "name": row.goal_type,
+            "value": row.total,
+            "color": SEGMENT_COLORS.get(row.goal_type, "#8884d8"),
+            "members": [],
+            "has_more": row.total > preview,
         })
-    return result
-
-def get_workout_time(db: Session):
-    result = db.execute(text("""
-        SELECT TO_CHAR(start_time, 'HH24:00') AS time, COUNT(*) AS members
-        FROM workout_session
-        GROUP BY time
-        ORDER BY time
-    """)).fetchall()
-    return [{"time": r[0], "members": r[1]} for r in result]
+        if row.member_id is not None and row.rn <= preview:
+            segment["members"].append(_segment_member(row))
+    return list(segments.values())
+
+@cached(ttl=300, tables=("member", "member_goal"))
+def get_segment_members(db: Session, goal: str, limit: int = 20, offset: int = 0):
+    rows = db.execute(text("""
+        SELECT m.member_id, m.name, m.join_date, m.status, COUNT(*) OVER () AS total
+        FROM member_goal g
+        JOIN member m ON m.member_id = g.member_id
+        WHERE g.goal_type = :goal
+        ORDER BY m.join_date DESC NULLS LAST, m.member_id DESC
+        LIMIT :limit OFFSET :offset
+    """), {"goal": goal, "limit": limit, "offset": offset}).fetchall()
+    if rows:
+        total = rows[0].total
+    elif offset > 0:
+        # Offset melewati akhir segmen: halaman kosong, tapi total tetap ukuran segmen yang sebenarnya
+        total = db.execute(text("""
+            SELECT COUNT(*)
+            FROM member_goal g
+            JOIN member m ON m.member_id = g.member_id
+            WHERE g.goal_type = :goal
+        """), {"goal": goal}).scalar()
+    else:
+        total = 0
+    return {
+        "goal": goal,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "members": [_segment_member(row) for row in rows],
+    }
+
+def get_workout_time(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    # Default seluruh histori sesi; jam tanpa sesi tetap muncul dengan nilai 0
+    bounds = member_timeseries.resolve_range(db, "workouts", date_from, date_to)
+    if bounds is None:
+        return []
+    distribution = member_timeseries.get_workout_hour_distribution(db, bounds[0], bounds[1])
+    return [{"time": row["hour"], "members": row["sessions"]} for row in distribution]
+
+# ===== Conversion funnel (member_funnel_snapshot) =====
+# Workout: member dengan sesi workout dalam window
+# Review:  member Workout yang juga memberi feedback dalam window
+# Loyal:   member Review yang memperpanjang membership dalam window
+#          (pembayaran income 'membership' dengan pembayaran membership sebelumnya)
+FUNNEL_STAGES = [
+    ("Workout", 1, "#10b981"),
+    ("Review", 2, "#f59e0b"),
+    ("Loyal", 3, "#6366f1"),
+]
+FUNNEL_COLORS = {stage: fill for stage, _, fill in FUNNEL_STAGES}
+
+_FUNNEL_SNAPSHOT_SQL = """
+    WITH snapshot_dates AS (
+        SELECT CAST(d AS DATE) AS snapshot_date
+        FROM generate_series(CAST(:start AS DATE), CAST(:end AS DATE), INTERVAL '1 day') d
+    ),
+    workout AS (
+        SELECT DISTINCT sd.snapshot_date, wp.member_id
+        FROM snapshot_dates sd
+        JOIN workout_session ws
+          ON ws.session_date > sd.snapshot_date - :window_days AND ws.session_date <= sd.snapshot_date
+        JOIN workout_plan wp ON wp.plan_id = ws.plan_id
+        WHERE wp.member_id IS NOT NULL
+    ),
+    review AS (
+        SELECT w.snapshot_date, w.member_id
+        FROM workout w
+        WHERE EXISTS (
+            SELECT 1 FROM feedback f
+            WHERE f.member_id = w.member_id
+              AND f.feedback_date > w.snapshot_date - :window_days AND f.feedback_date <= w.snapshot_date
+        )
+    ),
+    loyal AS (
+        SELECT r.snapshot_date, r.member_id
+        FROM review r
+        WHERE EXISTS (
+            SELECT 1 FROM income_transaction renewal
+            WHERE renewal.member_id = r.member_id AND renewal.income_type = 'membership'
+              AND renewal.transaction_date > r.snapshot_date - :window_days
+              AND renewal.transaction_date <= r.snapshot_date
+              AND EXISTS (
+                  SELECT 1 FROM income_transaction earlier
+                  WHERE earlier.member_id = renewal.member_id AND earlier.income_type = 'membership'
+                    AND earlier.transaction_date < renewal.transaction_date
+              )
+        )
+    ),
+    counts AS (
+        SELECT snapshot_date, 'Workout' AS stage, COUNT(*) AS member_count FROM workout GROUP BY snapshot_date
+        UNION ALL
+        SELECT snapshot_date, 'Review', COUNT(*) FROM review GROUP BY snapshot_date
+        UNION ALL
+        SELECT snapshot_date, 'Loyal', COUNT(*) FROM loyal GROUP BY snapshot_date
+    )
+    INSERT INTO member_funnel_snapshot (snapshot_date, window_days, stage, stage_order, member_count, updated_at)
+    SELECT sd.snapshot_date, :window_days, s.stage, s.stage_order, COALESCE(c.member_count, 0), NOW()
+    FROM snapshot_dates sd
+    CROSS JOIN (VALUES ('Workout', 1), ('Review', 2), ('Loyal', 3)) AS s(stage, stage_order)
+    LEFT JOIN counts c ON c.snapshot_date = sd.snapshot_date AND c.stage = s.stage
+    ON CONFLICT (snapshot_date, window_days, stage) DO UPDATE
+    SET stage_order = EXCLUDED.stage_order,
+        member_count = EXCLUDED.member_count,
+        updated_at = NOW()
+"""
+
+@invalidates("member_funnel_snapshot")
+def refresh_funnel_snapshots(db: Session, full: bool = False, window_days: Optional[int] = None):
+    """
+    Inkremental (default): snapshot sejak snapshot terakhir (hari ini selalu dihitung ulang karena datanya
+    masih bertambah). Saat tabel kosong atau `full=True`, bangun FUNNEL_BACKFILL_DAYS snapshot ke belakang.
+    """
+    window_days = window_days or settings.FUNNEL_WINDOW_DAYS
+    today = datetime.now().date()
+    earliest = today - timedelta(days=settings.FUNNEL_BACKFILL_DAYS - 1)
 
-def get_conversion_funnel(db: Session):
-    result = [
-        {"name": "Workout", "value": 1000, "fill": "#10b981"},
-        {"name": "Review", "value": 650, "fill": "#f59e0b"},
-        {"name": "Loyal", "value": 420, "fill": "#6366f1"},
+    latest = None
+    if not full:
+        latest = db.query(func.max(MemberFunnelSnapshot.snapshot_date)).filter(
+            MemberFunnelSnapshot.window_days == window_days
+        ).scalar()
+    start = earliest if latest is None else max(min(latest, today), earliest)
+
+    rows = db.execute(text(_FUNNEL_SNAPSHOT_SQL), {"start": start, "end": today, "window_days": window_days}).rowcount
+    db.commit()
+    return {
+        "mode": "full" if latest is None else "incremental",
+        "window_days": window_days,
+        "from": str(start),
+        "to": str(today),
+        "rows_upserted": rows,
+    }
+
+def _funnel_snapshot(db: Session, snapshot_date: Optional[date], window_days: int):
+    query = db.query(MemberFunnelSnapshot).filter(MemberFunnelSnapshot.window_days == window_days)
+    if snapshot_date is None:
+        snapshot_date = db.query(func.max(MemberFunnelSnapshot.snapshot_date)).filter(
+            MemberFunnelSnapshot.window_days == window_days
+        ).scalar()
+    else:
+        # Snapshot terdekat pada/sebelum tanggal yang diminta
+        snapshot_date = db.query(func.max(MemberFunnelSnapshot.snapshot_date)).filter(
+            MemberFunnelSnapshot.window_days == window_days,
+            MemberFunnelSnapshot.snapshot_date <= snapshot_date
+        ).scalar()
+    if snapshot_date is None:
+        return None, []
+    rows = query.filter(MemberFunnelSnapshot.snapshot_date == snapshot_date).order_by(MemberFunnelSnapshot.stage_order).all()
+    return snapshot_date, rows
+
+@cached(ttl=300, tables=("member_funnel_snapshot",))
+def get_conversion_funnel(db: Session, snapshot_date: Optional[date] = None):
+    """Tahap funnel dari snapshot precomputed (default: snapshot terbaru)."""
+    _, rows = _funnel_snapshot(db, snapshot_date, settings.FUNNEL_WINDOW_DAYS)
+    return [
+        {"name": row.stage, "value": row.member_count, "fill": FUNNEL_COLORS.get(row.stage, "#94a3b8")}
+        for row in rows
     ]
-    return result
 
+@cached(ttl=300, tables=("member_funnel_snapshot",))
+def compare_conversion_funnel(db: Session, snapshot_date: date, compare_date: date):
+    """Bandingkan dua snapshot: jumlah per tahap, konversi dari tahap sebelumnya, dan selisihnya."""
+    window_days = settings.FUNNEL_WINDOW_DAYS
+    current_date, current_rows = _funnel_snapshot(db, snapshot_date, window_days)
+    previous_date, previous_rows = _funnel_snapshot(db, compare_date, window_days)
+    current = {row.stage: row.member_count for row in current_rows}
+    previous = {row.stage: row.member_count for row in previous_rows}
+
+    def conversion(counts, index):
+        if index == 0:
+            return 100.0
+        base = counts.get(FUNNEL_STAGES[index - 1][0], 0)
+        return round(counts.get(FUNNEL_STAGES[index][0], 0) * 100.0 / base, 2) if base else 0.0
+
+    stages = []
+    for index, (stage, _, fill) in enumerate(FUNNEL_STAGES):
+        value, previous_value = current.get(stage, 0), previous.get(stage, 0)
+        stages.append({
+            "name": stage,
+            "fill": fill,
+            "value": value,
+            "previous_value": previous_value,
+            "change": value - previous_value,
+            "conversion_rate": conversion(current, index),
+            "previous_conversion_rate": conversion(previous, index),
+        })
+    return {
+        "window_days": window_days,
+        "snapshot_date": str(current_date) if current_date else None,
+        "compare_date": str(previous_date) if previous_date else None,
+        "stages": stages,
+    }
+
+# Dibaca dari experiment_counter (di-fold inkremental dari log), bukan dari log mentah
 def get_notification_response(db: Session):
-    result = db.execute(text("""
-        SELECT type,
-               SUM(CASE WHEN responded = true THEN 1 ELSE 0 END) AS responded,
-               SUM(CASE WHEN responded = false THEN 1 ELSE 0 END) AS ignored
-        FROM notification_log
-        GROUP BY type
-    """)).fetchall()
     return [
-        {"type": row[0], "responded": row[1], "ignored": row[2]}
-        for row in result
+        {"type": c["variant"], "responded": c["successes"], "ignored": c["trials"] - c["successes"]}
+        for c in experiment_crud.get_experiment_counters(db, "notification")
     ]
 
 def get_ab_test_data(db: Session):
-    result = db.execute(text("""
-        SELECT variant AS feature,
-               SUM(CASE WHEN success = true THEN 1 ELSE 0 END) AS success,
-               COUNT(*) AS total
-        FROM ab_test_log
-        GROUP BY variant
-    """)).fetchall()
     return [
-        {"feature": row[0], "success": row[1], "total": row[2]}
-        for row in result
+        {"feature": c["variant"], "success": c["successes"], "total": c["trials"]}
+        for c in experiment_crud.get_experiment_counters(db, "ab_test")
     ]
 
+
+# ===== Cohort retention (member_cohort_retention) =====
+# Aktivitas = sesi workout (via workout_plan.member_id) atau kehadiran kelas ('Present'),
+# dihitung per bulan; satu member dihitung sekali per bulan.
+_ACTIVITY_MONTHS_SQL = """
+    SELECT wp.member_id, CAST(date_trunc('month', ws.session_date) AS DATE) AS activity_month
+    FROM workout_session ws
+    JOIN workout_plan wp ON wp.plan_id = ws.plan_id
+    WHERE ws.session_date >= :since
+    UNION
+    SELECT mc.member_id, CAST(date_trunc('month', mc.attendance_date) AS DATE)
+    FROM member_class mc
+    WHERE mc.attendance_status = 'Present' AND mc.attendance_date >= :since
+"""
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+def _previous_month_start(value: date) -> date:
+    first = _month_start(value)
+    return date(first.year - 1, 12, 1) if first.month == 1 else date(first.year, first.month - 1, 1)
+
+@invalidates("member_cohort_retention")
+def refresh_cohort_retention(db: Session, full: bool = False):
+    """
+    Inkremental (default): hanya sel dengan bulan aktivitas >= bulan lalu, plus ukuran cohort bulan-bulan itu.
+    Aktivitas lama tidak berubah, jadi sel historis tidak perlu dihitung ulang. `full=True` membangun ulang semua.
+    """
+    since = date(1900, 1, 1) if full else _previous_month_start(datetime.now().date())
+    if full:
+        db.execute(text("DELETE FROM member_cohort_retention"))
+
+    cells = db.execute(text(f"""
+        WITH cohorts AS (
+            SELECT member_id, CAST(date_trunc('month', join_date) AS DATE) AS cohort_month
+            FROM member
+            WHERE join_date IS NOT NULL
+        ),
+        sizes AS (
+            SELECT cohort_month, COUNT(*) AS cohort_size FROM cohorts GROUP BY cohort_month
+        ),
+        activity AS ({_ACTIVITY_MONTHS_SQL}),
+        cells AS (
+            SELECT c.cohort_month,
+                   CAST((EXTRACT(YEAR FROM a.activity_month) - EXTRACT(YEAR FROM c.cohort_month)) * 12
+                        + EXTRACT(MONTH FROM a.activity_month) - EXTRACT(MONTH FROM c.cohort_month) AS INTEGER) AS period_index,
+                   COUNT(DISTINCT c.member_id) AS active_members
+            FROM cohorts c
+            JOIN activity a ON a.member_id = c.member_id AND a.activity_month >= c.cohort_month
+            GROUP BY 1, 2
+        )
+        INSERT INTO member_cohort_retention (cohort_month, period_index, cohort_size, active_members, retention_rate, updated_at)
+        SELECT cells.cohort_month, cells.period_index, s.cohort_size, cells.active_members,
+               ROUND(cells.active_members * 100.0 / s.cohort_size, 2), NOW()
+        FROM cells
+        JOIN sizes s ON s.cohort_month = cells.cohort_month
+        ON CONFLICT (cohort_month, period_index) DO UPDATE
+        SET cohort_size = EXCLUDED.cohort_size,
+            active_members = EXCLUDED.active_members,
+            retention_rate = EXCLUDED.retention_rate,
+            updated_at = NOW()
+    """), {"since": since}).rowcount
+
+    # Member baru yang join sejak `since` mengubah ukuran cohort terbaru -> rate di semua selnya ikut berubah
+    resized = db.execute(text("""
+        UPDATE member_cohort_retention r
+        SET cohort_size = s.cohort_size,
+            retention_rate = ROUND(r.active_members * 100.0 / s.cohort_size, 2),
+            updated_at = NOW()
+        FROM (
+            SELECT CAST(date_trunc('month', join_date) AS DATE) AS cohort_month, COUNT(*) AS cohort_size
+            FROM member
+            WHERE join_date >= :since
+            GROUP BY 1
+        ) s
+        WHERE r.cohort_month = s.cohort_month AND r.cohort_size <> s.cohort_size
+    """), {"since": since}).rowcount
+
+    db.commit()
+    return {"mode": "full" if full else "incremental", "since": str(since), "cells_upserted": cells, "cohorts_resized": resized}
+
+@cached(ttl=300, tables=("member_cohort_retention",))
+def get_cohort_retention(db: Session, months: int = 12):
+    """Heatmap retensi untuk `months` cohort terakhir, dibaca langsung dari tabel precomputed."""
+    rows = db.execute(text("""
+        SELECT cohort_month, period_index, cohort_size, active_members, retention_rate
+        FROM member_cohort_retention
+        WHERE cohort_month >= (
+            SELECT MIN(cohort_month) FROM (
+                SELECT DISTINCT cohort_month FROM member_cohort_retention ORDER BY cohort_month DESC LIMIT :months
+            ) latest
+        )
+        ORDER BY cohort_month, period_index
+    """), {"months": months}).fetchall()
+
+    cohorts = {}
+    for row in rows:
+        cohort = cohorts.setdefault(row.cohort_month, {
+            "cohort": row.cohort_month.strftime("%Y-%m"),
+            "size": row.cohort_size,
+            "retention": {},
+        })
+        cohort["retention"][row.period_index] = row.retention_rate
+
+    max_period = max((max(c["retention"]) for c in cohorts.values() if c["retention"]), default=0)
+    # Bulan tanpa aktivitas -> 0%, supaya setiap baris heatmap punya panjang yang sama dengan umurnya
+    today = _month_start(datetime.now().date())
+    result = []
+    for cohort_month, cohort in cohorts.items():
+        age = (today.year - cohort_month.year) * 12 + today.month - cohort_month.month
+        result.append({
+            "cohort": cohort["cohort"],
+            "size": cohort["size"],
+            "retention": [cohort["retention"].get(p, 0.0) for p in range(0, min(age, max_period) + 1)],
+        })
+    return {"max_period": max_period, "cohorts": result}
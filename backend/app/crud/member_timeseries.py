@@ -0,0 +1,216 @@
+# backend/app/crud/member_timeseries.py
+"""
+Time series aktivitas member: join member dan sesi workout.
+
+Semua query dibatasi rentang tanggal (pakai index member.join_date dan
+workout_session(session_date, start_time)), di-bucket dengan date_trunc dan
+periode kosong diisi di database dengan generate_series.
+Sesi workout juga bisa dibaca dari workout_daily_bucket (jumlah sesi per tanggal x jam)
+supaya chart bertahun-tahun tidak memindai workout_session. Bucket di-refresh inkremental
+dari watermark session_id; koreksi sesi lama butuh refresh penuh (lihat refresh_workout_buckets).
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.cache import cached, invalidates
+from app.config import settings
+from app.models.workout_session import WorkoutBucketState
+
+# granularity -> (unit date_trunc, interval generate_series, format label)
+GRANULARITIES = {
+    "day": ("day", "1 day", "YYYY-MM-DD"),
+    "week": ("week", "1 week", "IYYY-\"W\"IW"),
+    "month": ("month", "1 month", "YYYY-MM"),
+}
+
+
+def _validate_range(date_from: date, date_to: date, granularity: str) -> Tuple[str, str, str]:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity '{granularity}'")
+    if date_to < date_from:
+        raise ValueError("date_to must be on or after date_from")
+    return GRANULARITIES[granularity]
+
+
+def _gap_filled_series(db: Session, source_sql: str, date_from: date, date_to: date, granularity: str) -> List[Dict[str, Any]]:
+    """`source_sql` harus menghasilkan kolom (bucket_date, value) yang sudah difilter :date_from..:date_to."""
+    unit, step, label_format = _validate_range(date_from, date_to, granularity)
+    rows = db.execute(text(f"""
+        WITH periods AS (
+            SELECT generate_series(
+                date_trunc('{unit}', CAST(:date_from AS DATE)),
+                date_trunc('{unit}', CAST(:date_to AS DATE)),
+                INTERVAL '{step}'
+            ) AS period_start
+        ),
+        totals AS (
+            SELECT date_trunc('{unit}', bucket_date) AS period_start, SUM(value) AS value
+            FROM ({source_sql}) source
+            GROUP BY 1
+        )
+        SELECT TO_CHAR(p.period_start, '{label_format}') AS period, COALESCE(t.value, 0) AS value
+        FROM periods p
+        LEFT JOIN totals t ON t.period_start = p.period_start
+        ORDER BY p.period_start
+    """), {"date_from": date_from, "date_to": date_to}).fetchall()
+    return [{"period": row.period, "value": int(row.value)} for row in rows]
+
+
+# === Member join ===
+@cached(ttl=300, tables=("member",))
+def get_join_series(db: Session, date_from: date, date_to: date, granularity: str = "month") -> List[Dict[str, Any]]:
+    return _gap_filled_series(db, """
+        SELECT join_date AS bucket_date, COUNT(*) AS value
+        FROM member
+        WHERE join_date >= :date_from AND join_date <= :date_to
+        GROUP BY join_date
+    """, date_from, date_to, granularity)
+
+
+# === Workout sessions ===
+def _use_buckets(db: Session) -> bool:
+    if not settings.WORKOUT_DAILY_BUCKETS:
+        return False
+    return db.execute(text("SELECT EXISTS (SELECT 1 FROM workout_daily_bucket)")).scalar()
+
+
+@cached(ttl=300, tables=("workout_session", "workout_daily_bucket"))
+def get_workout_series(db: Session, date_from: date, date_to: date, granularity: str = "day") -> List[Dict[str, Any]]:
+    if _use_buckets(db):
+        source = """
+            SELECT bucket_date, SUM(session_count) AS value
+            FROM workout_daily_bucket
+            WHERE bucket_date >= :date_from AND bucket_date <= :date_to
+            GROUP BY bucket_date
+        """
+    else:
+        source = """
+            SELECT session_date AS bucket_date, COUNT(*) AS value
+            FROM workout_session
+            WHERE session_date >= :date_from AND session_date <= :date_to
+            GROUP BY session_date
+        """
+    return _gap_filled_series(db, source, date_from, date_to, granularity)
+
+
+@cached(ttl=300, tables=("workout_session", "workout_daily_bucket"))
+def get_workout_hour_distribution(db: Session, date_from: date, date_to: date) -> List[Dict[str, Any]]:
+    """Jumlah sesi per jam mulai (00:00..23:00) dalam rentang tanggal; jam kosong bernilai 0."""
+    _validate_range(date_from, date_to, "day")
+    if _use_buckets(db):
+        source = """
+            SELECT hour, SUM(session_count) AS sessions
+            FROM workout_daily_bucket
+            WHERE bucket_date >= :date_from AND bucket_date <= :date_to
+            GROUP BY hour
+        """
+    else:
+        source = """
+            SELECT CAST(EXTRACT(HOUR FROM start_time) AS INTEGER) AS hour, COUNT(*) AS sessions
+            FROM workout_session
+            WHERE session_date >= :date_from AND session_date <= :date_to AND start_time IS NOT NULL
+            GROUP BY 1
+        """
+    rows = db.execute(text(f"""
+        SELECT h.hour, COALESCE(s.sessions, 0) AS sessions
+        FROM generate_series(0, 23) AS h(hour)
+        LEFT JOIN ({source}) s ON s.hour = h.hour
+        ORDER BY h.hour
+    """), {"date_from": date_from, "date_to": date_to}).fetchall()
+    return [{"hour": f"{row.hour:02d}:00", "sessions": int(row.sessions)} for row in rows]
+
+
+# === workout_daily_bucket ===
+_BUCKET_INSERT = """
+    INSERT INTO workout_daily_bucket (bucket_date, hour, session_count, updated_at)
+    SELECT session_date, COALESCE(CAST(EXTRACT(HOUR FROM start_time) AS INTEGER), -1), COUNT(*), NOW()
+    FROM workout_session
+    WHERE {where}
+    GROUP BY 1, 2
+"""
+
+
+@invalidates("workout_daily_bucket")
+def refresh_workout_buckets(db: Session, full: bool = False, days: int = 3) -> Dict[str, Any]:
+    """
+    Inkremental: bucket dihitung ulang untuk setiap tanggal yang punya sesi baru sejak watermark session_id
+    (termasuk sesi yang dicatat dengan session_date lama), plus `days` hari terakhir. Watermark dipindai ulang
+    WORKOUT_BUCKET_ID_OVERLAP id ke belakang karena id serial tidak di-commit berurutan; menghitung ulang satu
+    tanggal bersifat idempoten, jadi overlap tidak menghitung ganda.
+    Perubahan/penghapusan sesi lama tidak terdeteksi (workout_session tidak punya updated_at):
+    setelah koreksi atau backfill seperti itu jalankan `full=True`. Sesi tanpa start_time masuk jam -1.
+    """
+    # FOR UPDATE: refresh yang berjalan bersamaan menunggu, bukan menulis bucket yang sama
+    state = db.query(WorkoutBucketState).with_for_update().first()
+    if state is None:
+        state = WorkoutBucketState(last_session_id=0)
+        db.add(state)
+        full = True
+    max_session_id = db.execute(text("SELECT COALESCE(MAX(session_id), 0) FROM workout_session")).scalar()
+
+    if full:
+        db.execute(text("DELETE FROM workout_daily_bucket"))
+        rows = db.execute(text(_BUCKET_INSERT.format(where="session_date IS NOT NULL"))).rowcount
+        dates_refreshed = None
+        state.last_full_refresh_at = datetime.now()
+    else:
+        since_id = max(state.last_session_id - settings.WORKOUT_BUCKET_ID_OVERLAP, 0)
+        recent_from = datetime.now().date() - timedelta(days=days)
+        dates = [row[0] for row in db.execute(text("""
+            SELECT DISTINCT session_date FROM workout_session
+            WHERE session_id > :since_id AND session_date IS NOT NULL
+            UNION
+            SELECT CAST(d AS DATE) FROM generate_series(CAST(:recent_from AS DATE), CURRENT_DATE, INTERVAL '1 day') d
+        """), {"since_id": since_id, "recent_from": recent_from}).fetchall()]
+        db.execute(text("DELETE FROM workout_daily_bucket WHERE bucket_date = ANY(:dates)"), {"dates": dates})
+        rows = db.execute(text(_BUCKET_INSERT.format(where="session_date = ANY(:dates)")), {"dates": dates}).rowcount
+        dates_refreshed = len(dates)
+
+    state.last_session_id = max(state.last_session_id, max_session_id)
+    db.commit()
+    return {
+        "mode": "full" if full else "incremental",
+        "last_session_id": state.last_session_id,
+        "last_full_refresh_at": str(state.last_full_refresh_at) if state.last_full_refresh_at else None,
+        "dates_refreshed": dates_refreshed,
+        "buckets": rows,
+    }
+
+
+def get_bucket_state(db: Session) -> Dict[str, Any]:
+    state = db.query(WorkoutBucketState).first()
+    return {
+        "enabled": settings.WORKOUT_DAILY_BUCKETS,
+        "last_session_id": state.last_session_id if state else None,
+        "last_full_refresh_at": str(state.last_full_refresh_at) if state and state.last_full_refresh_at else None,
+        "note": "Edits or deletes of existing workout sessions are only picked up by a full refresh (full=true).",
+    }
+
+
+def data_bounds(db: Session, source: str) -> Tuple[Optional[date], Optional[date]]:
+    """
+    (tanggal pertama, tanggal terakhir) data untuk 'joins' atau 'workouts'; (None, None) jika kosong.
+    Dipakai sebagai default rentang: data repo ini historis, jadi window dari jam dinding bisa kosong.
+    """
+    if source == "joins":
+        row = db.execute(text("SELECT MIN(join_date) AS first, MAX(join_date) AS last FROM member")).first()
+    elif source == "workouts":
+        row = db.execute(text(
+            "SELECT MIN(session_date) AS first, MAX(session_date) AS last FROM workout_session"
+        )).first()
+    else:
+        raise ValueError(f"Unknown time series source '{source}'")
+    return (row.first, row.last) if row else (None, None)
+
+
+def resolve_range(db: Session, source: str, date_from: Optional[date], date_to: Optional[date]) -> Optional[Tuple[date, date]]:
+    """Lengkapi batas yang tidak diisi dengan batas data (default all-time); None jika belum ada data."""
+    if date_from and date_to:
+        return date_from, date_to
+    first, last = data_bounds(db, source)
+    if first is None:
+        return None
+    return date_from or first, date_to or last
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, date
 from typing import List, Optional, Dict, Any
 import calendar
 
+from app.cache import cached
 # ✅ Fix import paths - add 'app.' prefix
 from app.models.product import Product, ProductCategory, Sale, SaleItem, ProductInventory
 from app.models.member import Member, MemberGoal
@@ -16,6 +17,7 @@ from app.schemas.product import (
 # ========================================
 # OVERVIEW TAB FUNCTIONS
 # ========================================
+@cached(ttl=60, tables=("product", "product_category", "sale", "sale_item"))
 def get_product_stats(db: Session) -> ProductStats:
     """Get summary statistics for overview cards"""
     # Total products
@@ -47,6 +49,7 @@ def get_product_stats(db: Session) -> ProductStats:
         low_stock=low_stock
     )
 
+@cached(ttl=120, tables=("product", "sale", "sale_item"))
 def get_top_sales(db: Session, limit: int = 5) -> List[TopSalesData]:
     """Get top selling products for bar chart"""
     results = db.query(
@@ -60,6 +63,7 @@ def get_top_sales(db: Session, limit: int = 5) -> List[TopSalesData]:
     
     return [TopSalesData(name=name, sales=int(sales)) for name, sales in results]
 
+@cached(ttl=300, tables=("product", "product_category"))
 def get_category_distribution(db: Session) -> List[CategoryData]:
     """Get product distribution by category for pie chart"""
     results = db.query(
@@ -79,6 +83,7 @@ def get_category_distribution(db: Session) -> List[CategoryData]:
         for name, count, color_code in results
     ]
 
+@cached(ttl=300, tables=("sale", "sale_item"))
 def get_sales_trend(db: Session) -> List[SalesTrendData]:
     """Get sales trend for line chart (all available data)"""
     # Find the earliest and latest sale dates
@@ -188,6 +193,7 @@ def get_products_with_filters(db: Session, filters: ProductFilter) -> List[Produ
 # ========================================
 # SEGMENTATION TAB FUNCTIONS
 # ========================================
+@cached(ttl=300, tables=("product", "sale", "sale_item", "member", "member_goal"))
 def get_segmentation_data(db: Session, filters: SegmentationFilter) -> List[SegmentationData]:
     """Get product segmentation by member goals and age"""
     # Base query untuk mendapatkan pembelian berdasarkan goal
@@ -11,6 +11,7 @@ from app.models.workout_plan import WorkoutPlan
 from app.models.workout_session import WorkoutSession
 # Import modul alih-alih fungsi langsung
 import app.services.trainer_insight_generator as trainer_insights_svc
+from app.cache import cached
 from datetime import date, timedelta
 import random
 
@@ -23,9 +24,7 @@ def get_trainers(db: Session, skip: int = 0, limit: int = 100):
     return db.query(Trainer).offset(skip).limit(limit).all()
 
 
-async def get_trainer_performance_data(db: Session):
-    current_date_sql = func.current_date()
-
+def _build_trainer_stats(db: Session, feedback_scores: List[float]) -> Dict[str, Any]:
     # Hitung total kelas keseluruhan (mengganti weekly_classes)
     total_classes_overall_query = (
         db.query(func.count(ClassSchedule.schedule_id))
@@ -53,6 +52,42 @@ async def get_trainer_performance_data(db: Session):
         .subquery()
     )
 
+    return {
+        "total_classes_overall": total_classes_overall, # Menggunakan nilai total yang baru
+        "total_trainers_overall": total_trainers_overall, # Menggunakan nilai total yang baru
+        "high_engagement_classes": sum(1 for score in feedback_scores if score >= 4.5),
+        "avg_satisfaction": round(db.query(func.avg(avg_satisfaction_per_trainer.c.avg_satisfaction)).scalar() or 0.0, 2)
+    }
+
+
+@cached(ttl=120, tables=("trainer", "class_schedule", "member_class"))
+def get_trainer_stats(db: Session) -> Dict[str, Any]:
+    """
+    Stats ringkas trainer saja (tanpa chart dan tanpa LLM).
+    Dipakai dashboard utama supaya latency-nya tidak pernah menunggu Groq.
+    """
+    avg_rating_per_trainer = (
+        db.query(func.avg(MemberClass.rating).label("avg_feedback_rating"))
+        .select_from(Trainer)
+        .outerjoin(ClassSchedule, ClassSchedule.trainer_id == Trainer.trainer_id)
+        .outerjoin(MemberClass, MemberClass.schedule_id == ClassSchedule.schedule_id)
+        .group_by(Trainer.trainer_id)
+        .all()
+    )
+    feedback_scores = [
+        round(float(row.avg_feedback_rating), 2) if row.avg_feedback_rating else 0.0
+        for row in avg_rating_per_trainer
+    ]
+    return _build_trainer_stats(db, feedback_scores)
+
+
+def build_trainer_performance_data(db: Session) -> Dict[str, Any]:
+    """
+    Semua data dashboard trainer dari database, tanpa tahap LLM.
+    `insights` dan `alerts` dikembalikan kosong; isi lewat generate_trainer_performance_insights.
+    """
+    current_date_sql = func.current_date()
+
     # Jumlah trainer aktif (yang mengajar minimal 1 kelas minggu ini)
     # Anda mungkin ingin menyimpan ini jika "active_trainers" masih relevan di bagian lain,
     # atau menghapusnya jika hanya total keseluruhan yang dibutuhkan.
@@ -113,8 +148,11 @@ async def get_trainer_performance_data(db: Session):
             Trainer.name,
             Trainer.specialization,
             Trainer.join_date,
-            func.count(ClassSchedule.schedule_id).label("total_classes_taught"),
+            # DISTINCT: join ke MemberClass menggandakan baris jadwal per peserta
+            func.count(func.distinct(ClassSchedule.schedule_id)).label("total_classes_taught"),
             func.avg(MemberClass.rating).label("avg_feedback_rating"),
+            # Member unik per trainer dihitung di query yang sama (bukan satu query per trainer)
+            func.count(func.distinct(MemberClass.member_id)).label("active_members"),
             func.extract('year', func.age(current_date_sql, Trainer.join_date)).label('experience_years_sql')
         )
         .outerjoin(ClassSchedule, ClassSchedule.trainer_id == Trainer.trainer_id)
@@ -125,13 +163,6 @@ async def get_trainer_performance_data(db: Session):
 
     performance_data = []
     for p in performance_results:
-        active_members_count = (
-            db.query(func.count(func.distinct(MemberClass.member_id)))
-            .join(ClassSchedule, ClassSchedule.schedule_id == MemberClass.schedule_id)
-            .filter(ClassSchedule.trainer_id == p.trainer_id)
-            .scalar() or 0
-        )
-        
         retention_rate = float(p.avg_feedback_rating) * 100 / 5 if p.avg_feedback_rating else 0.0
         experience_years = int(p.experience_years_sql) if p.experience_years_sql is not None else 0
 
@@ -148,7 +179,7 @@ async def get_trainer_performance_data(db: Session):
             "classes": p.total_classes_taught,
             "feedback": round(float(p.avg_feedback_rating), 2) if p.avg_feedback_rating else 0.0,
             "retention": round(retention_rate, 2),
-            "activeMembers": active_members_count,
+            "activeMembers": p.active_members or 0,
             "status": status,
             "experience": f"{experience_years} years"
         })
@@ -275,29 +306,41 @@ async def get_trainer_performance_data(db: Session):
         })
 
 
-    # Kirim ke Groq LLM
-    ai_generated_output = await trainer_insights_svc.generate_trainer_insights_and_alerts(
-        performance_data,
-        class_type_data
-    )
-
-    # Return response lengkap ke frontend
+    # Return response ke frontend (tanpa insight LLM)
     return {
-        "stats": {
-            "total_classes_overall": total_classes_overall, # Menggunakan nilai total yang baru
-            "total_trainers_overall": total_trainers_overall, # Menggunakan nilai total yang baru
-            "high_engagement_classes": sum(1 for t in performance_data if t["feedback"] >= 4.5),
-            "avg_satisfaction": round(db.query(func.avg(avg_satisfaction_per_trainer.c.avg_satisfaction)).scalar() or 0.0, 2)
-        },
+        "stats": _build_trainer_stats(db, [t["feedback"] for t in performance_data]),
         "classParticipantsData": class_participants_data,
         "satisfactionTrendData": satisfaction_trend_data,
         "classTypeData": class_type_data, # Menggunakan class_type_data yang sudah diperbaiki warnanya
         "courseComparisonData": course_comparison_data,
         "trainerPerformanceData": performance_data,
-        "insights": ai_generated_output["insights"],
-        "alerts": ai_generated_output["alerts"]
+        "insights": [],
+        "alerts": []
     }
 
+
+async def generate_trainer_performance_insights(
+    dashboard_data: Dict[str, Any],
+    force_refresh: bool = False
+) -> Dict[str, List[Any]]:
+    # Kirim ke Groq LLM (tahap terpisah, bisa dijadwalkan sendiri)
+    return await trainer_insights_svc.generate_trainer_insights_and_alerts(
+        dashboard_data["trainerPerformanceData"],
+        dashboard_data["classTypeData"],
+        force_refresh=force_refresh
+    )
+
+
+async def get_trainer_performance_data(db: Session, include_insights: bool = True):
+    dashboard_data = build_trainer_performance_data(db)
+
+    if include_insights:
+        ai_generated_output = await generate_trainer_performance_insights(dashboard_data)
+        dashboard_data["insights"] = ai_generated_output["insights"]
+        dashboard_data["alerts"] = ai_generated_output["alerts"]
+
+    return dashboard_data
+
 async def get_trainer_activity_data(db: Session, trainer_id: int, days: int = 30) -> List[Dict[str, Any]]:
     end_date = date.today()
     start_date = end_date - timedelta(days=days-1) # Default 30 hari, bisa disesuaikan
@@ -2,8 +2,16 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from app.api.routes import router as api_router
-from app.database import engine, Base
+from app.database import engine, Base, SessionLocal, ensure_indexes
+from app.config import settings
+from app.crud import finance as finance_crud
+from app.crud import member as member_crud
+from app.crud import member_timeseries
+from app.crud import experiment as experiment_crud
+from app.services import background_jobs
+from app.services import event_ingest
 # Import all models so SQLAlchemy knows about them and can create tables
 # from app.models import finance, member, product, trainer # Existing models
 from app.models import inventory # Existing inventory models
@@ -13,6 +21,17 @@ from app.models import chatbot # ✅ NEW: Import feedback models so tables are c
 # Create database tables
 # Ensure all your Base models are imported here or via a single import that registers them
 Base.metadata.create_all(bind=engine)
+# Kolom folded_at harus ada sebelum partial index-nya dibuat
+with SessionLocal() as db:
+    experiment_crud.ensure_fold_columns(db)
+ensure_indexes()
+
+# Isi rollup keuangan sekali jika masih kosong (database yang dibuat sebelum tabel rollup ada)
+# Begitu juga tabel precomputed lain; path baca (cached) tidak pernah mem-bootstrap sendiri
+with SessionLocal() as db:
+    finance_crud.ensure_finance_rollup(db)
+    member_crud.ensure_member_precomputed(db)
+    experiment_crud.ensure_experiment_counters(db)
 
 app = FastAPI(
     title="MIS GYMtrack API",
@@ -39,6 +58,58 @@ app.add_middleware(
 
 app.include_router(api_router, prefix="/api")
 
+@app.on_event("startup")
+async def start_background_jobs():
+    # actual_amount / actual_value budget & target diisi dari rollup keuangan secara inkremental
+    background_jobs.start_periodic_job(
+        "finance_budget_reconcile",
+        finance_crud.reconcile_budget_actuals,
+        settings.FINANCE_RECONCILE_INTERVAL,
+    )
+    # Counter statistik member di-maintain inkremental; rekonsiliasi berkala membuktikan/menjaga ketepatannya
+    background_jobs.start_periodic_job(
+        "member_counter_reconcile",
+        member_crud.reconcile_member_counters,
+        settings.MEMBER_COUNTER_RECONCILE_INTERVAL,
+    )
+    background_jobs.start_periodic_job(
+        "member_cohort_refresh",
+        member_crud.refresh_cohort_retention,
+        settings.COHORT_REFRESH_INTERVAL,
+    )
+    background_jobs.start_periodic_job(
+        "member_funnel_snapshot",
+        member_crud.refresh_funnel_snapshots,
+        settings.FUNNEL_SNAPSHOT_INTERVAL,
+    )
+    background_jobs.start_periodic_job(
+        "experiment_counter_fold",
+        experiment_crud.fold_experiment_logs,
+        settings.EXPERIMENT_FOLD_INTERVAL,
+    )
+    # Sisa event di buffer (di bawah EVENT_FLUSH_SIZE) ditulis berkala
+    background_jobs.start_periodic_job(
+        "event_buffer_flush",
+        event_ingest.flush_events,
+        settings.EVENT_FLUSH_INTERVAL,
+    )
+    if settings.WORKOUT_DAILY_BUCKETS:
+        background_jobs.start_periodic_job(
+            "workout_bucket_refresh",
+            member_timeseries.refresh_workout_buckets,
+            settings.WORKOUT_BUCKET_REFRESH_INTERVAL,
+        )
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    await background_jobs.stop_all_jobs()
+    # Jangan buang event yang masih di buffer
+    try:
+        # Di threadpool: flush ini bisa menunggu lock flush lain tanpa memblokir event loop
+        await run_in_threadpool(background_jobs.run_with_session, event_ingest.flush_events_blocking)
+    except Exception as e:
+        print(f"Error flushing event buffer on shutdown: {e}")
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to MIS GYMtrack API"}
\ No newline at end of file
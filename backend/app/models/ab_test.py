@@ -1,10 +1,31 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, Index, text
+from sqlalchemy.sql import func
 from app.database import Base
 
 class ABTestLog(Base):
     __tablename__ = "ab_test_log"
+    __table_args__ = (
+        # Baris yang belum di-fold ke experiment_counter
+        Index('ix_ab_test_log_unfolded', 'id', postgresql_where=text('folded_at IS NULL')),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     feature = Column(String)
     success = Column(Integer)
     total = Column(Integer)
+    folded_at = Column(DateTime(timezone=True), nullable=True)  # diisi saat di-fold ke experiment_counter
+
+
+class ExperimentCounter(Base):
+    """Counter sukses/percobaan per varian yang di-fold dari ab_test_log / notification_log."""
+    __tablename__ = "experiment_counter"
+    __table_args__ = (
+        UniqueConstraint('source', 'variant', name='unique_experiment_counter'),
+    )
+
+    counter_id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(20), nullable=False)  # 'ab_test' atau 'notification'
+    variant = Column(String, nullable=False)  # ab_test_log.feature / notification_log.type
+    successes = Column(Integer, nullable=False, default=0)
+    trials = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
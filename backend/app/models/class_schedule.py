@@ -10,7 +10,7 @@ class ClassSchedule(Base):
     schedule_date = Column(Date)
     start_time = Column(Time)
     end_time = Column(Time)
-    trainer_id = Column(Integer, ForeignKey("trainer.trainer_id"))
+    trainer_id = Column(Integer, ForeignKey("trainer.trainer_id"), index=True)
     status = Column(String) # Tambahkan kolom status jika ada di ERD atau diperlukan
 
     # Relationships
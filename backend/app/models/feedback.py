@@ -1,12 +1,16 @@
 # app/models/feedback.py
 
-from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey, DECIMAL, Boolean, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey, DECIMAL, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
 
 class Feedback(Base):
     __tablename__ = "feedback"
+    __table_args__ = (
+        # Funnel: "member ini memberi feedback dalam window?"
+        Index('ix_feedback_member_date', 'member_id', 'feedback_date'),
+    )
 
     feedback_id = Column(Integer, primary_key=True, index=True)
     member_id = Column(Integer, ForeignKey("member.member_id"), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -8,6 +8,13 @@ from app.database import Base
 # ========================
 class IncomeTransaction(Base):
     __tablename__ = "income_transaction"
+    __table_args__ = (
+        # Dipakai untuk range tanggal dan keyset pagination (transaction_date, id)
+        Index('ix_income_transaction_date_id', 'transaction_date', 'income_id'),
+        Index('ix_income_transaction_type_date_id', 'income_type', 'transaction_date', 'income_id'),
+        # Funnel: pembayaran membership per member (deteksi perpanjangan)
+        Index('ix_income_transaction_member_type_date', 'member_id', 'income_type', 'transaction_date'),
+    )
 
     income_id = Column(Integer, primary_key=True, index=True)
     transaction_date = Column(Date, nullable=False)
@@ -28,6 +35,11 @@ class IncomeTransaction(Base):
 # ==========================
 class ExpenseTransaction(Base):
     __tablename__ = "expense_transaction"
+    __table_args__ = (
+        # Dipakai untuk range tanggal dan keyset pagination (transaction_date, id)
+        Index('ix_expense_transaction_date_id', 'transaction_date', 'expense_id'),
+        Index('ix_expense_transaction_category_date_id', 'expense_category', 'transaction_date', 'expense_id'),
+    )
 
     expense_id = Column(Integer, primary_key=True, index=True)
     transaction_date = Column(Date, nullable=False)
@@ -74,3 +86,48 @@ class FinancialTarget(Base):
     target_value = Column(Float, nullable=False)
     actual_value = Column(Float, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# ===============================
+# FINANCE MONTHLY ROLLUP TABLE
+# ===============================
+class FinanceMonthlyRollup(Base):
+    __tablename__ = "finance_monthly_rollup"
+    __table_args__ = (
+        UniqueConstraint('year', 'month', 'kind', 'category', name='unique_finance_monthly_rollup'),
+    )
+
+    rollup_id = Column(Integer, primary_key=True, index=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    kind = Column(String(10), nullable=False)  # 'income' atau 'expense'
+    category = Column(String(50), nullable=False)  # income_type / expense_category
+    total_amount = Column(Float, nullable=False, default=0)
+    txn_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# ===============================
+# FINANCE FORECAST MODEL TABLE
+# ===============================
+class FinanceForecastModel(Base):
+    """
+    Statistik cukup (sufficient statistics) model tren + musiman per kategori.
+    Semua kolom bersifat aditif sehingga bulan baru cukup di-"fold" tanpa membaca ulang histori.
+    """
+    __tablename__ = "finance_forecast_model"
+    __table_args__ = (
+        UniqueConstraint('kind', 'category', name='unique_finance_forecast_model'),
+    )
+
+    model_id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(10), nullable=False)  # 'income' atau 'expense'
+    category = Column(String(50), nullable=False)
+    n = Column(Integer, nullable=False, default=0)
+    sum_t = Column(Float, nullable=False, default=0)
+    sum_y = Column(Float, nullable=False, default=0)
+    sum_tt = Column(Float, nullable=False, default=0)
+    sum_ty = Column(Float, nullable=False, default=0)
+    seasonal = Column(Text, nullable=False, default="{}")  # JSON: bulan -> {n, sum_t, sum_y}
+    last_period = Column(Integer, nullable=False)  # indeks bulan terakhir yang sudah di-fold (year*12 + month-1)
+    fitted_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,6 +1,7 @@
 # app/models/member.py
 
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.models.finance import IncomeTransaction
@@ -14,7 +15,7 @@ class Member(Base):
     email = Column(String)
     phone = Column(String)
     birth_date = Column(Date)
-    join_date = Column(Date)
+    join_date = Column(Date, index=True)
     membership_type = Column(String)
     membership_expiry = Column(Date)
     status = Column(String)
@@ -32,9 +33,55 @@ class MemberGoal(Base):
 
     goal_id = Column(Integer, primary_key=True, index=True)
     member_id = Column(Integer, ForeignKey("member.member_id"))
-    goal_type = Column(String)
+    goal_type = Column(String, index=True)
     target_date = Column(Date)
     initial_value = Column(Integer, nullable=True)
     target_value = Column(Integer, nullable=True)
 
     member = relationship("Member", back_populates="goals")
+
+
+class MemberStatCounter(Base):
+    """Counter member yang di-maintain saat insert/ubah status: total, per status, join per bulan."""
+    __tablename__ = "member_stat_counter"
+    __table_args__ = (
+        UniqueConstraint('name', 'key', name='unique_member_stat_counter'),
+    )
+
+    counter_id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(20), nullable=False)  # 'total', 'status', 'joined'
+    key = Column(String(50), nullable=False, default="")  # status atau 'YYYY-MM'
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class MemberCohortRetention(Base):
+    """Matriks retensi cohort (bulan join x bulan ke-N) yang sudah dihitung."""
+    __tablename__ = "member_cohort_retention"
+    __table_args__ = (
+        UniqueConstraint('cohort_month', 'period_index', name='unique_member_cohort_retention'),
+    )
+
+    retention_id = Column(Integer, primary_key=True, index=True)
+    cohort_month = Column(Date, nullable=False)  # tanggal 1 bulan join
+    period_index = Column(Integer, nullable=False)  # 0 = bulan join, 1 = bulan berikutnya, ...
+    cohort_size = Column(Integer, nullable=False, default=0)
+    active_members = Column(Integer, nullable=False, default=0)
+    retention_rate = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class MemberFunnelSnapshot(Base):
+    """Jumlah member per tahap funnel (Workout -> Review -> Loyal) untuk window `window_days` hari s.d. snapshot_date."""
+    __tablename__ = "member_funnel_snapshot"
+    __table_args__ = (
+        UniqueConstraint('snapshot_date', 'window_days', 'stage', name='unique_member_funnel_snapshot'),
+    )
+
+    snapshot_id = Column(Integer, primary_key=True, index=True)
+    snapshot_date = Column(Date, nullable=False)
+    window_days = Column(Integer, nullable=False)
+    stage = Column(String(20), nullable=False)
+    stage_order = Column(Integer, nullable=False)
+    member_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
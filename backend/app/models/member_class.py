@@ -11,8 +11,8 @@ class MemberClass(Base):
     member_class_id = Column(Integer, primary_key=True, index=True)
     member_id = Column(Integer, ForeignKey("member.member_id"))
     class_id = Column(Integer, ForeignKey("class.class_id"))
-    schedule_id = Column(Integer, ForeignKey("class_schedule.schedule_id"))
-    attendance_date = Column(Date) # Tambahkan baris ini kembali
+    schedule_id = Column(Integer, ForeignKey("class_schedule.schedule_id"), index=True)
+    attendance_date = Column(Date, index=True) # Tambahkan baris ini kembali
     attendance_status = Column(String)
     feedback = Column(Text)
     rating = Column(Numeric)
@@ -1,11 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
 from app.database import Base
 
 class NotificationLog(Base):
     __tablename__ = "notification_log"
+    __table_args__ = (
+        # Baris yang belum di-fold ke experiment_counter
+        Index('ix_notification_log_unfolded', 'id', postgresql_where=text('folded_at IS NULL')),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     type = Column(String)
     responded = Column(Integer)
     ignored = Column(Integer)
     timestamp = Column(DateTime)
+    folded_at = Column(DateTime(timezone=True), nullable=True)  # diisi saat di-fold ke experiment_counter
@@ -1,10 +1,15 @@
 # backend/app/models/workout_session.py
-from sqlalchemy import Column, Integer, Date, Time, Text, ForeignKey
+from sqlalchemy import Column, Integer, Date, DateTime, Time, Text, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class WorkoutSession(Base):
     __tablename__ = "workout_session"
+    __table_args__ = (
+        # Query time series: range session_date lalu jam mulai
+        Index('ix_workout_session_date_start', 'session_date', 'start_time'),
+    )
     session_id = Column(Integer, primary_key=True, index=True)
     plan_id = Column(Integer, ForeignKey("workout_plan.plan_id"))
     session_date = Column(Date)
@@ -16,4 +21,28 @@ class WorkoutSession(Base):
 
     workout_plan = relationship("WorkoutPlan", backref="sessions")
     # Jika ada trainer_id:
-    # trainer = relationship("Trainer", backref="workout_sessions_conducted")
\ No newline at end of file
+    # trainer = relationship("Trainer", backref="workout_sessions_conducted")
+
+
+class WorkoutDailyBucket(Base):
+    """Jumlah sesi workout per tanggal x jam mulai (precomputed untuk chart rentang panjang)."""
+    __tablename__ = "workout_daily_bucket"
+    __table_args__ = (
+        UniqueConstraint('bucket_date', 'hour', name='unique_workout_daily_bucket'),
+    )
+
+    bucket_id = Column(Integer, primary_key=True, index=True)
+    bucket_date = Column(Date, nullable=False)
+    hour = Column(Integer, nullable=False)  # 0-23, -1 jika start_time kosong
+    session_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class WorkoutBucketState(Base):
+    """Satu baris: watermark session_id yang sudah masuk workout_daily_bucket."""
+    __tablename__ = "workout_bucket_state"
+
+    state_id = Column(Integer, primary_key=True, index=True)
+    last_session_id = Column(Integer, nullable=False, default=0)
+    last_full_refresh_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
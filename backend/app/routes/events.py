@@ -0,0 +1,51 @@
+# backend/app/routes/events.py
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+
+from app.config import settings
+from app.schemas.member import EventBatch
+from app.services import background_jobs
+from app.services import event_ingest
+
+router = APIRouter()
+
+@router.post("/batch", status_code=202)
+async def ingest_event_batch(batch: EventBatch, background_tasks: BackgroundTasks):
+    """
+    Terima batch event notifikasi / A/B test. Event hanya masuk buffer; penulisan ke database
+    dilakukan bulk oleh flush (ukuran atau interval). 429 jika buffer penuh — kirim ulang nanti.
+    """
+    rows = event_ingest.to_rows(batch)
+    count = sum(len(r) for r in rows.values())
+    if not count:
+        raise HTTPException(status_code=400, detail="Batch contains no events")
+    if count > event_ingest.event_buffer.max_size:
+        # Tidak akan pernah muat di buffer; 429 di sini membuat client retry tanpa akhir
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {count} events, maximum is {event_ingest.event_buffer.max_size}; split the batch",
+        )
+
+    if not event_ingest.event_buffer.offer(rows):
+        raise HTTPException(
+            status_code=429,
+            detail="Event buffer is full, retry later",
+            headers={"Retry-After": str(max(1, int(settings.EVENT_FLUSH_INTERVAL)))},
+        )
+
+    if event_ingest.event_buffer.should_flush():
+        # Flush setelah response terkirim (fungsi sync -> dijalankan di threadpool)
+        background_tasks.add_task(background_jobs.run_with_session, event_ingest.flush_events)
+    return {"accepted": count, "buffered": event_ingest.event_buffer.size}
+
+@router.get("/status")
+async def event_buffer_status():
+    """Isi buffer dan statistik flush (diterima, ditolak, di-flush, error terakhir)."""
+    return event_ingest.event_buffer.status()
+
+@router.post("/flush")
+def flush_event_buffer():
+    try:
+        return background_jobs.run_with_session(event_ingest.flush_events)
+    except Exception as e:
+        print(f"Error flushing event buffer: {e}")
+        raise HTTPException(status_code=500, detail="Failed to flush event buffer")
@@ -0,0 +1,41 @@
+# backend/app/routes/export.py
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.services import export_stream
+
+router = APIRouter()
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: str,
+    format: str = Query("csv", description="csv atau parquet"),
+    date_from: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
+):
+    """
+    Export streaming: transactions, feedback (dengan topik), sales (line item) atau equipment-usage.
+    Data dibaca dengan server-side cursor dan dikirim per chunk, jadi ukuran export tidak dibatasi memori.
+    """
+    if dataset not in export_stream.EXPORT_DATASETS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown dataset '{dataset}'. Available: {', '.join(export_stream.EXPORT_DATASETS)}",
+        )
+    if format not in export_stream.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="format must be csv or parquet")
+    if format == "parquet" and not export_stream.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires the 'pyarrow' package")
+
+    media_type, extension = export_stream.EXPORT_FORMATS[format]
+    stream = export_stream.stream_csv if format == "csv" else export_stream.stream_parquet
+    filename = f"{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+    return StreamingResponse(
+        stream(dataset, date_from, date_to),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
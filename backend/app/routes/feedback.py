@@ -5,8 +5,11 @@ from sqlalchemy.orm import Session
 from datetime import date, datetime
 from typing import List, Dict, Any, Optional
 
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db, get_async_db
 from app.crud import feedback as crud_feedback
+from app.crud.aio import feedback as feedback_aio
 from app.services import sentiment_ai_analyzer # Import the AI analyzer service
 from app.schemas.feedback import (
     Feedback, FeedbackCreate, FeedbackUpdate, FeedbackListItem,
@@ -19,27 +22,27 @@ router = APIRouter()
 
 # --- Dashboard Overview Endpoints ---
 @router.get("/summary", response_model=FeedbackDashboardSummary)
-async def get_feedback_dashboard_summary(db: Session = Depends(get_db)):
+async def get_feedback_dashboard_summary(db: AsyncSession = Depends(get_async_db)):
     """Get overall sentiment summary for the dashboard."""
     try:
-        summary_data = crud_feedback.get_sentiment_dashboard_summary(db)
+        summary_data = await feedback_aio.get_sentiment_dashboard_summary(db)
         return summary_data
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch feedback summary: {e}")
 
 @router.get("/sentiment-distribution", response_model=List[SentimentDistribution])
-async def get_sentiment_distribution(db: Session = Depends(get_db)):
+async def get_sentiment_distribution(db: AsyncSession = Depends(get_async_db)):
     """Get sentiment distribution data for bar chart."""
     try:
-        return crud_feedback.get_sentiment_distribution_data(db)
+        return await feedback_aio.get_sentiment_distribution_data(db)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch sentiment distribution: {e}")
 
 @router.get("/topic-analysis", response_model=List[TopicAnalysisItem])
-async def get_topic_analysis(db: Session = Depends(get_db)):
+async def get_topic_analysis(db: AsyncSession = Depends(get_async_db)):
     """Get topic analysis data for bubble chart."""
     try:
-        return crud_feedback.get_topic_analysis_data(db)
+        return await feedback_aio.get_topic_analysis_data(db)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch topic analysis: {e}")
 
@@ -47,19 +50,19 @@ async def get_topic_analysis(db: Session = Depends(get_db)):
 async def get_daily_sentiment_trends(
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD) for trend data"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD) for trend data"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get daily sentiment trend data for line chart."""
     try:
-        return crud_feedback.get_daily_sentiment_trend_data(db, start_date=start_date, end_date=end_date)
+        return await feedback_aio.get_daily_sentiment_trend_data(db, start_date=start_date, end_date=end_date)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch daily sentiment trends: {e}")
 
 @router.get("/recent-feedback", response_model=List[FeedbackListItem])
-async def get_recent_feedback(limit: int = Query(10, ge=1), db: Session = Depends(get_db)):
+async def get_recent_feedback(limit: int = Query(10, ge=1), db: AsyncSession = Depends(get_async_db)):
     """Get recent feedback items for the dashboard list."""
     try:
-        return crud_feedback.get_feedback_list(db, limit=limit)
+        return await feedback_aio.get_feedback_list(db, limit=limit)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch recent feedback: {e}")
 
@@ -69,9 +72,9 @@ async def get_feedback_types(db: Session = Depends(get_db)):
     return crud_feedback.get_all_feedback_types(db)
 
 @router.get("/member-names", response_model=List[str])
-async def get_member_names(db: Session = Depends(get_db)):
+async def get_member_names(db: AsyncSession = Depends(get_async_db)):
     """Get all member names for filters."""
-    return crud_feedback.get_all_member_names(db)
+    return await feedback_aio.get_all_member_names(db)
 
 # --- AI Insights Endpoints ---
 @router.get("/ai-insights/overall", response_model=List[AIInsight])
@@ -93,22 +96,22 @@ async def get_ai_recommendations(db: Session = Depends(get_db)):
 @router.get("/monthly-sentiment-trends", response_model=List[Dict[str, Any]])
 async def get_monthly_sentiment_trends(
     year: int = Query(2024, description="Year for monthly trends"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get monthly sentiment trends for a specific year."""
     try:
-        return crud_feedback.get_monthly_sentiment_trends(db, year=year)
+        return await feedback_aio.get_monthly_sentiment_trends(db, year=year)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch monthly sentiment trends: {e}")
 
 @router.get("/topic-sentiment-comparison", response_model=Dict[str, List[Dict[str, Any]]])
 async def get_topic_sentiment_comparison(
     year: int = Query(2024, description="Year for topic comparison"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get topic sentiment comparison between first and second half of year."""
     try:
-        return crud_feedback.get_topic_sentiment_comparison(db, year=year)
+        return await feedback_aio.get_topic_sentiment_comparison(db, year=year)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch topic sentiment comparison: {e}")
 
@@ -132,10 +135,10 @@ async def get_all_feedback(
     search_query: Optional[str] = Query(None),
     skip: int = Query(0, ge=0), 
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a comprehensive list of feedback with filters."""
-    return crud_feedback.get_feedback_list(
+    return await feedback_aio.get_feedback_list(
         db, member_id, feedback_type, sentiment, start_date, end_date, search_query, skip, limit
     )
 
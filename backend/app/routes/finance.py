@@ -1,72 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date, datetime
 import calendar
 from typing import List, Dict, Any, Optional
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.crud import finance as finance_crud
+from app.crud.aio import finance as finance_aio, run_sync
+from app.schemas.finance import IncomeTransactionCreate, ExpenseTransactionCreate
+from app.services import finance_analytics, finance_forecast, finance_ingest
 from app.services.finance_insight_generator import generate_finance_insights
 
 router = APIRouter()
 
 
+async def _resolve_year(db, year: Optional[int]) -> int:
+    return year or await finance_aio.get_latest_finance_year(db)
+
+
 @router.get("/summary")
-async def get_financial_summary(year: int = Query(default=2024), db: Session = Depends(get_db)):
+async def get_financial_summary(year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"), db: AsyncSession = Depends(get_async_db)):
     try:
-        return finance_crud.get_financial_summary(db, year)
+        year = await _resolve_year(db, year)
+        return await finance_aio.get_financial_summary(db, year)
     except Exception as e:
         print(f"Error in get_financial_summary: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/income-vs-expenses")
-async def get_income_vs_expenses(year: int = Query(default=2024), db: Session = Depends(get_db)):
+async def get_income_vs_expenses(year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"), db: AsyncSession = Depends(get_async_db)):
     try:
-        return finance_crud.get_income_vs_expenses(db, year)
+        year = await _resolve_year(db, year)
+        analytics = await run_sync(db, finance_analytics.get_finance_analytics, year)
+        return analytics["income_vs_expenses"]
     except Exception as e:
         print(f"Error in get_income_vs_expenses: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/income-breakdown")
-async def get_income_breakdown(year: int = Query(default=2024), db: Session = Depends(get_db)):
+async def get_income_breakdown(year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"), db: AsyncSession = Depends(get_async_db)):
     try:
-        return finance_crud.get_income_breakdown(db, year)
+        year = await _resolve_year(db, year)
+        analytics = await run_sync(db, finance_analytics.get_finance_analytics, year)
+        return analytics["income_breakdown"]
     except Exception as e:
         print(f"Error in get_income_breakdown: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/expense-breakdown")
-async def get_expense_breakdown(year: int = Query(default=2024), db: Session = Depends(get_db)):
+async def get_expense_breakdown(year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"), db: AsyncSession = Depends(get_async_db)):
     try:
-        return finance_crud.get_expense_breakdown(db, year)
+        year = await _resolve_year(db, year)
+        analytics = await run_sync(db, finance_analytics.get_finance_analytics, year)
+        return analytics["expense_breakdown"]
     except Exception as e:
         print(f"Error in get_expense_breakdown: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/recent-transactions")
-async def get_recent_transactions(limit: int = 10, db: Session = Depends(get_db)):
+async def get_recent_transactions(limit: int = 10, db: AsyncSession = Depends(get_async_db)):
     try:
-        return finance_crud.get_recent_transactions(db, limit)
+        return await finance_aio.get_recent_transactions(db, limit)
     except Exception as e:
         print(f"Error in get_recent_transactions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/ai-insights")
-async def get_ai_insights(db: Session = Depends(get_db)):
+async def get_ai_insights(year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"), db: AsyncSession = Depends(get_async_db)):
     try:
-        year = 2024
-        financial_summary = finance_crud.get_financial_summary(db, year)
-        income_breakdown = finance_crud.get_income_breakdown(db, year)
-        expense_breakdown = finance_crud.get_expense_breakdown(db, year)
-        monthly_trends = finance_crud.get_income_vs_expenses(db, year)
-        recent_transactions = finance_crud.get_recent_transactions(db, 10)
+        year = await _resolve_year(db, year)
+        financial_summary = await finance_aio.get_financial_summary(db, year)
+        analytics = await run_sync(db, finance_analytics.get_finance_analytics, year)
+        income_breakdown = analytics["income_breakdown"]
+        expense_breakdown = analytics["expense_breakdown"]
+        monthly_trends = analytics["income_vs_expenses"]
+        recent_transactions = await finance_aio.get_recent_transactions(db, 10)
 
         insights = await generate_finance_insights(
             db=db,
@@ -89,174 +104,264 @@ async def get_ai_insights(db: Session = Depends(get_db)):
 async def get_filtered_transactions(
     type: Optional[str] = Query(None, description="Type of transaction (income or expense)"),
     category: Optional[str] = Query(None, description="Category of transaction"),
-    date_from: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    date_to: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    date_from: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     limit: int = Query(20, ge=1, description="Number of transactions to return"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: Session = Depends(get_db)
+    offset: int = Query(0, ge=0, description="Offset for pagination (diabaikan jika cursor diisi)"),
+    cursor: Optional[str] = Query(None, description="next_cursor dari halaman sebelumnya"),
+    include_counts: bool = Query(False, description="Sertakan jumlah transaksi per kategori"),
+    year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Fetches a list of transactions (income or expense) based on provided filters.
+    Gunakan `next_cursor` untuk halaman berikutnya; biayanya sama untuk halaman ke berapa pun.
     """
     try:
-        # Panggil fungsi CRUD yang akan menangani logika filtering database
-        # Anda perlu membuat fungsi ini di app/crud/finance.py
-        transactions_data, categories_data = finance_crud.get_filtered_transactions(
-            db, type, category, date_from, date_to, limit, offset
+        # `year` hanya diteruskan jika diisi; tanpa year dan tanpa rentang tanggal crud memakai tahun terakhir
+        transactions_data, categories_data, next_cursor = await finance_aio.get_filtered_transactions(
+            db, type, category, date_from, date_to, limit, offset, cursor, year
         )
 
-        return {
+        response = {
             "transactions": transactions_data,
-            "categories": categories_data
+            "categories": categories_data,
+            "next_cursor": next_cursor
         }
+        if include_counts:
+            # Jumlah per kategori untuk satu tahun penuh (tidak mengikuti filter tanggal/kategori)
+            response["category_facets"] = await finance_aio.get_category_facets(db, await _resolve_year(db, year), type)
+        return response
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error in get_filtered_transactions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/income-analysis")
-async def get_income_analysis(db: Session = Depends(get_db)):
-    """Get total income and chart grouped by income_type and month"""
+# ========================================
+# DATE-RANGE SERIES & MULTI-YEAR COMPARISON
+# ========================================
+@router.get("/series")
+async def get_finance_series(
+    date_from: date = Query(..., description="Start date (YYYY-MM-DD)"),
+    date_to: date = Query(..., description="End date (YYYY-MM-DD), inklusif"),
+    granularity: str = Query("month", description="week, month atau quarter"),
+    category: Optional[str] = Query(None, description="Filter kategori income/expense"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Income, expenses dan net per periode untuk rentang tanggal bebas (bisa lintas tahun)."""
     try:
-        year = 2024  # atau gunakan Query param jika ingin fleksibel
-        query = text("""
-            SELECT income_type, EXTRACT(MONTH FROM transaction_date) AS month_num, SUM(amount) AS amount
-            FROM income_transaction
-            WHERE EXTRACT(YEAR FROM transaction_date) = :year
-            GROUP BY income_type, month_num
-            ORDER BY month_num, income_type
-        """)
-        results = db.execute(query, {"year": year}).fetchall()
-
-        monthly_data = {}
-        for row in results:
-            month = int(row.month_num)
-            if month not in monthly_data:
-                monthly_data[month] = {}
-            monthly_data[month][row.income_type] = int(row.amount)
-
-        all_types = ['membership', 'personal_training', 'class_fee', 'product_sale']
-        chart_data = []
-        for m in range(1, 13):
-            entry = {"month": calendar.month_abbr[m]}
-            for t in all_types:
-                entry[t] = monthly_data.get(m, {}).get(t, 0)
-            entry["total"] = sum(entry[t] for t in all_types)
-            chart_data.append(entry)
-
-        # Hitung bulan terakhir dan sebelumnya
-        available_months = sorted(monthly_data.keys())
-        latest = available_months[-1] if available_months else None
-        previous = available_months[-2] if len(available_months) >= 2 else None
-
-        latest_total = sum(monthly_data.get(latest, {}).values()) if latest else 0
-        previous_total = sum(monthly_data.get(previous, {}).values()) if previous else 0
-        growth = (
-            ((latest_total - previous_total) / previous_total) * 100
-            if previous_total > 0 else 0
-        )
+        return await finance_aio.get_finance_series(db, date_from, date_to, granularity, category)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error in get_finance_series: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Biggest source in latest month
-        biggest = {"name": "N/A", "amount": 0}
-        if latest and monthly_data.get(latest):
-            biggest_type = max(monthly_data[latest].items(), key=lambda x: x[1])
-            biggest = {"name": biggest_type[0], "amount": biggest_type[1]}
-
-        return {
-            "current_month_total": latest_total,
-            "growth_percentage": round(growth, 2),
-            "biggest_source": biggest,
-            "monthly_chart_data": chart_data
-        }
 
+@router.get("/year-comparison")
+async def get_year_comparison(
+    years: Optional[List[int]] = Query(None, description="Tahun yang dibandingkan, mis. ?years=2023&years=2024"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Perbandingan bulanan beberapa tahun dalam satu request. Default: tahun terakhir dan tahun sebelumnya."""
+    try:
+        if not years:
+            latest = await finance_aio.get_latest_finance_year(db)
+            years = [latest - 1, latest]
+        return await finance_aio.get_year_comparison(db, tuple(sorted(set(years))))
+    except Exception as e:
+        print(f"Error in get_year_comparison: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ========================================
+# FORECAST
+# ========================================
+def _load_forecast(db: Session, horizon: int, kind: Optional[str], category: Optional[str]):
+    # Refit hanya menyentuh bulan yang baru tutup; selebihnya forecast dibaca dari cache/model tersimpan
+    finance_forecast.refit_if_stale(db)
+    return finance_forecast.get_forecast(db, horizon, kind, category)
+
+
+@router.get("/forecast")
+async def get_finance_forecast(
+    horizon: int = Query(6, ge=1, le=24, description="Jumlah bulan ke depan"),
+    kind: Optional[str] = Query(None, description="income atau expense"),
+    category: Optional[str] = Query(None, description="Kategori income/expense"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Forecast income/expense per kategori (tren + musiman) untuk beberapa bulan ke depan."""
+    try:
+        return await run_sync(db, _load_forecast, horizon, kind, category)
+    except Exception as e:
+        print(f"Error in get_finance_forecast: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/forecast/refit")
+def refit_finance_forecast(
+    full: bool = Query(False, description="Fit ulang dari seluruh histori (mis. setelah transaksi lama diubah)"),
+    db: Session = Depends(get_db)
+):
+    try:
+        return finance_forecast.refit_forecast_models(db, full=full)
+    except Exception as e:
+        print(f"Error in refit_finance_forecast: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ========================================
+# BUDGET VS ACTUAL
+# ========================================
+@router.get("/budget/variance")
+async def get_budget_variance(
+    year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Kosongkan untuk satu tahun penuh"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Allocated vs actual per kategori dan target vs actual (nilai actual diisi job rekonsiliasi)."""
+    try:
+        year = await _resolve_year(db, year)
+        return await finance_aio.get_budget_variance(db, year, month)
+    except Exception as e:
+        print(f"Error in get_budget_variance: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/budget/burn-down")
+async def get_budget_burn_down(
+    year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"),
+    category: Optional[str] = Query(None, description="Kategori expense"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        year = await _resolve_year(db, year)
+        return await finance_aio.get_budget_burn_down(db, year, category)
+    except Exception as e:
+        print(f"Error in get_budget_burn_down: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/budget/reconcile")
+def reconcile_budget_actuals(
+    full: bool = Query(False, description="Rekonsiliasi semua bulan, bukan hanya yang berubah"),
+    db: Session = Depends(get_db)
+):
+    """Jalankan rekonsiliasi budget/target sekarang (biasanya dijalankan otomatis di background)."""
+    try:
+        return finance_crud.reconcile_budget_actuals(db, full=full)
+    except Exception as e:
+        print(f"Error in reconcile_budget_actuals: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/income-analysis")
+async def get_income_analysis(year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"), db: AsyncSession = Depends(get_async_db)):
+    """Get total income and chart grouped by income_type and month"""
+    try:
+        year = await _resolve_year(db, year)
+        analytics = await run_sync(db, finance_analytics.get_finance_analytics, year)
+        return analytics["income_analysis"]
     except Exception as e:
         print(f"Error in get_income_analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/expense-analysis")
-async def get_expense_analysis(db: Session = Depends(get_db)):
+async def get_expense_analysis(year: Optional[int] = Query(None, description="Default: tahun terakhir yang punya data"), db: AsyncSession = Depends(get_async_db)):
     """Get total expenses grouped by month and category"""
     try:
-        year = 2024
-        query = text("""
-            SELECT expense_category, EXTRACT(MONTH FROM transaction_date) AS month_num, SUM(amount) AS amount
-            FROM expense_transaction
-            WHERE EXTRACT(YEAR FROM transaction_date) = :year
-            GROUP BY expense_category, month_num
-            ORDER BY month_num, expense_category
-        """)
-        results = db.execute(query, {"year": year}).fetchall()
-
-        fixed = {"rent", "staff_salary"}
-        variable = {"utilities", "equipment", "marketing", "maintenance"}
-
-        monthly_data = {}
-        for row in results:
-            month = int(row.month_num)
-            if month not in monthly_data:
-                monthly_data[month] = {"fixed": 0, "variable": 0}
-            if row.expense_category in fixed:
-                monthly_data[month]["fixed"] += int(row.amount)
-            elif row.expense_category in variable:
-                monthly_data[month]["variable"] += int(row.amount)
-
-        chart_data = []
-        for m in range(1, 13):
-            data = monthly_data.get(m, {"fixed": 0, "variable": 0})
-            chart_data.append({
-                "month": calendar.month_abbr[m],
-                "fixed": data["fixed"],
-                "variable": data["variable"],
-                "total": data["fixed"] + data["variable"]
-            })
-
-        # Hitung bulan terakhir dan sebelumnya
-        available_months = sorted(monthly_data.keys())
-        latest = available_months[-1] if available_months else None
-        previous = available_months[-2] if len(available_months) >= 2 else None
-
-        latest_total = sum(monthly_data.get(latest, {}).values()) if latest else 0
-        previous_total = sum(monthly_data.get(previous, {}).values()) if previous else 0
-        growth = (
-            ((latest_total - previous_total) / previous_total) * 100
-            if previous_total > 0 else 0
-        )
+        year = await _resolve_year(db, year)
+        analytics = await run_sync(db, finance_analytics.get_finance_analytics, year)
+        return analytics["expense_analysis"]
+    except Exception as e:
+        print(f"Error in get_expense_analysis: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Kategori terbesar di bulan terakhir
-        biggest = {"name": "N/A", "amount": 0}
-        if latest:
-            # Hitung semua kategori untuk bulan terakhir
-            query2 = text("""
-                SELECT expense_category, SUM(amount) AS amount
-                FROM expense_transaction
-                WHERE EXTRACT(YEAR FROM transaction_date) = :year
-                  AND EXTRACT(MONTH FROM transaction_date) = :month
-                GROUP BY expense_category
-            """)
-            res = db.execute(query2, {"year": year, "month": latest}).fetchall()
-            if res:
-                max_cat = max(res, key=lambda r: r.amount)
-                biggest = {"name": max_cat.expense_category, "amount": int(max_cat.amount)}
-
-        # Hitung persentase fixed vs variable
-        total = latest_total
-        fixed_amt = monthly_data.get(latest, {}).get("fixed", 0)
-        variable_amt = monthly_data.get(latest, {}).get("variable", 0)
-        fixed_pct = round((fixed_amt / total) * 100, 1) if total else 0
-        variable_pct = round((variable_amt / total) * 100, 1) if total else 0
-
-        return {
-            "current_month_total": latest_total,
-            "growth_percentage": round(growth, 2),
-            "biggest_category": biggest,
-            "fixed_vs_variable": {
-                "fixed_percentage": fixed_pct,
-                "variable_percentage": variable_pct
-            },
-            "monthly_chart_data": chart_data
-        }
 
+# ========================================
+# BULK INGEST (CSV / NDJSON)
+# ========================================
+@router.post("/ingest/{kind}")
+async def ingest_transactions(
+    kind: str,
+    request: Request,
+    format: str = Query("csv", description="csv (baris pertama header) atau ndjson"),
+    batch_size: int = Query(finance_ingest.DEFAULT_BATCH_SIZE, ge=100, le=50000),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream body request (export POS/bank) ke income_transaction atau expense_transaction.
+    Baris divalidasi per batch dan dimuat lewat COPY. Baris ber-reference_id/receipt_number yang sudah ada
+    dilewati; baris tanpa identifier selalu di-insert.
+    """
+    if kind not in finance_ingest.INGEST_SOURCES:
+        raise HTTPException(status_code=400, detail=f"Unknown kind '{kind}', expected income or expense")
+    try:
+        session = finance_ingest.IngestSession(kind, format, batch_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        async for line in finance_ingest.iter_stream_lines(request.stream()):
+            ready = session.add_line(line)
+            if ready:
+                # Load di threadpool supaya event loop tetap bisa membaca chunk berikutnya
+                await run_in_threadpool(session.flush, db, ready)
+        await run_in_threadpool(session.flush, db, session.close())
+        return session.result()
     except Exception as e:
-        print(f"Error in get_expense_analysis: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        db.rollback()
+        print(f"Error in ingest_transactions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ========================================
+# TRANSACTION INPUT + ROLLUP MAINTENANCE
+# ========================================
+def _format_created_transaction(transaction, type: str, category: str, id: int):
+    return {
+        "id": f"{type}_{id}",
+        "date": transaction.transaction_date.strftime("%Y-%m-%d"),
+        "type": type,
+        "category": category.replace("_", " ").title(),
+        "amount": int(transaction.amount),
+        "payment_method": transaction.payment_method,
+        "description": transaction.description,
+        "status": "Completed"
+    }
+
+
+@router.post("/income", status_code=201)
+def create_income_transaction(transaction: IncomeTransactionCreate, db: Session = Depends(get_db)):
+    """Catat pemasukan baru; rollup bulanan ikut di-update di transaksi yang sama."""
+    try:
+        created = finance_crud.create_income_transaction(db, transaction)
+        return _format_created_transaction(created, "income", created.income_type, created.income_id)
+    except Exception as e:
+        print(f"Error in create_income_transaction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/expenses", status_code=201)
+def create_expense_transaction(transaction: ExpenseTransactionCreate, db: Session = Depends(get_db)):
+    """Catat pengeluaran baru; rollup bulanan ikut di-update di transaksi yang sama."""
+    try:
+        created = finance_crud.create_expense_transaction(db, transaction)
+        return _format_created_transaction(created, "expense", created.expense_category, created.expense_id)
+    except Exception as e:
+        print(f"Error in create_expense_transaction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rollup/rebuild")
+def rebuild_finance_rollup(year: Optional[int] = Query(None, description="Rebuild satu tahun saja"), db: Session = Depends(get_db)):
+    """Hitung ulang finance_monthly_rollup dari tabel transaksi (mis. setelah import/edit langsung di database)."""
+    try:
+        rows = finance_crud.rebuild_finance_rollup(db, year)
+        return {"status": "rebuilt", "year": year, "rollup_rows": rows}
+    except Exception as e:
+        print(f"Error in rebuild_finance_rollup: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
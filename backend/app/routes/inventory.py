@@ -4,8 +4,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status, Response #
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db, get_async_db
 from app.crud import inventory as crud_inventory
+from app.crud.aio import inventory as inventory_aio
 from app.schemas.inventory import (
     EquipmentCategory, EquipmentCategoryCreate, EquipmentCategoryUpdate,
     Supplier, SupplierCreate, SupplierUpdate,
@@ -24,10 +27,10 @@ router = APIRouter()
 
 # --- Inventory Dashboard Endpoints ---
 @router.get("/summary", response_model=InventorySummary)
-async def get_inventory_dashboard_summary(db: Session = Depends(get_db)):
+async def get_inventory_dashboard_summary(db: AsyncSession = Depends(get_async_db)):
     """Get overall inventory summary for the dashboard."""
     try:
-        summary_data = crud_inventory.get_inventory_summary(db)
+        summary_data = await inventory_aio.get_inventory_summary(db)
         return InventorySummary(**summary_data)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch inventory summary: {e}")
@@ -39,19 +42,19 @@ async def get_dashboard_equipment_list(
     search_query: Optional[str] = Query(None, description="Search by equipment name"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of equipment for the inventory dashboard table with filters."""
     try:
-        equipment_list = crud_inventory.get_inventory_table_data(db, skip=skip, limit=limit, status=status, category_name=category_name, search_query=search_query)
+        equipment_list = await inventory_aio.get_inventory_table_data(db, skip=skip, limit=limit, status=status, category_name=category_name, search_query=search_query)
         return equipment_list
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to fetch dashboard equipment: {e}")
 
 @router.get("/trends", response_model=Dict[str, Any])
-async def get_inventory_trends(db: Session = Depends(get_db)):
+async def get_inventory_trends(db: AsyncSession = Depends(get_async_db)):
     try:
-        trends_data = crud_inventory.get_usage_and_maintenance_trends(db)
+        trends_data = await inventory_aio.get_usage_and_maintenance_trends(db)
         return trends_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch inventory trends: {e}")
@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 
@@ -7,18 +10,33 @@ from app.crud.member import (
     get_member_stats,
     get_member_activity,
     get_member_segments,
+    get_segment_members,
+    create_member,
+    update_member_status,
+    reconcile_member_counters,
+    get_cohort_retention,
+    refresh_cohort_retention,
     get_workout_time,
     get_conversion_funnel,
+    compare_conversion_funnel,
+    refresh_funnel_snapshots,
     get_notification_response,
     get_ab_test_data,
 )
+from app.crud import member_timeseries
+from app.crud import experiment as experiment_crud
 
 # Schemas
 from app.schemas.member import (
     Insight,
     MemberStats,
     MemberActivity,
+    TimeSeriesPoint,
     SegmentData,
+    SegmentMembersPage,
+    Member,
+    MemberCreate,
+    MemberStatusUpdate,
     WorkoutTime,
     FunnelStep,
     NotificationResponse,
@@ -27,6 +45,7 @@ from app.schemas.member import (
 
 # LLM Insight
 from app.services.insight_generator import generate_insights
+from app.services import experiment_analytics
 
 router = APIRouter()
 
@@ -41,22 +60,111 @@ async def member_insight(db: Session = Depends(get_db)):
 def member_stats(db: Session = Depends(get_db)):
     return get_member_stats(db)
 
+@router.post("/stats/members/reconcile")
+def member_stats_reconcile(db: Session = Depends(get_db)):
+    """Cocokkan counter member dengan tabel member; `drift` berisi counter yang diperbaiki."""
+    return reconcile_member_counters(db)
+
 @router.get("/stats/member-activity", response_model=list[MemberActivity])
-def member_activity(db: Session = Depends(get_db)):
-    return get_member_activity(db)
+def member_activity(
+    date_from: Optional[date] = Query(None, description="Default: seluruh histori join"),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_db)
+):
+    try:
+        return get_member_activity(db, date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# ===== Time Series (range-bounded, gap-filled) =====
+@router.get("/stats/timeseries/joins", response_model=list[TimeSeriesPoint])
+def join_timeseries(
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    granularity: str = Query("month", description="day | week | month"),
+    db: Session = Depends(get_db)
+):
+    try:
+        return member_timeseries.get_join_series(db, date_from, date_to, granularity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/stats/timeseries/workouts", response_model=list[TimeSeriesPoint])
+def workout_timeseries(
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    granularity: str = Query("day", description="day | week | month"),
+    db: Session = Depends(get_db)
+):
+    try:
+        return member_timeseries.get_workout_series(db, date_from, date_to, granularity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/stats/timeseries/workout-buckets/refresh")
+def refresh_workout_buckets(full: bool = False, db: Session = Depends(get_db)):
+    """
+    Inkremental: tanggal dengan sesi baru (termasuk yang di-backdate) + 3 hari terakhir.
+    Pakai `full=true` setelah mengubah atau menghapus sesi lama.
+    """
+    return member_timeseries.refresh_workout_buckets(db, full=full)
+
+@router.get("/stats/timeseries/workout-buckets/status")
+def workout_bucket_status(db: Session = Depends(get_db)):
+    return member_timeseries.get_bucket_state(db)
 
 # ===== Chart Data Endpoints =====
 @router.get("/stats/member-segment", response_model=list[SegmentData])
-def member_segments(db: Session = Depends(get_db)):
-    return get_member_segments(db)
+def member_segments(preview: int = Query(10, ge=0, le=100), db: Session = Depends(get_db)):
+    return get_member_segments(db, preview=preview)
+
+@router.get("/stats/member-segment/{goal}/members", response_model=SegmentMembersPage)
+def member_segment_members(
+    goal: str,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    return get_segment_members(db, goal, limit=limit, offset=offset)
+
+@router.get("/stats/cohort-retention")
+def cohort_retention(months: int = Query(12, ge=1, le=60), db: Session = Depends(get_db)):
+    """Heatmap retensi cohort (bulan join x bulan ke-N) dari tabel precomputed."""
+    return get_cohort_retention(db, months=months)
+
+@router.post("/stats/cohort-retention/refresh")
+def cohort_retention_refresh(full: bool = Query(False), db: Session = Depends(get_db)):
+    return refresh_cohort_retention(db, full=full)
 
 @router.get("/stats/workout-time", response_model=list[WorkoutTime])
-def workout_time(db: Session = Depends(get_db)):
-    return get_workout_time(db)
+def workout_time(
+    date_from: Optional[date] = Query(None, description="Default: seluruh histori sesi"),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_db)
+):
+    try:
+        return get_workout_time(db, date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/stats/conversion-funnel", response_model=list[FunnelStep])
-def conversion_funnel(db: Session = Depends(get_db)):
-    return get_conversion_funnel(db)
+def conversion_funnel(
+    snapshot_date: Optional[date] = Query(None, description="Default: snapshot terbaru"),
+    db: Session = Depends(get_db)
+):
+    return get_conversion_funnel(db, snapshot_date)
+
+@router.get("/stats/conversion-funnel/compare")
+def conversion_funnel_compare(
+    snapshot_date: date = Query(...),
+    compare_date: date = Query(...),
+    db: Session = Depends(get_db)
+):
+    return compare_conversion_funnel(db, snapshot_date, compare_date)
+
+@router.post("/stats/conversion-funnel/refresh")
+def conversion_funnel_refresh(full: bool = False, db: Session = Depends(get_db)):
+    return refresh_funnel_snapshots(db, full=full)
 
 @router.get("/stats/notification-response", response_model=list[NotificationResponse])
 def notification_response(db: Session = Depends(get_db)):
@@ -65,3 +173,35 @@ def notification_response(db: Session = Depends(get_db)):
 @router.get("/stats/ab-test", response_model=list[ABTestData])
 def ab_test_data(db: Session = Depends(get_db)):
     return get_ab_test_data(db)
+
+# ===== Experiment analytics (conversion rate, Wilson CI, uji z vs baseline) =====
+@router.get("/stats/experiments/{source}")
+def experiment_report(
+    source: str,
+    baseline: Optional[str] = Query(None, description="Default: varian dengan percobaan terbanyak"),
+    confidence: float = Query(0.95, gt=0.5, lt=1),
+    db: Session = Depends(get_db)
+):
+    try:
+        return experiment_analytics.get_experiment_report(db, source, baseline, confidence)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/stats/experiments/refresh")
+def refresh_experiment_counters(full: bool = False, db: Session = Depends(get_db)):
+    return experiment_crud.fold_experiment_logs(db, full=full)
+
+# ===== Member Writes (meng-update counter statistik) =====
+def _member_response(member) -> dict:
+    return {"id": str(member.member_id), "name": member.name, "joinDate": str(member.join_date), "status": member.status}
+
+@router.post("/members", response_model=Member, status_code=201)
+def add_member(member: MemberCreate, db: Session = Depends(get_db)):
+    return _member_response(create_member(db, member))
+
+@router.patch("/members/{member_id}/status", response_model=Member)
+def change_member_status(member_id: int, payload: MemberStatusUpdate, db: Session = Depends(get_db)):
+    member = update_member_status(db, member_id, payload.status)
+    if member is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    return _member_response(member)
@@ -1,16 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.services.groq_client import get_groq_client
 from app.services.product_insight_generator import generate_product_insights
+from sqlalchemy.ext.asyncio import AsyncSession
 # ✅ Fix import paths - add 'app.' prefix
-from app.database import get_db
-# ✅ Fix import paths - add 'app.' prefix
-from app.crud.product import (
-    get_product_stats, get_top_sales, get_category_distribution, 
-    get_sales_trend, get_products_with_filters, get_segmentation_data,
-    get_cross_sell_data, get_segmentation_insights, get_products_for_simulation,
-    simulate_price_change, generate_price_impact_chart)
+from app.database import get_async_db
+from app.crud.aio import product as product_aio
 from app.schemas.product import (
     ProductStats, TopSalesData, CategoryData, SalesTrendData,
     ProductResponse, SegmentationData, CrossSellData, ProductFilter,
@@ -23,7 +18,7 @@ router = APIRouter(prefix="/product", tags=["products"])
 # OVERVIEW TAB ENDPOINTS
 # ========================================
 @router.get("/stats", response_model=ProductStats)
-async def get_product_statistics(db: Session = Depends(get_db)):
+async def get_product_statistics(db: AsyncSession = Depends(get_async_db)):
     """
     Get product statistics for overview dashboard cards
     - Total products
@@ -32,52 +27,52 @@ async def get_product_statistics(db: Session = Depends(get_db)):
     - Low stock count
     """
     try:
-        return get_product_stats(db)
+        return await product_aio.get_product_stats(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching product stats: {str(e)}")
 
 @router.get("/top-sales", response_model=List[TopSalesData])
 async def get_top_selling_products(
     limit: int = Query(5, ge=1, le=20),
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Get top selling products for bar chart
     """
     try:
-        return get_top_sales(db, limit)
+        return await product_aio.get_top_sales(db, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching top sales: {str(e)}")
 
 @router.get("/category-distribution", response_model=List[CategoryData])
-async def get_product_category_distribution(db: Session = Depends(get_db)):
+async def get_product_category_distribution(db: AsyncSession = Depends(get_async_db)):
     """
     Get product distribution by category for pie chart
     """
     try:
-        return get_category_distribution(db)
+        return await product_aio.get_category_distribution(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching category distribution: {str(e)}")
 
 @router.get("/trend", response_model=List[SalesTrendData])
 async def get_product_sales_trend( # Removed days parameter
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Get sales trend for line chart (all available data)
     """
     try:
-        return get_sales_trend(db) # Removed days argument
+        return await product_aio.get_sales_trend(db) # Removed days argument
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching sales trend: {str(e)}")
 
 @router.get("/insights", response_model=List[ProductInsight])
-async def get_product_ai_insights(db: Session = Depends(get_db)):
+async def get_product_ai_insights(db: AsyncSession = Depends(get_async_db)):
     """
     Generate AI insights specifically for product & supplement management using Groq
     """
     try:
         # Get comprehensive product data for AI analysis
-        stats = get_product_stats(db)
-        top_sales = get_top_sales(db, 10)
+        stats = await product_aio.get_product_stats(db)
+        top_sales = await product_aio.get_top_sales(db, 10)
         # Generate specialized product insights using Groq
         groq_client = get_groq_client()
         insights = await generate_product_insights(groq_client, stats, top_sales)
@@ -93,13 +88,13 @@ async def get_products(
     category: str = Query("all", description="Filter by category: all, supplement, equipment, accessory"),
     lowStock: bool = Query(False, description="Show only low stock items"),
     sortBy: str = Query("bestseller", description="Sort by: bestseller, cheapest, newest"),
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Get products list with filters for product table
     """
     try:
         filters = ProductFilter(category=category, lowStock=lowStock, sortBy=sortBy)
-        return get_products_with_filters(db, filters)
+        return await product_aio.get_products_with_filters(db, filters)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
 
@@ -110,23 +105,23 @@ async def get_products(
 async def get_product_segmentation(
     goal: str = Query("all", description="Filter by goal: all, weight-loss, muscle-gain, endurance"),
     age_range: str = Query("all", description="Filter by age: all, 18-25, 26-35, 36-45, 46+"),
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Get product segmentation by member goals and age ranges
     """
     try:
         filters = SegmentationFilter(goal=goal, ageRange=age_range)
-        return get_segmentation_data(db, filters)
+        return await product_aio.get_segmentation_data(db, filters)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching segmentation data: {str(e)}")
 
 @router.get("/cross-sell", response_model=List[CrossSellData])
-async def get_cross_sell_analysis(db: Session = Depends(get_db)):
+async def get_cross_sell_analysis(db: AsyncSession = Depends(get_async_db)):
     """
     Get cross-sell analysis showing products frequently bought together
     """
     try:
-        return get_cross_sell_data(db)
+        return await product_aio.get_cross_sell_data(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching cross-sell data: {str(e)}")
 
@@ -137,13 +132,13 @@ async def get_cross_sell_analysis(db: Session = Depends(get_db)):
 async def get_segmentation_specific_insights(
     goal: str = Query("all", description="Filter by goal: all, weight-loss, muscle-gain, endurance"),
     age_range: str = Query("all", description="Filter by age: all, 18-25, 26-35, 36-45, 46+"),
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Get insights specific to segmentation analysis
     """
     try:
         filters = SegmentationFilter(goal=goal, ageRange=age_range)
-        return get_segmentation_insights(db, filters)
+        return await product_aio.get_segmentation_insights(db, filters)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching segmentation insights: {str(e)}")
 
@@ -151,12 +146,12 @@ async def get_segmentation_specific_insights(
 # NEW: PRICE SIMULATION ENDPOINTS
 # ========================================
 @router.get("/simulation-products", response_model=List[ProductForSimulation])
-async def get_simulation_products(db: Session = Depends(get_db)):
+async def get_simulation_products(db: AsyncSession = Depends(get_async_db)):
     """
     Get products available for price simulation
     """
     try:
-        products = get_products_for_simulation(db)
+        products = await product_aio.get_products_for_simulation(db)
         return [ProductForSimulation(**product) for product in products]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching simulation products: {str(e)}")
@@ -164,24 +159,24 @@ async def get_simulation_products(db: Session = Depends(get_db)):
 @router.post("/price-simulation", response_model=PriceSimulationResponse)
 async def simulate_product_price_change(
     request: PriceSimulationRequest,
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Simulate the impact of price changes on sales and profit
     """
     try:
-        return simulate_price_change(db, request)
+        return await product_aio.simulate_price_change(db, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in price simulation: {str(e)}")
 
 @router.get("/price-impact-chart/{product_id}", response_model=List[PriceImpactData])
 async def get_price_impact_chart(
     product_id: int,
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Get price impact chart data for visualization
     """
     try:
-        return generate_price_impact_chart(db, product_id)
+        return await product_aio.generate_price_impact_chart(db, product_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating price impact chart: {str(e)}")
 
@@ -191,24 +186,24 @@ async def get_price_impact_chart(
 @router.get("/low-stock", response_model=List[ProductResponse])
 async def get_low_stock_products(
     threshold: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_async_db)):
     """
     Get products with low stock for alerts
     """
     try:
         filters = ProductFilter(category="all", lowStock=True, sortBy="bestseller")
-        products = get_products_with_filters(db, filters)
+        products = await product_aio.get_products_with_filters(db, filters)
         return [p for p in products if p.stock < threshold]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching low stock products: {str(e)}")
 
 @router.get("/categories", response_model=List[CategoryData])
-async def get_product_categories(db: Session = Depends(get_db)):
+async def get_product_categories(db: AsyncSession = Depends(get_async_db)):
     """
     Get all product categories for filters
     """
     try:
-        return get_category_distribution(db)
+        return await product_aio.get_category_distribution(db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
 
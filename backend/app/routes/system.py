@@ -0,0 +1,23 @@
+# backend/app/routes/system.py
+from fastapi import APIRouter
+
+from app.cache import result_cache
+from app.database import get_pool_stats
+from app.services import background_jobs
+
+router = APIRouter()
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    """Statistik connection pool (checked-out, overflow, waktu tunggu checkout)."""
+    return get_pool_stats()
+
+@router.get("/cache")
+async def cache_stats():
+    """Statistik cache hasil agregasi CRUD."""
+    return result_cache.stats()
+
+@router.get("/jobs")
+async def background_job_status():
+    """Status job background (jumlah run, durasi dan error terakhir)."""
+    return background_jobs.get_job_status()
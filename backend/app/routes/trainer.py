@@ -1,7 +1,7 @@
 # backend/app/routes/trainer.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.crud import trainer as crud_trainer
 from app.schemas import trainer as schemas_trainer
 from typing import List, Dict
@@ -10,10 +10,48 @@ router = APIRouter()
 
 # Route yang lebih spesifik harus diletakkan DI ATAS route yang lebih umum
 @router.get("/trainers/performance", response_model=schemas_trainer.TrainerDashboardData)
-async def get_trainer_performance(db: Session = Depends(get_db)):
-    dashboard_data = await crud_trainer.get_trainer_performance_data(db)
+async def get_trainer_performance(
+    include_insights: bool = Query(True, description="Sertakan insight & alert dari LLM (Groq)"),
+    db: Session = Depends(get_db)
+):
+    dashboard_data = await crud_trainer.get_trainer_performance_data(db, include_insights=include_insights)
     return dashboard_data
 
+@router.get("/trainers/performance/stats", response_model=schemas_trainer.TrainerStats)
+def get_trainer_performance_stats(db: Session = Depends(get_db)):
+    """
+    Stats ringkas trainer tanpa chart dan tanpa panggilan LLM.
+    """
+    return crud_trainer.get_trainer_stats(db)
+
+@router.get("/trainers/performance/insights", response_model=schemas_trainer.TrainerAIInsightsResponse)
+async def get_trainer_performance_insights(db: Session = Depends(get_db)):
+    """
+    Tahap LLM dari pipeline performa trainer (insight, rekomendasi, alert).
+    Hasil di-cache oleh generator, jadi panggilan berulang tidak selalu ke Groq.
+    """
+    dashboard_data = crud_trainer.build_trainer_performance_data(db)
+    return await crud_trainer.generate_trainer_performance_insights(dashboard_data)
+
+async def _refresh_trainer_insights():
+    # Session sendiri: session dari get_db sudah ditutup saat background task berjalan
+    db = SessionLocal()
+    try:
+        dashboard_data = crud_trainer.build_trainer_performance_data(db)
+        await crud_trainer.generate_trainer_performance_insights(dashboard_data, force_refresh=True)
+    except Exception as e:
+        print(f"Error refreshing trainer insights: {e}")
+    finally:
+        db.close()
+
+@router.post("/trainers/performance/insights/refresh", status_code=status.HTTP_202_ACCEPTED)
+async def schedule_trainer_insights_refresh(background_tasks: BackgroundTasks):
+    """
+    Jadwalkan regenerasi insight trainer di background (mengabaikan cache).
+    """
+    background_tasks.add_task(_refresh_trainer_insights)
+    return {"status": "scheduled"}
+
 @router.get("/trainers/{trainer_id}", response_model=schemas_trainer.Trainer)
 def read_trainer(trainer_id: int, db: Session = Depends(get_db)):
     db_trainer = crud_trainer.get_trainer(db, trainer_id=trainer_id)
@@ -55,3 +55,25 @@ class AIInsight(BaseModel):
     description: str
     impact: str  # 'low', 'medium', 'high'
     category: str
+
+# ================================
+# TRANSACTION INPUT
+# ================================
+
+class IncomeTransactionCreate(BaseModel):
+    transaction_date: date
+    income_type: str
+    amount: float
+    payment_method: str
+    member_id: Optional[int] = None
+    description: Optional[str] = None
+    reference_id: Optional[int] = None
+
+class ExpenseTransactionCreate(BaseModel):
+    transaction_date: date
+    expense_category: str
+    amount: float
+    payment_method: str
+    vendor_name: Optional[str] = None
+    description: Optional[str] = None
+    receipt_number: Optional[str] = None
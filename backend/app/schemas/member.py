@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
+from datetime import date, datetime
 
 class Member(BaseModel):
     id: str
@@ -11,6 +12,14 @@ class SegmentData(BaseModel):
     name: str
     value: int
     color: str
+    members: List[Member]  # preview, member terbaru dulu
+    has_more: bool = False
+
+class SegmentMembersPage(BaseModel):
+    goal: str
+    total: int
+    limit: int
+    offset: int
     members: List[Member]
 
 class WorkoutTime(BaseModel):
@@ -48,6 +57,10 @@ class MemberActivity(BaseModel):
     month: str
     value: int
 
+class TimeSeriesPoint(BaseModel):
+    period: str
+    value: int
+
 class ChartSegmentMember(BaseModel):
     goal: str
     value: int
@@ -79,3 +92,42 @@ ChartWorkout = WorkoutTime
 ChartFunnelStep = FunnelStep
 ChartNotifResponse = NotificationResponse
 ChartABTesting = ABTestData
+
+class MemberCreate(BaseModel):
+    name: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    birth_date: Optional[date] = None
+    join_date: Optional[date] = None  # default: hari ini
+    membership_type: Optional[str] = None
+    membership_expiry: Optional[date] = None
+    status: str = "Active"
+
+class MemberStatusUpdate(BaseModel):
+    status: str
+
+# ===== Event ingestion (notification_log / ab_test_log) =====
+# Kolom log bertipe INTEGER (32-bit)
+MAX_EVENT_COUNT = 2**31 - 1
+
+class NotificationEvent(BaseModel):
+    type: str = Field(..., min_length=1, max_length=100)
+    responded: int = Field(0, ge=0, le=MAX_EVENT_COUNT)
+    ignored: int = Field(0, ge=0, le=MAX_EVENT_COUNT)
+    timestamp: Optional[datetime] = None  # default: waktu event diterima
+
+class ABTestEvent(BaseModel):
+    feature: str = Field(..., min_length=1, max_length=100)
+    success: int = Field(0, ge=0, le=MAX_EVENT_COUNT)
+    total: int = Field(1, ge=0, le=MAX_EVENT_COUNT)
+
+    @model_validator(mode="after")
+    def check_success_within_total(self):
+        # success > total membuat conversion rate > 1 (interval Wilson tidak terdefinisi)
+        if self.success > self.total:
+            raise ValueError("success must not exceed total")
+        return self
+
+class EventBatch(BaseModel):
+    notifications: List[NotificationEvent] = []
+    ab_tests: List[ABTestEvent] = []
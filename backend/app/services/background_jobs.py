@@ -0,0 +1,62 @@
+# backend/app/services/background_jobs.py
+"""
+Job periodik ringan yang berjalan di event loop aplikasi.
+
+Setiap job adalah fungsi sync `fn(db)`; dijalankan di threadpool dengan session sendiri
+sehingga tidak memblokir request. Error dicatat lalu job dicoba lagi pada interval berikutnya.
+"""
+import asyncio
+import time
+from typing import Any, Callable, Dict
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+
+_tasks: Dict[str, asyncio.Task] = {}
+_status: Dict[str, Dict[str, Any]] = {}
+
+
+def run_with_session(fn: Callable[[Session], Any]) -> Any:
+    db = SessionLocal()
+    try:
+        return fn(db)
+    finally:
+        db.close()
+
+
+async def _run_periodically(name: str, fn: Callable[[Session], Any], interval: float):
+    while True:
+        started = time.perf_counter()
+        try:
+            result = await run_in_threadpool(run_with_session, fn)
+            _status[name].update({"last_status": "ok", "last_result": result, "last_error": None})
+        except Exception as e:
+            print(f"Error in background job '{name}': {e}")
+            _status[name].update({"last_status": "error", "last_error": str(e)})
+        _status[name].update({
+            "runs": _status[name]["runs"] + 1,
+            "last_run_at": time.time(),
+            "last_elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+        await asyncio.sleep(interval)
+
+
+def start_periodic_job(name: str, fn: Callable[[Session], Any], interval: float):
+    """Daftarkan job; dipanggil dari event startup (butuh event loop yang sedang berjalan)."""
+    if interval <= 0 or name in _tasks:
+        return
+    _status[name] = {"interval": interval, "runs": 0, "last_status": None, "last_error": None}
+    _tasks[name] = asyncio.get_running_loop().create_task(_run_periodically(name, fn, interval))
+
+
+async def stop_all_jobs():
+    for task in _tasks.values():
+        task.cancel()
+    await asyncio.gather(*_tasks.values(), return_exceptions=True)
+    _tasks.clear()
+
+
+def get_job_status() -> Dict[str, Dict[str, Any]]:
+    return {name: dict(status, running=name in _tasks) for name, status in _status.items()}
@@ -0,0 +1,125 @@
+# backend/app/services/dashboard_aggregator.py
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.crud import member, product, finance, inventory, feedback, trainer
+
+# Thread pool terbatas: setiap section dashboard berjalan di thread sendiri
+# dengan session database sendiri, sehingga event loop tidak ikut terblokir.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.DASHBOARD_MAX_WORKERS,
+    thread_name_prefix="dashboard-section",
+)
+
+
+def _member_section(db: Session) -> Dict[str, Any]:
+    return {
+        "member_stats": member.get_member_stats(db),
+        "member_activity": member.get_member_activity(db),
+    }
+
+
+def _product_section(db: Session) -> Dict[str, Any]:
+    return {
+        "product_stats": product.get_product_stats(db),
+        "top_sales": product.get_top_sales(db, limit=5),
+    }
+
+
+def _finance_section(db: Session) -> Dict[str, Any]:
+    year = finance.get_latest_finance_year(db)
+    return {"financial_summary": finance.get_financial_summary(db, year=year)}
+
+
+def _inventory_section(db: Session) -> Dict[str, Any]:
+    return {"inventory_summary": inventory.get_inventory_summary(db)}
+
+
+def _feedback_section(db: Session) -> Dict[str, Any]:
+    return {"feedback_summary": feedback.get_sentiment_dashboard_summary(db)}
+
+
+def _trainer_section(db: Session) -> Dict[str, Any]:
+    # Hanya stats; insight LLM trainer tidak pernah masuk critical path dashboard
+    return {"trainer_stats": trainer.get_trainer_stats(db)}
+
+
+# name -> (fungsi section, key yang dihasilkan di response)
+SECTIONS: Dict[str, Tuple[Callable[[Session], Dict[str, Any]], List[str]]] = {
+    "member": (_member_section, ["member_stats", "member_activity"]),
+    "product": (_product_section, ["product_stats", "top_sales"]),
+    "finance": (_finance_section, ["financial_summary"]),
+    "inventory": (_inventory_section, ["inventory_summary"]),
+    "feedback": (_feedback_section, ["feedback_summary"]),
+    "trainer": (_trainer_section, ["trainer_stats"]),
+}
+
+
+def _run_with_session(section_fn: Callable[[Session], Dict[str, Any]]) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return section_fn(db)
+    finally:
+        db.close()
+
+
+async def _run_section(name: str, timeout: float) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+    section_fn, keys = SECTIONS[name]
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    error = None
+
+    try:
+        data = await asyncio.wait_for(
+            loop.run_in_executor(_executor, _run_with_session, section_fn),
+            timeout=timeout,
+        )
+        status = "ok"
+    except asyncio.TimeoutError:
+        # Thread tetap selesai di background dan menutup session-nya sendiri
+        data = {key: None for key in keys}
+        status = "timeout"
+        error = f"Section '{name}' exceeded {timeout}s"
+    except Exception as e:
+        print(f"Error in dashboard section '{name}': {e}")
+        data = {key: None for key in keys}
+        status = "error"
+        error = str(e)
+
+    meta = {
+        "status": status,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "error": error,
+    }
+    return name, data, meta
+
+
+async def build_dashboard_summary(timeout: float = None) -> Dict[str, Any]:
+    """
+    Jalankan semua section dashboard secara paralel dan gabungkan hasilnya.
+    Section yang gagal atau timeout tetap muncul di response dengan nilai None,
+    dengan status dan durasi per section di `meta.sections`.
+    """
+    timeout = timeout or settings.DASHBOARD_SECTION_TIMEOUT
+    started = time.perf_counter()
+
+    results = await asyncio.gather(*(_run_section(name, timeout) for name in SECTIONS))
+
+    summary: Dict[str, Any] = {}
+    sections_meta: Dict[str, Any] = {}
+    for name, data, meta in results:
+        summary.update(data)
+        sections_meta[name] = meta
+
+    summary["meta"] = {
+        "sections": sections_meta,
+        "partial": any(meta["status"] != "ok" for meta in sections_meta.values()),
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    return summary
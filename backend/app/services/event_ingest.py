@@ -0,0 +1,194 @@
+# backend/app/services/event_ingest.py
+"""
+Ingest event notification_log / ab_test_log lewat buffer di memori.
+
+Request hanya memvalidasi dan menaruh event di buffer (tanpa transaksi DB). Buffer di-flush
+dengan satu bulk INSERT per tabel ketika mencapai EVENT_FLUSH_SIZE atau setiap
+EVENT_FLUSH_INTERVAL detik. Jika buffer penuh (EVENT_BUFFER_MAX_SIZE) batch ditolak
+seluruhnya, dan route membalas 429 supaya client mengirim ulang nanti (backpressure).
+Buffer bersifat per-proses; sisa event di-flush saat shutdown.
+
+Flush yang gagal karena koneksi/operasional dikembalikan ke buffer. Flush yang gagal karena
+data (nilai di luar range kolom, dsb.) di-bisect per savepoint: baris yang valid tetap masuk,
+baris yang ditolak database dibuang ke daftar dead-letter, supaya satu event buruk tidak
+membuat buffer macet selamanya.
+"""
+import collections
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.cache import invalidate_tables
+from app.config import settings
+from app.models.ab_test import ABTestLog
+from app.models.notification import NotificationLog
+
+# kind -> model tujuan
+EVENT_MODELS = {
+    "notification": NotificationLog,
+    "ab_test": ABTestLog,
+}
+MAX_DEAD_LETTERS = 100  # contoh event yang ditolak database, untuk /events/status
+
+
+def _is_transient(error: Exception) -> bool:
+    """Error koneksi/operasional: event masih valid, coba lagi pada flush berikutnya."""
+    if isinstance(error, (OperationalError, InterfaceError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+class EventBuffer:
+    def __init__(self, max_size: int, flush_size: int):
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in EVENT_MODELS}
+        self._size = 0
+        self.dead_letters = collections.deque(maxlen=MAX_DEAD_LETTERS)
+        self.stats = {"accepted": 0, "rejected": 0, "flushed": 0, "dropped": 0, "flushes": 0, "failed_flushes": 0,
+                      "last_flush_at": None, "last_flush_ms": None, "last_error": None}
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def offer(self, events: Dict[str, List[Dict[str, Any]]]) -> bool:
+        """Tambahkan satu batch secara utuh; False jika buffer tidak cukup (tidak ada yang ditambahkan)."""
+        count = sum(len(rows) for rows in events.values())
+        with self._lock:
+            if self._size + count > self.max_size:
+                self.stats["rejected"] += count
+                return False
+            for kind, rows in events.items():
+                self._pending[kind].extend(rows)
+            self._size += count
+            self.stats["accepted"] += count
+            return True
+
+    def should_flush(self) -> bool:
+        return self._size >= self.flush_size
+
+    def _drain(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            drained = self._pending
+            self._pending = {kind: [] for kind in EVENT_MODELS}
+            self._size = 0
+            return drained
+
+    def _requeue(self, events: Dict[str, List[Dict[str, Any]]]):
+        # Flush gagal: kembalikan ke depan buffer (boleh melewati max_size sementara, event tidak dibuang)
+        with self._lock:
+            for kind, rows in events.items():
+                self._pending[kind] = rows + self._pending[kind]
+                self._size += len(rows)
+
+    def _dead_letter(self, kind: str, rows: List[Dict[str, Any]], error: Exception):
+        self.stats["dropped"] += len(rows)
+        for row in rows:
+            self.dead_letters.append({"kind": kind, "event": row, "error": str(getattr(error, "orig", error))})
+
+    def _insert_rows(self, db: Session, kind: str, rows: List[Dict[str, Any]], rejected: List[Any]) -> int:
+        """
+        Insert dalam savepoint; jika data ditolak, bagi dua sampai baris buruk terisolasi.
+        Baris yang ditolak dikumpulkan di `rejected` dan baru di-dead-letter setelah commit.
+        """
+        try:
+            with db.begin_nested():
+                db.execute(insert(EVENT_MODELS[kind]), rows)
+            return len(rows)
+        except Exception as e:
+            if _is_transient(e):
+                raise
+            if len(rows) == 1:
+                rejected.append((kind, rows, e))
+                return 0
+            middle = len(rows) // 2
+            return (self._insert_rows(db, kind, rows[:middle], rejected)
+                    + self._insert_rows(db, kind, rows[middle:], rejected))
+
+    def flush(self, db: Session, wait: bool = False) -> Dict[str, Any]:
+        """
+        Bulk insert semua event yang menunggu. Hanya satu flush berjalan dalam satu waktu;
+        `wait=True` menunggu flush yang sedang berjalan selesai (dipakai saat shutdown) alih-alih melewatinya.
+        """
+        if not self._flush_lock.acquire(blocking=wait):
+            return {"status": "busy"}
+        try:
+            events = self._drain()
+            count = sum(len(rows) for rows in events.values())
+            if not count:
+                return {"status": "empty"}
+
+            started = time.perf_counter()
+            rejected: List[Any] = []
+            inserted = 0
+            try:
+                for kind, rows in events.items():
+                    if rows:
+                        inserted += self._insert_rows(db, kind, rows, rejected)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.stats["failed_flushes"] += 1
+                self.stats["last_error"] = str(e)
+                if _is_transient(e):
+                    self._requeue(events)
+                else:
+                    # Bukan masalah koneksi dan tidak bisa diisolasi per baris: jangan requeue (akan gagal terus)
+                    for kind, rows in events.items():
+                        if rows:
+                            self._dead_letter(kind, rows, e)
+                raise
+
+            for kind, rows, error in rejected:
+                self._dead_letter(kind, rows, error)
+            invalidate_tables(*(EVENT_MODELS[kind].__tablename__ for kind, rows in events.items() if rows))
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.stats.update({
+                "flushed": self.stats["flushed"] + inserted,
+                "flushes": self.stats["flushes"] + 1,
+                "last_flush_at": time.time(),
+                "last_flush_ms": elapsed_ms,
+                "last_error": None,
+            })
+            return {"status": "flushed", "events": inserted, "dropped": count - inserted, "elapsed_ms": elapsed_ms}
+        finally:
+            self._flush_lock.release()
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.stats, buffered=self._size, max_size=self.max_size, flush_size=self.flush_size,
+                    dead_letters=list(self.dead_letters))
+
+
+event_buffer = EventBuffer(settings.EVENT_BUFFER_MAX_SIZE, settings.EVENT_FLUSH_SIZE)
+
+
+def to_rows(batch) -> Dict[str, List[Dict[str, Any]]]:
+    """EventBatch (schema) -> baris siap insert per kind."""
+    received_at = datetime.now()
+    notifications = []
+    for event in batch.notifications:
+        row = event.model_dump()
+        row["timestamp"] = row["timestamp"] or received_at
+        notifications.append(row)
+    return {
+        "notification": notifications,
+        "ab_test": [event.model_dump() for event in batch.ab_tests],
+    }
+
+
+def flush_events(db: Session) -> Dict[str, Any]:
+    """Dipakai job periodik dan flush berdasarkan ukuran."""
+    return event_buffer.flush(db)
+
+
+def flush_events_blocking(db: Session) -> Dict[str, Any]:
+    """Dipakai saat shutdown: tunggu flush lain selesai lalu tulis sisa buffer."""
+    return event_buffer.flush(db, wait=True)
@@ -0,0 +1,92 @@
+# backend/app/services/experiment_analytics.py
+"""
+Statistik eksperimen dari counter precomputed (crud.experiment), tanpa membaca log mentah.
+
+Per varian: conversion rate dengan interval Wilson; terhadap baseline: lift dan
+uji z dua proporsi (pooled) dengan p-value dua sisi. Varian dengan successes > trials
+(data log lama yang tidak valid) ditandai `invalid` dan tidak diuji signifikansinya.
+"""
+import math
+from statistics import NormalDist
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.crud import experiment as crud_experiment
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> Tuple[float, float]:
+    if trials == 0:
+        return 0.0, 0.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    # Clamp: baris log lama bisa punya success > total (tidak divalidasi saat ditulis)
+    p = min(max(successes / trials, 0.0), 1.0)
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def two_proportion_z_test(s1: int, n1: int, s2: int, n2: int) -> Tuple[Optional[float], Optional[float]]:
+    """Return (z, p-value dua sisi) untuk H0: p1 == p2; None jika tidak terdefinisi."""
+    if n1 == 0 or n2 == 0 or s1 > n1 or s2 > n2:
+        return None, None
+    pooled = (s1 + s2) / (n1 + n2)
+    standard_error = math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    if standard_error == 0:
+        return None, None
+    z = (s1 / n1 - s2 / n2) / standard_error
+    return z, 2 * (1 - NormalDist().cdf(abs(z)))
+
+
+def get_experiment_report(
+    db: Session,
+    source: str,
+    baseline: Optional[str] = None,
+    confidence: float = 0.95
+) -> Dict[str, Any]:
+    counters = crud_experiment.get_experiment_counters(db, source)
+    if baseline is not None and baseline not in {c["variant"] for c in counters}:
+        raise ValueError(f"Unknown baseline variant '{baseline}'")
+    valid = [c for c in counters if c["successes"] <= c["trials"]]
+    if baseline is None and valid:
+        # Default baseline: varian valid dengan percobaan terbanyak
+        baseline = max(valid, key=lambda c: c["trials"])["variant"]
+    base = next((c for c in counters if c["variant"] == baseline), None)
+
+    variants = []
+    for counter in counters:
+        successes, trials = counter["successes"], counter["trials"]
+        invalid = successes > trials
+        rate = min(successes / trials, 1.0) if trials else 0.0
+        ci_low, ci_high = wilson_interval(successes, trials, confidence)
+        entry = {
+            "variant": counter["variant"],
+            "successes": successes,
+            "trials": trials,
+            "conversion_rate": round(rate, 4),
+            "ci_low": round(ci_low, 4),
+            "ci_high": round(ci_high, 4),
+            "is_baseline": counter["variant"] == baseline,
+            "invalid": invalid,
+            "lift": None,
+            "z_score": None,
+            "p_value": None,
+            "significant": False,
+        }
+        if base is not None and counter["variant"] != baseline:
+            base_rate = min(base["successes"] / base["trials"], 1.0) if base["trials"] else 0.0
+            z, p_value = two_proportion_z_test(successes, trials, base["successes"], base["trials"])
+            entry["lift"] = round((rate - base_rate) / base_rate, 4) if base_rate and not invalid else None
+            entry["z_score"] = round(z, 3) if z is not None else None
+            entry["p_value"] = round(p_value, 4) if p_value is not None else None
+            entry["significant"] = p_value is not None and p_value < 1 - confidence
+        variants.append(entry)
+
+    return {
+        "source": source,
+        "baseline": baseline,
+        "confidence": confidence,
+        "invalid_variants": [c["variant"] for c in counters if c["successes"] > c["trials"]],
+        "variants": variants,
+    }
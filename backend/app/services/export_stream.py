@@ -0,0 +1,222 @@
+# backend/app/services/export_stream.py
+"""
+Export dataset besar sebagai CSV atau Parquet secara streaming.
+
+Query dijalankan dengan server-side cursor (stream_results) dan dibaca per partisi,
+setiap partisi langsung diserialisasi dan dikirim; memori tetap konstan berapa pun jumlah barisnya.
+Generator membuka session sendiri karena berjalan setelah handler route selesai.
+"""
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from app.database import SessionLocal
+
+DEFAULT_CHUNK_SIZE = 5000
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# name -> sql (dengan placeholder {where}), kolom tanggal untuk filter, kolom output (nama, tipe)
+EXPORT_DATASETS: Dict[str, Dict[str, Any]] = {
+    "transactions": {
+        "sql": """
+            SELECT 'income' AS type, income_id AS id, transaction_date, income_type AS category,
+                   amount, payment_method, description
+            FROM income_transaction
+            WHERE {where}
+            UNION ALL
+            SELECT 'expense' AS type, expense_id AS id, transaction_date, expense_category AS category,
+                   amount, payment_method, description
+            FROM expense_transaction
+            WHERE {where}
+            ORDER BY transaction_date, type, id
+        """,
+        "date_column": "transaction_date",
+        "columns": [
+            ("type", "str"), ("id", "int"), ("transaction_date", "date"), ("category", "str"),
+            ("amount", "float"), ("payment_method", "str"), ("description", "str"),
+        ],
+    },
+    "feedback": {
+        "sql": """
+            SELECT f.feedback_id, f.feedback_date, f.member_id, m.name AS member_name, f.feedback_type,
+                   f.content, f.rating, f.sentiment, f.sentiment_score, t.topics
+            FROM feedback f
+            LEFT JOIN member m ON m.member_id = f.member_id
+            LEFT JOIN (
+                SELECT feedback_id, STRING_AGG(topic, ';' ORDER BY topic) AS topics
+                FROM feedback_topic
+                GROUP BY feedback_id
+            ) t ON t.feedback_id = f.feedback_id
+            WHERE {where}
+            ORDER BY f.feedback_date, f.feedback_id
+        """,
+        "date_column": "f.feedback_date",
+        "columns": [
+            ("feedback_id", "int"), ("feedback_date", "date"), ("member_id", "int"), ("member_name", "str"),
+            ("feedback_type", "str"), ("content", "str"), ("rating", "float"), ("sentiment", "str"),
+            ("sentiment_score", "float"), ("topics", "str"),
+        ],
+    },
+    "sales": {
+        "sql": """
+            SELECT si.sale_item_id, s.sale_id, s.sale_date, s.member_id, p.product_id,
+                   p.name AS product_name, pc.name AS category, si.quantity, si.unit_price, si.subtotal,
+                   s.payment_method, s.status
+            FROM sale_item si
+            JOIN sale s ON s.sale_id = si.sale_id
+            JOIN product p ON p.product_id = si.product_id
+            LEFT JOIN product_category pc ON pc.category_id = p.category_id
+            WHERE {where}
+            ORDER BY s.sale_date, si.sale_item_id
+        """,
+        "date_column": "s.sale_date",
+        "columns": [
+            ("sale_item_id", "int"), ("sale_id", "int"), ("sale_date", "date"), ("member_id", "int"),
+            ("product_id", "int"), ("product_name", "str"), ("category", "str"), ("quantity", "int"),
+            ("unit_price", "float"), ("subtotal", "float"), ("payment_method", "str"), ("status", "str"),
+        ],
+    },
+    "equipment-usage": {
+        "sql": """
+            SELECT u.usage_id, u.usage_date, u.equipment_id, e.name AS equipment_name,
+                   u.usage_count, u.peak_hours, u.maintenance_needed, u.notes
+            FROM equipment_usage_log u
+            LEFT JOIN equipment e ON e.equipment_id = u.equipment_id
+            WHERE {where}
+            ORDER BY u.usage_date, u.usage_id
+        """,
+        "date_column": "u.usage_date",
+        "columns": [
+            ("usage_id", "int"), ("usage_date", "date"), ("equipment_id", "int"), ("equipment_name", "str"),
+            ("usage_count", "int"), ("peak_hours", "int"), ("maintenance_needed", "bool"), ("notes", "str"),
+        ],
+    },
+}
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401  (opsional, hanya untuk format parquet)
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_query(dataset: str, date_from: Optional[date], date_to: Optional[date]) -> Tuple[Any, Dict[str, Any]]:
+    spec = EXPORT_DATASETS[dataset]
+    conditions = ["1=1"]
+    params: Dict[str, Any] = {}
+    if date_from:
+        conditions.append(f"{spec['date_column']} >= :date_from")
+        params["date_from"] = date_from
+    if date_to:
+        conditions.append(f"{spec['date_column']} <= :date_to")
+        params["date_to"] = date_to
+    return text(spec["sql"].format(where=" AND ".join(conditions))), params
+
+
+def iter_row_chunks(
+    dataset: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Sequence[Any]]:
+    query, params = _build_query(dataset, date_from, date_to)
+    db = SessionLocal()
+    try:
+        # Server-side cursor: driver hanya mengambil `chunk_size` baris per fetch
+        connection = db.connection(execution_options={"stream_results": True, "yield_per": chunk_size})
+        result = connection.execute(query, params)
+        for partition in result.partitions(chunk_size):
+            yield partition
+    finally:
+        db.close()
+
+
+def stream_csv(dataset: str, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Iterator[str]:
+    columns = [name for name, _ in EXPORT_DATASETS[dataset]["columns"]]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for partition in iter_row_chunks(dataset, date_from, date_to):
+        writer.writerows(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """File-like tujuan ParquetWriter; byte yang ditulis diambil (drain) setelah tiap row group."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    return float(value) if isinstance(value, (Decimal, int, float)) else value
+
+
+def stream_parquet(dataset: str, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {
+        "int": pa.int64(),
+        "str": pa.string(),
+        "float": pa.float64(),
+        "date": pa.date32(),
+        "bool": pa.bool_(),
+    }
+    columns = EXPORT_DATASETS[dataset]["columns"]
+    schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        # Satu partisi = satu row group, dikirim begitu selesai ditulis
+        for partition in iter_row_chunks(dataset, date_from, date_to):
+            arrays = []
+            for index, (_, kind) in enumerate(columns):
+                values = [row[index] for row in partition]
+                if kind == "float":
+                    values = [_to_float(value) for value in values]
+                arrays.append(pa.array(values, type=arrow_types[kind]))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    # Footer parquet ditulis saat writer ditutup
+    yield sink.drain()
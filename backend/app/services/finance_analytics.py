@@ -0,0 +1,178 @@
+# backend/app/services/finance_analytics.py
+"""
+Analitik keuangan tahunan berbasis array.
+
+Rollup satu tahun (income + expense) dibaca sekali lewat crud.finance.get_year_rollup,
+disusun menjadi matriks bulan x kategori (12 x C) per jenis transaksi, lalu semua payload
+chart (income-vs-expenses, breakdown, income/expense analysis) dihitung dari matriks yang sama.
+"""
+import calendar
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.cache import cached
+from app.crud import finance as crud_finance
+
+INCOME_TYPES = ["membership", "personal_training", "class_fee", "product_sale"]
+FIXED_EXPENSES = {"rent", "staff_salary"}
+VARIABLE_EXPENSES = {"utilities", "equipment", "marketing", "maintenance"}
+
+INCOME_COLORS = {
+    "membership": "#3b82f6",
+    "personal_training": "#10b981",
+    "class_fee": "#f59e0b",
+    "product_sale": "#ef4444"
+}
+EXPENSE_COLORS = {
+    "staff_salary": "#8b5cf6",
+    "rent": "#06b6d4",
+    "utilities": "#84cc16",
+    "equipment": "#f97316",
+    "marketing": "#ec4899",
+    "maintenance": "#6b7280"
+}
+DEFAULT_COLOR = "#6b7280"
+
+
+class CategoryMatrix:
+    """Total per bulan x kategori untuk satu jenis transaksi (baris = Jan..Dec)."""
+
+    def __init__(self, rows: List[Dict[str, Any]], extra_categories: Optional[List[str]] = None):
+        self.categories = sorted({row["category"] for row in rows} | set(extra_categories or []))
+        column = {category: i for i, category in enumerate(self.categories)}
+
+        self.amounts = np.zeros((12, len(self.categories)), dtype=np.float64)
+        # present[m, c] = ada transaksi di sel tersebut (beda dengan total 0)
+        self.present = np.zeros((12, len(self.categories)), dtype=bool)
+        if rows:
+            months = np.fromiter((row["month"] - 1 for row in rows), dtype=np.int64, count=len(rows))
+            columns = np.fromiter((column[row["category"]] for row in rows), dtype=np.int64, count=len(rows))
+            values = np.fromiter((row["amount"] for row in rows), dtype=np.float64, count=len(rows))
+            np.add.at(self.amounts, (months, columns), values)
+            self.present[months, columns] = True
+
+    def columns(self, categories) -> np.ndarray:
+        return np.array([category in categories for category in self.categories], dtype=bool)
+
+    def active_months(self) -> np.ndarray:
+        """Indeks bulan (0-based) yang punya data, terurut."""
+        return np.flatnonzero(self.present.any(axis=1))
+
+
+def _latest_and_previous(matrix: CategoryMatrix):
+    months = matrix.active_months()
+    latest = int(months[-1]) if months.size >= 1 else None
+    previous = int(months[-2]) if months.size >= 2 else None
+    return latest, previous
+
+
+def _growth(latest_total: float, previous_total: float) -> float:
+    return ((latest_total - previous_total) / previous_total) * 100 if previous_total > 0 else 0
+
+
+def _biggest(matrix: CategoryMatrix, month: Optional[int]) -> Dict[str, Any]:
+    if month is None or not matrix.present[month].any():
+        return {"name": "N/A", "amount": 0}
+    # Kategori tanpa transaksi di bulan itu tidak ikut dibandingkan
+    candidates = np.where(matrix.present[month], matrix.amounts[month], -np.inf)
+    index = int(np.argmax(candidates))
+    return {"name": matrix.categories[index], "amount": int(matrix.amounts[month, index])}
+
+
+def _breakdown(matrix: CategoryMatrix, colors: Dict[str, str]) -> List[Dict[str, Any]]:
+    totals = matrix.amounts.sum(axis=0)
+    has_data = matrix.present.any(axis=0)
+    grand_total = float(totals[has_data].sum())
+    order = [i for i in np.argsort(-totals, kind="stable") if has_data[i]]
+    return [{
+        "name": matrix.categories[i].replace("_", " ").title(),
+        "value": round(float(totals[i]) / grand_total * 100, 1) if grand_total > 0 else 0,
+        "amount": int(totals[i]),
+        "color": colors.get(matrix.categories[i], DEFAULT_COLOR)
+    } for i in order]
+
+
+def _income_analysis(matrix: CategoryMatrix) -> Dict[str, Any]:
+    # Nilai per sel dibulatkan ke int seperti tampilan chart
+    cells = np.trunc(matrix.amounts)
+    chart_columns = [matrix.categories.index(t) for t in INCOME_TYPES]
+    chart_totals = cells[:, chart_columns].sum(axis=1)
+
+    chart_data = []
+    for m in range(12):
+        entry = {"month": calendar.month_abbr[m + 1]}
+        for t, c in zip(INCOME_TYPES, chart_columns):
+            entry[t] = int(cells[m, c])
+        entry["total"] = int(chart_totals[m])
+        chart_data.append(entry)
+
+    month_totals = cells.sum(axis=1)
+    latest, previous = _latest_and_previous(matrix)
+    latest_total = int(month_totals[latest]) if latest is not None else 0
+    previous_total = int(month_totals[previous]) if previous is not None else 0
+
+    return {
+        "current_month_total": latest_total,
+        "growth_percentage": round(_growth(latest_total, previous_total), 2),
+        "biggest_source": _biggest(matrix, latest),
+        "monthly_chart_data": chart_data
+    }
+
+
+def _expense_analysis(matrix: CategoryMatrix) -> Dict[str, Any]:
+    cells = np.trunc(matrix.amounts)
+    fixed = cells[:, matrix.columns(FIXED_EXPENSES)].sum(axis=1)
+    variable = cells[:, matrix.columns(VARIABLE_EXPENSES)].sum(axis=1)
+    totals = fixed + variable
+
+    chart_data = [{
+        "month": calendar.month_abbr[m + 1],
+        "fixed": int(fixed[m]),
+        "variable": int(variable[m]),
+        "total": int(totals[m])
+    } for m in range(12)]
+
+    latest, previous = _latest_and_previous(matrix)
+    latest_total = int(totals[latest]) if latest is not None else 0
+    previous_total = int(totals[previous]) if previous is not None else 0
+    fixed_amt = int(fixed[latest]) if latest is not None else 0
+    variable_amt = int(variable[latest]) if latest is not None else 0
+
+    return {
+        "current_month_total": latest_total,
+        "growth_percentage": round(_growth(latest_total, previous_total), 2),
+        "biggest_category": _biggest(matrix, latest),
+        "fixed_vs_variable": {
+            "fixed_percentage": round((fixed_amt / latest_total) * 100, 1) if latest_total else 0,
+            "variable_percentage": round((variable_amt / latest_total) * 100, 1) if latest_total else 0
+        },
+        "monthly_chart_data": chart_data
+    }
+
+
+def build_finance_analytics(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Hitung semua payload analitik dari baris rollup satu tahun dalam satu lintasan."""
+    income = CategoryMatrix([row for row in rows if row["kind"] == "income"], extra_categories=INCOME_TYPES)
+    expense = CategoryMatrix([row for row in rows if row["kind"] == "expense"])
+
+    income_by_month = income.amounts.sum(axis=1)
+    expense_by_month = expense.amounts.sum(axis=1)
+
+    return {
+        "income_vs_expenses": [{
+            "month": calendar.month_abbr[m + 1],
+            "income": int(income_by_month[m]),
+            "expenses": int(expense_by_month[m])
+        } for m in range(12)],
+        "income_breakdown": _breakdown(income, INCOME_COLORS),
+        "expense_breakdown": _breakdown(expense, EXPENSE_COLORS),
+        "income_analysis": _income_analysis(income),
+        "expense_analysis": _expense_analysis(expense),
+    }
+
+
+@cached(ttl=300, tables=crud_finance.ROLLUP_TABLES)
+def get_finance_analytics(db: Session, year: int) -> Dict[str, Any]:
+    return build_finance_analytics(crud_finance.get_year_rollup(db, year))
@@ -0,0 +1,200 @@
+# backend/app/services/finance_forecast.py
+"""
+Forecast cash-flow per kategori: tren linear + offset musiman per bulan-dalam-tahun.
+
+    y(t) = a + b*t + s[month(t)]
+
+Parameter tidak disimpan langsung; yang disimpan di finance_forecast_model adalah
+statistik cukup (n, sum_t, sum_y, sum_tt, sum_ty dan per bulan {n, sum_t, sum_y}).
+Ketika bulan baru tutup, hanya sel rollup bulan tersebut yang di-fold ke statistik;
+a, b dan s dihitung ulang dari statistik dalam O(12) saat forecast dibuat.
+"""
+import calendar
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.cache import cached, invalidates
+from app.crud import finance as crud_finance
+from app.models.finance import FinanceForecastModel
+
+FORECAST_TABLES = ("finance_forecast_model",)
+# Key pg advisory lock untuk refit (satu refit dalam satu waktu di semua worker)
+FORECAST_REFIT_LOCK_KEY = 7310014
+
+
+def period_index(year: int, month: int) -> int:
+    return year * 12 + (month - 1)
+
+
+def period_year_month(period: int) -> Tuple[int, int]:
+    return period // 12, period % 12 + 1
+
+
+def period_label(period: int) -> str:
+    year, month = period_year_month(period)
+    return f"{year}-{month:02d}"
+
+
+def last_closed_period() -> int:
+    """Bulan terakhir yang sudah lengkap (bulan berjalan belum ikut di-fit)."""
+    now = datetime.now()
+    return period_index(now.year, now.month) - 1
+
+
+def fit_through(db: Session) -> int:
+    """
+    Bulan terakhir yang di-fit: bulan tutup terakhir, dibatasi bulan terakhir yang punya data di rollup
+    (konsisten dengan get_latest_finance_year). Tanpa batas ini setiap bulan sejak data terakhir
+    sampai hari ini di-fold sebagai 0 dan menarik tren/musiman ke nol.
+    """
+    latest = crud_finance.get_latest_finance_period(db)
+    if latest is None:
+        return last_closed_period()
+    return min(last_closed_period(), period_index(*latest))
+
+
+def _fold(model: FinanceForecastModel, seasonal: Dict[str, Dict[str, float]], period: int, amount: float):
+    model.n += 1
+    model.sum_t += period
+    model.sum_y += amount
+    model.sum_tt += period * period
+    model.sum_ty += period * amount
+
+    bucket = seasonal.setdefault(str(period_year_month(period)[1]), {"n": 0, "sum_t": 0.0, "sum_y": 0.0})
+    bucket["n"] += 1
+    bucket["sum_t"] += period
+    bucket["sum_y"] += amount
+
+
+def fit_parameters(model: FinanceForecastModel) -> Dict[str, Any]:
+    """Hitung intercept, slope dan offset musiman dari statistik cukup (tanpa membaca data)."""
+    n = model.n
+    if n == 0:
+        return {"intercept": 0.0, "slope": 0.0, "seasonal": {}}
+
+    denominator = n * model.sum_tt - model.sum_t ** 2
+    # Dengan < 2 titik (atau semua t sama) tren tidak terdefinisi: pakai rata-rata saja
+    slope = (n * model.sum_ty - model.sum_t * model.sum_y) / denominator if n >= 2 and denominator else 0.0
+    intercept = (model.sum_y - slope * model.sum_t) / n
+
+    seasonal = {}
+    for month, bucket in json.loads(model.seasonal or "{}").items():
+        if bucket["n"]:
+            # Rata-rata residual (y - tren) untuk bulan tersebut
+            seasonal[int(month)] = (bucket["sum_y"] - intercept * bucket["n"] - slope * bucket["sum_t"]) / bucket["n"]
+    return {"intercept": intercept, "slope": slope, "seasonal": seasonal}
+
+
+@invalidates("finance_forecast_model")
+def refit_forecast_models(db: Session, full: bool = False) -> Dict[str, Any]:
+    """
+    Fold bulan yang baru tutup ke model. `full=True` membuang model lama dan fit ulang dari seluruh rollup
+    (dipakai jika transaksi lama diubah/di-backdate setelah bulannya di-fold).
+    """
+    # Lock level transaksi (lepas saat commit/rollback). Refit lain yang sedang berjalan -> lewati,
+    # jadi dua request tidak sama-sama meng-insert model (kind, category) yang sama.
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": FORECAST_REFIT_LOCK_KEY}).scalar():
+        return {"status": "busy"}
+
+    through = fit_through(db)
+    if full:
+        db.query(FinanceForecastModel).delete()
+        db.flush()
+
+    models = {(m.kind, m.category): m for m in db.query(FinanceForecastModel).all()}
+    after = min((m.last_period for m in models.values()), default=-1)
+    if after >= through and models:
+        db.rollback()  # lepas advisory lock
+        return {"status": "up_to_date", "through": period_label(through), "models": len(models), "months_folded": 0}
+
+    # Hanya sel rollup setelah watermark terlama yang dibaca
+    values: Dict[Tuple[str, str], Dict[int, float]] = {}
+    for cell in crud_finance.get_rollup_cells(db, period_year_month(after) if after >= 0 else (0, 0), period_year_month(through)):
+        key = (cell["kind"], cell["category"])
+        values.setdefault(key, {})[period_index(cell["year"], cell["month"])] = cell["amount"]
+
+    months_folded = 0
+    for key in set(models) | set(values):
+        series = values.get(key, {})
+        model = models.get(key)
+        if model is None:
+            if not series:
+                continue
+            model = FinanceForecastModel(
+                kind=key[0], category=key[1], n=0, sum_t=0, sum_y=0, sum_tt=0, sum_ty=0,
+                seasonal="{}", last_period=min(series) - 1
+            )
+            db.add(model)
+            models[key] = model
+
+        seasonal = json.loads(model.seasonal or "{}")
+        # Bulan tanpa transaksi untuk kategori yang sudah aktif dihitung sebagai 0
+        for period in range(model.last_period + 1, through + 1):
+            _fold(model, seasonal, period, series.get(period, 0.0))
+            months_folded += 1
+        model.seasonal = json.dumps(seasonal)
+        model.last_period = max(model.last_period, through)
+
+    db.commit()
+    return {"status": "refitted", "through": period_label(through), "models": len(models), "months_folded": months_folded}
+
+
+def refit_if_stale(db: Session):
+    """
+    Refit inkremental hanya jika ada bulan yang tutup sejak fit terakhir.
+    Jika refit lain sedang memegang lock, GET tetap read-only dan memakai model yang tersimpan.
+    """
+    oldest = db.query(FinanceForecastModel.last_period).order_by(FinanceForecastModel.last_period).first()
+    if oldest is None or oldest.last_period < fit_through(db):
+        refit_forecast_models(db)
+
+
+@cached(ttl=3600, tables=FORECAST_TABLES)
+def get_forecast(db: Session, horizon: int = 6, kind: Optional[str] = None, category: Optional[str] = None) -> Dict[str, Any]:
+    query = db.query(FinanceForecastModel)
+    if kind:
+        query = query.filter(FinanceForecastModel.kind == kind)
+    if category:
+        query = query.filter(FinanceForecastModel.category == category.lower().replace(" ", "_"))
+    models = query.order_by(FinanceForecastModel.kind, FinanceForecastModel.category).all()
+
+    through = max((m.last_period for m in models), default=last_closed_period())
+    periods = [through + step for step in range(1, horizon + 1)]
+
+    series = []
+    totals = {period: {"income": 0.0, "expenses": 0.0} for period in periods}
+    for model in models:
+        params = fit_parameters(model)
+        forecast = []
+        for period in periods:
+            month = period_year_month(period)[1]
+            amount = params["intercept"] + params["slope"] * period + params["seasonal"].get(month, 0.0)
+            amount = max(amount, 0.0)
+            forecast.append({"period": period_label(period), "amount": int(amount)})
+            totals[period]["income" if model.kind == "income" else "expenses"] += amount
+
+        series.append({
+            "kind": model.kind,
+            "category": model.category,
+            "name": model.category.replace("_", " ").title(),
+            "months_observed": model.n,
+            "trend_per_month": round(params["slope"], 2),
+            "forecast": forecast
+        })
+
+    return {
+        "fitted_through": period_label(through),
+        "horizon": horizon,
+        "series": series,
+        "totals": [{
+            "period": period_label(period),
+            "month": calendar.month_abbr[period_year_month(period)[1]],
+            "income": int(totals[period]["income"]),
+            "expenses": int(totals[period]["expenses"]),
+            "net": int(totals[period]["income"] - totals[period]["expenses"])
+        } for period in periods]
+    }
@@ -0,0 +1,316 @@
+# backend/app/services/finance_ingest.py
+"""
+Bulk ingest transaksi income/expense dari CSV atau NDJSON (export POS / bank).
+
+Baris divalidasi per batch dengan schema finance, dimuat ke temp table lewat COPY
+(psycopg2 copy_expert; fallback executemany), lalu dipindah ke tabel tujuan dengan satu
+INSERT ... SELECT yang membuang duplikat (natural key, hanya untuk baris yang punya
+reference_id / receipt_number) dan sekaligus meng-update finance_monthly_rollup dari baris
+yang benar-benar ter-insert.
+"""
+import codecs
+import collections
+import csv
+import io
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.cache import invalidate_tables
+from app.schemas.finance import IncomeTransactionCreate, ExpenseTransactionCreate
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 20
+
+# kind -> (schema, tabel, kolom kategori, kolom identifier, natural key untuk dedup)
+# Dedup hanya untuk baris yang membawa identifier dari export (reference_id / receipt_number).
+# Baris tanpa identifier selalu di-insert: dua pembayaran walk-in identik adalah dua transaksi sah.
+INGEST_SOURCES = {
+    "income": (
+        IncomeTransactionCreate, "income_transaction", "income_type", "reference_id",
+        ("transaction_date", "income_type", "amount", "payment_method", "member_id", "reference_id"),
+    ),
+    "expense": (
+        ExpenseTransactionCreate, "expense_transaction", "expense_category", "receipt_number",
+        ("transaction_date", "expense_category", "amount", "payment_method", "vendor_name", "receipt_number"),
+    ),
+}
+INGEST_FORMATS = ("csv", "ndjson")
+
+
+class _LineFeed:
+    """Iterator input csv.reader yang bisa diisi bertahap (baris dari file maupun stream request)."""
+
+    def __init__(self):
+        self._lines = collections.deque()
+
+    def push(self, text: str):
+        self._lines.append(text)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self._lines:
+            raise StopIteration
+        return self._lines.popleft()
+
+
+class RecordParser:
+    """
+    Parser baris demi baris; CSV memakai baris pertama sebagai header.
+    Untuk CSV satu csv.reader dipakai untuk seluruh input: baris fisik ditahan sampai jumlah
+    tanda kutip seimbang, jadi field ber-quote yang berisi newline (deskripsi multi-baris) tetap satu record.
+    """
+
+    def __init__(self, fmt: str):
+        if fmt not in INGEST_FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}'")
+        self.fmt = fmt
+        self.header: Optional[List[str]] = None
+        self._pending: List[str] = []
+        self._quotes = 0
+        self._feed = _LineFeed()
+        self._reader = csv.reader(self._feed)
+
+    def parse(self, line: str) -> Optional[Dict[str, Any]]:
+        line = line.rstrip("\r\n")
+        if not self._pending and not line.strip():
+            return None
+        if self.fmt == "ndjson":
+            return json.loads(line)
+
+        self._pending.append(line + "\n")
+        self._quotes += line.count('"')
+        if self._quotes % 2:
+            return None  # masih di dalam field ber-quote, tunggu baris berikutnya
+
+        self._feed.push("".join(self._pending))
+        self._pending = []
+        self._quotes = 0
+        values = next(self._reader)
+        if self.header is None:
+            self.header = [column.strip() for column in values]
+            return None
+        # Sel CSV kosong berarti NULL untuk kolom opsional
+        return {column: (value if value != "" else None) for column, value in zip(self.header, values)}
+
+    def close(self):
+        """Dipanggil di akhir input; error jika field ber-quote tidak pernah ditutup."""
+        if self._pending:
+            self._pending = []
+            raise ValueError("Unexpected end of data inside a quoted field")
+
+
+async def iter_stream_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Pecah body request (stream bytes) menjadi baris tanpa menampung seluruh body di memori."""
+    # utf-8-sig: BOM di awal file (umum di export Excel/bank) tidak ikut menempel ke nama kolom pertama
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+class IngestReport:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.rows_received = 0
+        self.rows_invalid = 0
+        self.rows_inserted = 0
+        self.rows_duplicate = 0
+        self.batches = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def add_error(self, row_number: int, error: Any):
+        self.rows_invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            detail = error.errors(include_url=False) if isinstance(error, ValidationError) else str(error)
+            self.errors.append({"row": row_number, "error": detail})
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "kind": self.kind,
+            "rows_received": self.rows_received,
+            "rows_inserted": self.rows_inserted,
+            "rows_duplicate": self.rows_duplicate,
+            "rows_invalid": self.rows_invalid,
+            "batches": self.batches,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows_received / elapsed, 1) if elapsed > 0 else 0,
+            "errors": self.errors,
+        }
+
+
+def validate_record(kind: str, record: Any, row_number: int, report: IngestReport) -> Optional[Dict[str, Any]]:
+    report.rows_received += 1
+    schema = INGEST_SOURCES[kind][0]
+    if isinstance(record, Exception):
+        report.add_error(row_number, record)
+        return None
+    try:
+        return schema(**record).model_dump()
+    except (ValidationError, TypeError) as e:
+        report.add_error(row_number, e)
+        return None
+
+
+def _copy_rows(db: Session, staging: str, columns: List[str], rows: List[Dict[str, Any]]):
+    cursor = db.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                # None ditulis sebagai field kosong tanpa quote = NULL di COPY csv
+                writer.writerow(["" if row[c] is None else row[c] for c in columns])
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            return
+    finally:
+        cursor.close()
+
+    # Driver tanpa COPY: executemany dalam satu batch
+    placeholders = ", ".join(f":{c}" for c in columns)
+    db.execute(text(f"INSERT INTO {staging} ({', '.join(columns)}) VALUES ({placeholders})"), rows)
+
+
+def load_batch(db: Session, kind: str, rows: List[Dict[str, Any]]) -> int:
+    """Muat satu batch tervalidasi; return jumlah baris yang benar-benar ter-insert (setelah dedup)."""
+    if not rows:
+        return 0
+    schema, table, category_column, identifier, natural_key = INGEST_SOURCES[kind]
+    columns = list(schema.model_fields)
+    staging = f"ingest_staging_{kind}"
+    column_list = ", ".join(columns)
+
+    db.execute(text(f"CREATE TEMP TABLE IF NOT EXISTS {staging} AS SELECT {column_list} FROM {table} WITH NO DATA"))
+    db.execute(text(f"TRUNCATE {staging}"))
+    _copy_rows(db, staging, columns, rows)
+
+    # Kolom tanggal + kategori + identifier dibandingkan dengan '=' supaya index (kategori, tanggal, id) terpakai
+    duplicate_match = " AND ".join(
+        f"t.{c} = s.{c}" if c in ("transaction_date", category_column, identifier) else f"t.{c} IS NOT DISTINCT FROM s.{c}"
+        for c in natural_key
+    )
+    source_columns = ", ".join(f"s.{c}" for c in columns)
+    inserted = db.execute(text(f"""
+        WITH inserted AS (
+            INSERT INTO {table} ({column_list})
+            SELECT {column_list} FROM (
+                -- Punya identifier: buang duplikat di batch dan yang sudah ada di tabel
+                SELECT DISTINCT ON ({", ".join(f"s.{c}" for c in natural_key)}) {source_columns}
+                FROM {staging} s
+                WHERE s.{identifier} IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM {table} t WHERE {duplicate_match})
+                UNION ALL
+                -- Tanpa identifier: tidak bisa dibedakan dari transaksi sah lain, insert apa adanya
+                SELECT {source_columns}
+                FROM {staging} s
+                WHERE s.{identifier} IS NULL
+            ) incoming
+            RETURNING transaction_date, {category_column}, amount
+        ),
+        rollup AS (
+            INSERT INTO finance_monthly_rollup (year, month, kind, category, total_amount, txn_count, updated_at)
+            SELECT CAST(EXTRACT(YEAR FROM transaction_date) AS INTEGER),
+                   CAST(EXTRACT(MONTH FROM transaction_date) AS INTEGER),
+                   '{kind}', {category_column}, SUM(amount), COUNT(*), NOW()
+            FROM inserted
+            GROUP BY 1, 2, {category_column}
+            ON CONFLICT (year, month, kind, category) DO UPDATE
+            SET total_amount = finance_monthly_rollup.total_amount + EXCLUDED.total_amount,
+                txn_count = finance_monthly_rollup.txn_count + EXCLUDED.txn_count,
+                updated_at = NOW()
+        )
+        SELECT COUNT(*) FROM inserted
+    """)).scalar()
+    db.commit()
+    return int(inserted or 0)
+
+
+def flush_batch(db: Session, kind: str, batch: List[Dict[str, Any]], report: IngestReport):
+    if not batch:
+        return
+    inserted = load_batch(db, kind, batch)
+    report.rows_inserted += inserted
+    report.rows_duplicate += len(batch) - inserted
+    report.batches += 1
+    # load_batch sudah commit: invalidasi per batch, supaya jika batch berikutnya gagal
+    # baris yang sudah masuk tidak tertutup agregat cache yang basi
+    if inserted:
+        invalidate_tables(INGEST_SOURCES[kind][1], "finance_monthly_rollup")
+
+
+class IngestSession:
+    """
+    Loop ingest bersama untuk CLI (sync) dan route (stream async): parse -> validasi -> kumpulkan batch.
+    Pemanggil yang menjalankan `flush` (route memindahkannya ke threadpool).
+    """
+
+    def __init__(self, kind: str, fmt: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        if kind not in INGEST_SOURCES:
+            raise ValueError(f"Unsupported kind '{kind}'")
+        self.kind = kind
+        self.batch_size = batch_size
+        self.parser = RecordParser(fmt)
+        self.report = IngestReport(kind)
+        self.batch: List[Dict[str, Any]] = []
+        self.row_number = 0
+
+    def add_line(self, line: str) -> Optional[List[Dict[str, Any]]]:
+        """Return batch yang siap di-flush saat batch_size tercapai, selain itu None."""
+        try:
+            record = self.parser.parse(line)
+        except Exception as e:
+            record = e
+        if record is None:
+            return None
+        self.row_number += 1
+        row = validate_record(self.kind, record, self.row_number, self.report)
+        if row is not None:
+            self.batch.append(row)
+        if len(self.batch) >= self.batch_size:
+            return self._take_batch()
+        return None
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Akhir input: laporkan field ber-quote yang tidak ditutup, return sisa batch."""
+        try:
+            self.parser.close()
+        except ValueError as e:
+            self.row_number += 1
+            validate_record(self.kind, e, self.row_number, self.report)
+        return self._take_batch()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch, self.batch = self.batch, []
+        return batch
+
+    def flush(self, db: Session, batch: List[Dict[str, Any]]):
+        flush_batch(db, self.kind, batch, self.report)
+
+    def result(self) -> Dict[str, Any]:
+        return self.report.to_dict()
+
+
+def ingest_lines(db: Session, kind: str, lines: Iterable[str], fmt: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """Versi sync (dipakai CLI): baca semua baris, validasi dan muat per batch."""
+    session = IngestSession(kind, fmt, batch_size)
+    for line in lines:
+        ready = session.add_line(line)
+        if ready:
+            session.flush(db, ready)
+    session.flush(db, session.close())
+    return session.result()
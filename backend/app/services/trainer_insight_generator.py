@@ -13,13 +13,14 @@ CACHE_MINUTES = 10
 
 async def generate_trainer_insights_and_alerts(
     trainer_performance_data: List[Dict[str, Any]],
-    class_type_data: List[Dict[str, Any]]
+    class_type_data: List[Dict[str, Any]],
+    force_refresh: bool = False
 ) -> Dict[str, List[Dict[str, Any]]]:
     global _cached_result, _last_generated
     now = datetime.now()
 
     # ✅ Gunakan cache jika belum kedaluwarsa
-    if _cached_result and _last_generated and (now - _last_generated) < timedelta(minutes=CACHE_MINUTES):
+    if not force_refresh and _cached_result and _last_generated and (now - _last_generated) < timedelta(minutes=CACHE_MINUTES):
         return _cached_result
 
     # 🔧 Bangun prompt untuk Groq AI
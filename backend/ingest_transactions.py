@@ -0,0 +1,41 @@
+"""
+Bulk import export POS/bank ke income_transaction atau expense_transaction.
+
+    python ingest_transactions.py income pos_export.csv
+    python ingest_transactions.py expense bank_export.ndjson --format ndjson --batch-size 10000
+"""
+import argparse
+import json
+
+from app.database import SessionLocal
+from app.services import finance_ingest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingest finance transactions (CSV / NDJSON)")
+    parser.add_argument("kind", choices=sorted(finance_ingest.INGEST_SOURCES))
+    parser.add_argument("path", help="File CSV (dengan header) atau NDJSON")
+    parser.add_argument("--format", choices=finance_ingest.INGEST_FORMATS, default=None,
+                        help="Default: ditebak dari ekstensi file")
+    parser.add_argument("--batch-size", type=int, default=finance_ingest.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            report = finance_ingest.ingest_lines(db, args.kind, f, fmt, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    print(f"✅ {report['rows_inserted']} baris ter-insert, {report['rows_duplicate']} duplikat, "
+          f"{report['rows_invalid']} tidak valid dalam {report['elapsed_seconds']} detik "
+          f"({report['rows_per_second']} baris/detik)")
+    if report["errors"]:
+        print("❌ Contoh error:")
+        print(json.dumps(report["errors"], indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()